@@ -0,0 +1,103 @@
+"""Compare adaptive and uniform curve sampling at equal chord error.
+
+For each curve the adaptive sampler runs at ``--tolerance``; the uniform
+sampler is then grown until its worst midpoint-to-chord deviation is no
+larger. Run from the repository root:
+
+    python benchmarks/bench_adaptive_curve.py --tolerance 1e-3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import sympy as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.sample.curves import (  # noqa: E402
+    chord_deviation,
+    sample_curve,
+    sample_curve_adaptive,
+)
+from geometrix.sample.domains import Domain  # noqa: E402
+from geometrix.symbolic.compile import compile_vector  # noqa: E402
+
+PI = float(sp.pi)
+
+
+def example_curves() -> dict[str, tuple[list[sp.Expr], Domain]]:
+    t = sp.Symbol("t")
+    return {
+        "spike": ([t, sp.exp(-400 * t**2), 0], Domain("t", -1.0, 1.0)),
+        "rose": (
+            [sp.cos(7 * t) * sp.cos(t), sp.cos(7 * t) * sp.sin(t), 0],
+            Domain("t", 0.0, PI),
+        ),
+        "helix": ([sp.cos(t), sp.sin(t), 0.1 * t], Domain("t", 0.0, 8 * PI)),
+        "step": ([t, sp.tanh(80 * t), 0], Domain("t", -1.0, 1.0)),
+    }
+
+
+def max_deviation(func, params: np.ndarray) -> float:
+    points = np.stack(np.broadcast_arrays(*func(params)), axis=-1)
+    mids = 0.5 * (params[:-1] + params[1:])
+    mid_points = np.stack(np.broadcast_arrays(*func(mids)), axis=-1)
+    return float(chord_deviation(points[:-1], points[1:], mid_points).max())
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--max-vertices", type=int, default=1 << 16)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'curve':<8}{'adaptive':>10}{'[ms]':>8}{'uniform':>10}{'[ms]':>8}"
+        f"{'ratio':>8}"
+    )
+    t = sp.Symbol("t")
+    for name, (exprs, domain) in example_curves().items():
+        func = compile_vector(exprs, [t])
+        adaptive = sample_curve_adaptive(
+            func, domain, tolerance=args.tolerance, max_vertices=args.max_vertices
+        )
+        target = max(max_deviation(func, adaptive.params), args.tolerance)
+        count = 64
+        while max_deviation(func, domain.linspace(count)) > target:
+            count *= 2
+        adaptive_time = best_of(
+            args.repeat,
+            lambda func=func, domain=domain: sample_curve_adaptive(
+                func, domain, tolerance=args.tolerance, max_vertices=args.max_vertices
+            ),
+        )
+        uniform_time = best_of(
+            args.repeat,
+            lambda func=func, domain=domain, count=count: sample_curve(
+                func, domain, count
+            ),
+        )
+        vertices = len(adaptive.params)
+        print(
+            f"{name:<8}{vertices:>10}{adaptive_time * 1e3:>8.2f}{count:>10}"
+            f"{uniform_time * 1e3:>8.2f}{count / vertices:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare per-array base64 JSON buffers with the binary scene container.
+
+Run from the repository root:
+
+    python benchmarks/bench_container.py --res 256 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.transport.container import pack_buffers, unpack_buffers  # noqa: E402
+
+
+def legacy_pack(arrays: dict[str, np.ndarray]) -> dict:
+    return {
+        key: {
+            "dtype": str(array.dtype),
+            "shape": list(array.shape),
+            "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        }
+        for key, array in arrays.items()
+    }
+
+
+def legacy_unpack(buffers: dict) -> dict[str, np.ndarray]:
+    return {
+        key: np.frombuffer(base64.b64decode(spec["data"]), spec["dtype"])
+        for key, spec in buffers.items()
+    }
+
+
+def surface(res: int) -> dict[str, np.ndarray]:
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, res), np.linspace(0, np.pi, res))
+    positions = np.stack(
+        [np.cos(u) * np.sin(v), np.sin(u) * np.sin(v), np.cos(v)], axis=-1
+    )
+    return {
+        "positions": positions.reshape(-1, 3).astype(np.float32),
+        "values": np.cos(v).ravel().astype(np.float32),
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--res", type=int, nargs="+", default=[256, 512])
+    args = parser.parse_args()
+
+    formats = {
+        "base64": (legacy_pack, legacy_unpack),
+        "binary": (pack_buffers, unpack_buffers),
+        "deflate": (
+            lambda arrays: pack_buffers(arrays, compression="deflate"),
+            unpack_buffers,
+        ),
+    }
+    print(
+        f"{'res':>6}{'format':>9}{'payload [MB]':>14}{'encode [ms]':>13}"
+        f"{'decode [ms]':>13}"
+    )
+    for res in args.res:
+        arrays = surface(res)
+        for name, (pack, unpack) in formats.items():
+            text, encode = timed(
+                lambda pack=pack, arrays=arrays: json.dumps(pack(arrays))
+            )
+            _, decode = timed(lambda unpack=unpack, text=text: unpack(json.loads(text)))
+            print(
+                f"{res:>6}{name:>9}{len(text) / 1e6:>14.2f}{encode * 1e3:>13.1f}"
+                f"{decode * 1e3:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
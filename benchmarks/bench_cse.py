@@ -0,0 +1,89 @@
+"""Compare CSE and plain code generation on the example surfaces.
+
+Run from the repository root:
+
+    python benchmarks/bench_cse.py --res 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import sympy as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix import spherical_to_cartesian  # noqa: E402
+from geometrix.sample.domains import Domain  # noqa: E402
+from geometrix.sample.surface import sample_surface_grid  # noqa: E402
+from geometrix.symbolic.compile import compile_vector  # noqa: E402
+
+PI = float(sp.pi)
+
+
+def example_surfaces() -> dict[str, tuple[list[sp.Expr], list[sp.Symbol], list]]:
+    u, v = sp.symbols("u v")
+    r, theta, phi = sp.symbols("r theta phi")
+    sphere = [expr.subs(r, 1.0) for expr in spherical_to_cartesian(r, theta, phi)]
+    torus = [
+        (2 + sp.cos(v)) * sp.cos(u),
+        (2 + sp.cos(v)) * sp.sin(u),
+        sp.sin(v),
+    ]
+    return {
+        "07_sine_dsl": (
+            [u, v, 0.4 * sp.sin(u) * sp.cos(v)],
+            [u, v],
+            [Domain("u", -PI, PI), Domain("v", -PI, PI)],
+        ),
+        "08_sphere": (
+            sphere,
+            [theta, phi],
+            [Domain("theta", 0.0, PI), Domain("phi", 0.0, 2 * PI)],
+        ),
+        "torus": (
+            torus,
+            [u, v],
+            [Domain("u", 0.0, 2 * PI), Domain("v", 0.0, 2 * PI)],
+        ),
+    }
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--res", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    counts = [args.res, args.res]
+    print(f"{'surface':<14}{'plain [ms]':>12}{'cse [ms]':>12}{'speedup':>10}")
+    for name, (exprs, symbols, domains) in example_surfaces().items():
+        timings = {}
+        for cse in (False, True):
+            compiled = compile_vector(exprs, symbols, cse=cse, cache=False)
+            timings[cse] = best_of(
+                args.repeat,
+                lambda compiled=compiled, domains=domains: sample_surface_grid(
+                    compiled, domains, counts
+                ),
+            )
+        print(
+            f"{name:<14}{timings[False] * 1e3:>12.1f}{timings[True] * 1e3:>12.1f}"
+            f"{timings[False] / timings[True]:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
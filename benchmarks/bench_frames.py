@@ -0,0 +1,65 @@
+"""Compare raw and delta-encoded animation frame payloads.
+
+Run from the repository root:
+
+    python benchmarks/bench_frames.py --frames 120 --res 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.animation import Animation  # noqa: E402
+from geometrix.transport.frames import (  # noqa: E402
+    decode_delta_frames,
+    encode_delta_frames,
+)
+from geometrix.transport.html import _encode_frames  # noqa: E402
+
+
+def ripple(frames: int, res: int) -> Animation:
+    u, v = np.meshgrid(np.linspace(-1, 1, res), np.linspace(-1, 1, res))
+    times = np.linspace(0.0, 2.0, frames)
+    stack = np.empty((frames, res * res, 3), dtype=np.float32)
+    stack[:, :, 0] = u.ravel()
+    stack[:, :, 1] = v.ravel()
+    radius = np.hypot(u, v).ravel()
+    stack[:, :, 2] = np.sin(6 * radius[None] - 3 * times[:, None]) / 4
+    return Animation.from_arrays("positions", stack, times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--res", type=int, default=200)
+    args = parser.parse_args()
+
+    anim = ripple(args.frames, args.res)
+    start = time.perf_counter()
+    raw = json.dumps(_encode_frames(anim))
+    raw_time = time.perf_counter() - start
+    start = time.perf_counter()
+    delta = json.dumps(encode_delta_frames(anim))
+    delta_time = time.perf_counter() - start
+
+    decoded = decode_delta_frames(json.loads(delta))
+    error = max(
+        float(np.abs(frame["positions"] - original.arrays["positions"]).max())
+        for frame, original in zip(decoded, anim.frames, strict=True)
+    )
+    print(f"{'codec':>8}{'payload [MB]':>14}{'encode [s]':>12}")
+    print(f"{'raw':>8}{len(raw) / 1e6:>14.2f}{raw_time:>12.2f}")
+    print(f"{'delta':>8}{len(delta) / 1e6:>14.2f}{delta_time:>12.2f}")
+    print(f"max abs error {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare dense, chunk-skipping and narrow-band implicit surface sampling.
+
+Run from the repository root:
+
+    python benchmarks/bench_implicit.py --res 128 256 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import sympy as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.sample.domains import Domain  # noqa: E402
+from geometrix.sample.implicit import (  # noqa: E402
+    sample_implicit_surface,
+    sample_implicit_surface_sparse,
+)
+from geometrix.symbolic.compile import compile_expr  # noqa: E402
+from geometrix.symbolic.interval import compile_interval  # noqa: E402
+
+
+def example_surfaces() -> dict[str, sp.Expr]:
+    x, y, z = sp.symbols("x y z")
+    return {
+        "sphere": x**2 + y**2 + z**2 - 1,
+        "torus": (sp.sqrt(x**2 + y**2) - 1) ** 2 + z**2 - 0.09,
+        "gyroid": sp.sin(4 * x) * sp.cos(4 * y)
+        + sp.sin(4 * y) * sp.cos(4 * z)
+        + sp.sin(4 * z) * sp.cos(4 * x),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--res", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--coarse", type=int, default=8)
+    args = parser.parse_args()
+
+    symbols = list(sp.symbols("x y z"))
+    domains = [Domain(name, -1.5, 1.5) for name in "xyz"]
+    print(
+        f"{'surface':<8}{'res':>6}{'mode':>8}{'evaluations':>14}{'saved':>8}"
+        f"{'[s]':>8}"
+    )
+    for name, expr in example_surfaces().items():
+        func = compile_expr(expr, symbols)
+        bounds = compile_interval(expr, symbols)
+        modes = {
+            "dense": lambda counts, func=func: sample_implicit_surface(
+                func, domains, counts
+            ),
+            "chunked": lambda counts, func=func, bounds=bounds: sample_implicit_surface(
+                func, domains, counts, bounds=bounds
+            ),
+            "sparse": lambda counts, func=func, bounds=bounds: (
+                sample_implicit_surface_sparse(
+                    func, domains, counts, coarse=args.coarse, bounds=bounds
+                )
+            ),
+        }
+        for res in args.res:
+            for mode, run in modes.items():
+                start = time.perf_counter()
+                mesh = run([res] * 3)
+                elapsed = time.perf_counter() - start
+                saved = mesh.evaluations_saved / mesh.dense_evaluations
+                print(
+                    f"{name:<8}{res:>6}{mode:>8}{mesh.evaluations:>14}"
+                    f"{saved:>8.0%}{elapsed:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
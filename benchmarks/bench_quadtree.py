@@ -0,0 +1,101 @@
+"""Compare quadtree and uniform surface sampling at equal patch error.
+
+The quadtree runs at ``--tolerance``; the uniform grid is refined level by
+level until its worst cell deviation is within the same tolerance.
+Run from the repository root:
+
+    python benchmarks/bench_quadtree.py --tolerance 1e-3
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import sympy as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.sample.domains import Domain  # noqa: E402
+from geometrix.sample.quadtree import cell_error, sample_surface_quadtree  # noqa: E402
+from geometrix.sample.surface import sample_surface_grid  # noqa: E402
+from geometrix.symbolic.compile import compile_vector  # noqa: E402
+
+BASE = (8, 8)
+
+
+def example_surfaces() -> dict[str, list[sp.Expr]]:
+    u, v = sp.symbols("u v")
+    return {
+        "bump": [u, v, sp.exp(-50 * (u**2 + v**2))],
+        "ridge": [u, v, 0.2 * sp.tanh(40 * (u - v**2))],
+        "ripple": [u, v, 0.05 * sp.sin(20 * u) * sp.exp(-8 * (u**2 + v**2))],
+        "saddle": [u, v, 0.5 * (u**2 - v**2)],
+    }
+
+
+def uniform_level(func, domains, target: float, max_level: int) -> int:
+    for level in range(max_level + 1):
+        cells = np.indices(np.array(BASE) * 2**level).reshape(2, -1)
+        if cell_error(func, domains, BASE, level, cells).max() <= target:
+            return level
+    return max_level
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--max-level", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    u, v = sp.symbols("u v")
+    domains = [Domain("u", -1.0, 1.0), Domain("v", -1.0, 1.0)]
+    print(
+        f"{'surface':<8}{'quadtree':>10}{'[ms]':>8}{'uniform':>10}{'[ms]':>8}"
+        f"{'ratio':>8}"
+    )
+    for name, exprs in example_surfaces().items():
+        func = compile_vector(exprs, [u, v])
+
+        def adaptive(func=func):
+            return sample_surface_quadtree(
+                func,
+                domains,
+                tolerance=args.tolerance,
+                max_level=args.max_level,
+                base=BASE,
+            )
+
+        mesh = adaptive()
+        level = uniform_level(func, domains, args.tolerance, args.max_level)
+        counts = [BASE[0] * 2**level + 1, BASE[1] * 2**level + 1]
+        adaptive_time = best_of(args.repeat, adaptive)
+        uniform_time = best_of(
+            args.repeat,
+            lambda func=func, counts=counts: sample_surface_grid(
+                func, domains, counts
+            ),
+        )
+        vertices = len(mesh.vertices)
+        uniform = counts[0] * counts[1]
+        print(
+            f"{name:<8}{vertices:>10}{adaptive_time * 1e3:>8.1f}{uniform:>10}"
+            f"{uniform_time * 1e3:>8.1f}{uniform / vertices:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare per-value substitution with a batched parameter sweep.
+
+Run from the repository root:
+
+    python benchmarks/bench_sweep.py --values 8 64 --res 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import sympy as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.sample.domains import Domain  # noqa: E402
+from geometrix.sample.surface import (  # noqa: E402
+    sample_surface_grid,
+    sample_surface_sweep,
+)
+from geometrix.symbolic.compile import compile_vector  # noqa: E402
+
+PI = float(sp.pi)
+
+
+def per_value(exprs, coords, params, domains, counts, values) -> np.ndarray:
+    frames = []
+    for row in zip(*values, strict=True):
+        subs = dict(zip(params, row, strict=True))
+        compiled = compile_vector(
+            [expr.subs(subs) for expr in exprs], coords, cache=False
+        )
+        frames.append(sample_surface_grid(compiled, domains, counts).positions)
+    return np.stack(frames)
+
+
+def batched(exprs, coords, params, domains, counts, values) -> np.ndarray:
+    compiled = compile_vector(exprs, [*coords, *params], cache=False)
+    return sample_surface_sweep(compiled, domains, counts, values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--res", type=int, default=200)
+    args = parser.parse_args()
+
+    u, v, big, small = sp.symbols("u v R r")
+    exprs = [
+        (big + small * sp.cos(v)) * sp.cos(u),
+        (big + small * sp.cos(v)) * sp.sin(u),
+        small * sp.sin(v),
+    ]
+    domains = [Domain("u", 0.0, 2 * PI), Domain("v", 0.0, 2 * PI)]
+    counts = [args.res, args.res]
+    print(f"{'values':>8}{'per-value [ms]':>16}{'sweep [ms]':>12}{'speedup':>10}")
+    for count in args.values:
+        values = [np.linspace(1.0, 3.0, count), np.linspace(0.2, 0.8, count)]
+        timings = []
+        for run in (per_value, batched):
+            start = time.perf_counter()
+            run(exprs, [u, v], [big, small], domains, counts, values)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{count:>8}{timings[0] * 1e3:>16.1f}{timings[1] * 1e3:>12.1f}"
+            f"{timings[0] / timings[1]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
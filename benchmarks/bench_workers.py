@@ -0,0 +1,82 @@
+"""Measure surface sampling scaling from 1 to N workers.
+
+Run from the repository root:
+
+    python benchmarks/bench_workers.py --res 2000 --max-workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import sympy as sp
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from geometrix.sample.domains import Domain  # noqa: E402
+from geometrix.sample.surface import sample_surface_grid  # noqa: E402
+from geometrix.symbolic.compile import compile_vector  # noqa: E402
+
+PI = float(sp.pi)
+
+
+def torus(u: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Plain numpy evaluator, sampled through the process pool."""
+
+    ring = 2 + np.cos(v)
+    return ring * np.cos(u), ring * np.sin(u), np.sin(v)
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--res", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    u, v = sp.symbols("u v")
+    exprs = [(2 + sp.cos(v)) * sp.cos(u), (2 + sp.cos(v)) * sp.sin(u), sp.sin(v)]
+    evaluators = {
+        "numpy/thread": compile_vector(exprs, [u, v]),
+        "numexpr/thread": compile_vector(exprs, [u, v], backend="numexpr"),
+        "python/process": torus,
+    }
+    domains = [Domain("u", 0.0, 2 * PI), Domain("v", 0.0, 2 * PI)]
+    counts = [args.res, args.res]
+
+    print(f"{'evaluator':<16}{'workers':>8}{'time [ms]':>12}{'speedup':>10}")
+    for name, func in evaluators.items():
+        serial = sample_surface_grid(func, domains, counts).positions
+        baseline = None
+        for workers in range(1, args.max_workers + 1):
+            elapsed = best_of(
+                args.repeat,
+                lambda func=func, workers=workers: sample_surface_grid(
+                    func, domains, counts, workers=workers
+                ),
+            )
+            parallel = sample_surface_grid(func, domains, counts, workers=workers)
+            assert np.array_equal(serial, parallel.positions)
+            baseline = baseline or elapsed
+            print(
+                f"{name:<16}{workers:>8}{elapsed * 1e3:>12.1f}"
+                f"{baseline / elapsed:>9.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
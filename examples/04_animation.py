@@ -1,13 +1,24 @@
-# Example: animate a surface over time with a simple parameter update.
-# Shows how to build frame-by-frame visuals.
+# Example: animate a surface over time.
+# Shows the DSL time option and building frames by hand.
 import numpy as np
 
+from geometrix import geom
 from geometrix.animation import Animation, Frame
 from geometrix.api import SceneBundle, show
 from geometrix.scene.build import build_surface_scene
 
-# Initial surface positions (10x10 grid flattened).
-# Initial surface positions (10x10 grid flattened).
+# DSL: `time t:[0,2] frames 120` samples every frame in one batched pass.
+wave = geom(
+    """
+coords: u v
+X(u,v) = (u, v, 0.4*sin(u + 3*t)*cos(v))
+render: surface X domain u:[-3,3] v:[-3,3] res 60 60 time t:[0,2] frames 120
+"""
+)
+# The scene carries its animation, so show() plays it.
+wave.show()
+
+# Manual frames: initial surface positions (10x10 grid flattened).
 positions = np.zeros((100, 3), dtype=np.float32)
 # Scene definition for the surface grid.
 scene = build_surface_scene(positions, (10, 10))
@@ -4,6 +4,7 @@ import numpy as np
 
 from geometrix import show
 from geometrix.api import SceneBundle
+from geometrix.scene.grid import grid_indices
 from geometrix.scene.spec import BufferSpec, ObjectSpec, SceneSpec
 
 
@@ -45,11 +46,18 @@ for axis in ("x", "y", "z"):
         # Store buffer metadata for the scene spec.
         arrays[key] = positions
         specs[key] = BufferSpec(dtype=str(positions.dtype), shape=positions.shape)
+        # Every face has the same triangulation; identical index buffers are
+        # stored once in the rendered page.
+        index_key = key.replace("positions", "indices")
+        arrays[index_key] = grid_indices(*grid_shape)
+        specs[index_key] = BufferSpec(
+            dtype=str(arrays[index_key].dtype), shape=arrays[index_key].shape
+        )
         objects.append(
             ObjectSpec(
                 type="surface_grid",
                 name=f"face_{axis}_{value:+.0f}",
-                buffers={"positions": key},
+                buffers={"positions": key, "indices": index_key},
                 metadata={"grid": {"Nu": grid_shape[0], "Nv": grid_shape[1]}},
             )
         )
@@ -3,13 +3,25 @@
 from __future__ import annotations
 
 import argparse
+import base64
+import hashlib
+import io
+import json
+import re
 import shutil
 import subprocess
+import sys
+import tarfile
+import tempfile
 from pathlib import Path
+from urllib.request import urlopen
 
 ROOT = Path(__file__).resolve().parents[1]
 JS_DIR = ROOT / "js"
 DIST_DIR = JS_DIR / "dist"
+TEMPLATES_DIR = ROOT / "src" / "geometrix" / "transport" / "templates"
+VENDOR_DIR = TEMPLATES_DIR / "vendor"
+NPM_REGISTRY = "https://registry.npmjs.org"
 
 
 def run_build() -> None:
@@ -25,6 +37,84 @@ def _ensure_index_js() -> None:
         index_path.write_text(iife_path.read_text(encoding="utf-8"), encoding="utf-8")
 
 
+def write_viewer_bundle() -> Path:
+    """Concatenate and minify the notebook viewer scripts into one file."""
+
+    sys.path.insert(0, str(ROOT / "src"))
+    from geometrix.transport.html import VIEWER_BUNDLE, bundle_script
+
+    bundle_path = TEMPLATES_DIR / VIEWER_BUNDLE
+    bundle_path.write_text(bundle_script(), encoding="utf-8")
+    return bundle_path
+
+
+def fetch_three(version: str, dest: Path) -> tuple[Path, str]:
+    """Download and unpack the official npm release of three.js ``version``.
+
+    The tarball is checked against the ``dist.integrity`` hash the registry
+    publishes for it. Returns the unpacked package and a note on its source.
+    """
+
+    with urlopen(f"{NPM_REGISTRY}/three/{version}") as response:
+        dist = json.load(response)["dist"]
+    with urlopen(dist["tarball"]) as response:
+        data = response.read()
+    algorithm, _, expected = dist["integrity"].partition("-")
+    digest = base64.b64encode(hashlib.new(algorithm, data).digest()).decode("ascii")
+    if digest != expected:
+        raise ValueError(f"{dist['tarball']} does not match {dist['integrity']}")
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+        archive.extractall(dest, filter="data")
+    return dest / "package", f"{dist['tarball']} ({dist['integrity']})"
+
+
+def vendor_three(three_dir: Path, source: str | None = None) -> None:
+    """Copy three.js and OrbitControls from an npm ``three`` package.
+
+    OrbitControls' ``"three"`` import is pointed at the ``__THREE__``
+    placeholder the viewer resolves to its own copy of three.js. The sha256
+    sums of the vendored files go to ``VENDOR_CHECKSUMS``, headed by
+    ``source`` (where the package came from); the viewer only inlines files
+    that match them.
+    """
+
+    sys.path.insert(0, str(ROOT / "src"))
+    from geometrix.transport.html import THREE_VERSION, VENDOR_CHECKSUMS, VENDOR_MODULES
+
+    package = json.loads((three_dir / "package.json").read_text(encoding="utf-8"))
+    if package["version"] != THREE_VERSION:
+        raise ValueError(
+            f"Expected three {THREE_VERSION}, found {package['version']}"
+        )
+    controls = (three_dir / "examples/jsm/controls/OrbitControls.js").read_text(
+        encoding="utf-8"
+    )
+    controls, count = re.subn(r"from\s*['\"]three['\"]", 'from "__THREE__"', controls)
+    if not count:
+        raise ValueError("OrbitControls.js does not import three")
+
+    VENDOR_DIR.mkdir(exist_ok=True)
+    shutil.copyfile(
+        three_dir / "build" / "three.module.min.js",
+        VENDOR_DIR / VENDOR_MODULES["three"],
+    )
+    (VENDOR_DIR / VENDOR_MODULES["orbit-controls"]).write_text(
+        controls, encoding="utf-8"
+    )
+    shutil.copyfile(three_dir / "LICENSE", VENDOR_DIR / "three.LICENSE")
+
+    lines = [
+        f"# three {THREE_VERSION} from {source or three_dir}",
+        "# OrbitControls.js has its three import rewritten to __THREE__.",
+    ]
+    for filename in [*VENDOR_MODULES.values(), "three.LICENSE"]:
+        digest = hashlib.sha256((VENDOR_DIR / filename).read_bytes()).hexdigest()
+        lines.append(f"{digest}  {filename}")
+    (VENDOR_DIR / VENDOR_CHECKSUMS).write_text(
+        "\n".join(lines) + "\n", encoding="utf-8"
+    )
+
+
 def _clear_legacy_assets() -> None:
     static_dir = ROOT / "src" / "geometrix" / "static"
     if static_dir.exists():
@@ -38,11 +128,33 @@ def main() -> None:
     parser.add_argument(
         "--skip-build", action="store_true", help="Skip npm build step."
     )
+    parser.add_argument(
+        "--three",
+        type=Path,
+        default=JS_DIR / "node_modules" / "three",
+        help="npm three package to vendor (skipped if missing).",
+    )
+    parser.add_argument(
+        "--fetch-three",
+        action="store_true",
+        help="Vendor the official three.js release from the npm registry.",
+    )
     args = parser.parse_args()
 
     if not args.skip_build:
         run_build()
     _clear_legacy_assets()
+    if args.fetch_three:
+        sys.path.insert(0, str(ROOT / "src"))
+        from geometrix.transport.html import THREE_VERSION
+
+        with tempfile.TemporaryDirectory() as tmp:
+            vendor_three(*fetch_three(THREE_VERSION, Path(tmp)))
+        print(f"Vendored three.js into {VENDOR_DIR}")
+    elif args.three.exists():
+        vendor_three(args.three)
+        print(f"Vendored three.js into {VENDOR_DIR}")
+    print(f"Wrote {write_viewer_bundle()}")
 
 
 if __name__ == "__main__":
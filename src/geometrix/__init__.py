@@ -4,6 +4,8 @@ from .api import (
     GeomProgram,
     canonicalize,
     geom,
+    implicit,
+    implicit_curve,
     latex,
     latex_equation,
     llm_solve,
@@ -28,6 +30,8 @@ __all__ = [
     "points",
     "line",
     "mesh",
+    "implicit",
+    "implicit_curve",
     "GeomProgram",
     "cylindrical_to_cartesian",
     "spherical_to_cartesian",
@@ -23,6 +23,30 @@ class Animation:
     loop: bool = True
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    @classmethod
+    def from_arrays(
+        cls,
+        key: str,
+        stack: np.ndarray,
+        times: np.ndarray,
+        *,
+        fps: int = 30,
+        loop: bool = True,
+        metadata: dict[str, Any] | None = None,
+    ) -> Animation:
+        """Build frames that are views of one contiguous ``(F, ...)`` stack.
+
+        Frame ``i`` maps ``key`` to ``stack[i]``, so the frames share the
+        stack's memory instead of holding separate copies.
+        """
+
+        if len(stack) != len(times):
+            raise ValueError(f"expected {len(stack)} frame times, got {len(times)}")
+        frames = [
+            Frame(t=float(t), arrays={key: stack[idx]}) for idx, t in enumerate(times)
+        ]
+        return cls(frames=frames, fps=fps, loop=loop, metadata=metadata or {})
+
     def to_spec(self) -> dict[str, Any]:
         return {
             "fps": self.fps,
@@ -4,29 +4,44 @@ from __future__ import annotations
 
 import logging
 import re
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from typing import Any
 
+import numpy as np
 import sympy as sp
 
+from geometrix.animation import Animation, attach_animation
 from geometrix.ir.model import DefinitionKind
 from geometrix.parse.dsl_parser import parse_dsl
 from geometrix.parse.latex_parser import LatexParseError, parse_latex_expr
 from geometrix.sample.domains import Domain, validate_domains
-from geometrix.sample.surface import sample_surface_grid
+from geometrix.sample.implicit import (
+    sample_implicit_curve,
+    sample_implicit_surface,
+    sample_implicit_surface_sparse,
+)
+from geometrix.sample.surface import (
+    SurfaceTile,
+    iter_surface_grid,
+    sample_surface_grid,
+    sample_surface_sweep,
+)
 from geometrix.scene.build import (
     build_line_scene,
     build_mesh_scene,
     build_points_scene,
+    build_polylines_scene,
     build_surface_scene,
 )
-from geometrix.symbolic.compile import compile_vector
+from geometrix.scene.grid import grid_normals
+from geometrix.symbolic.compile import compile_expr, compile_vector, supports_normals
+from geometrix.symbolic.interval import compile_interval
 from geometrix.symbolic.llm import LLMConfig, request_llm_json
 from geometrix.symbolic.llm_prompts import build_request_prompt, build_system_prompt
 from geometrix.symbolic.llm_validate import ValidationResult, validate_llm_response
 from geometrix.symbolic.solve import canonicalize_expr, simplify_expr, solve_constraints
-from geometrix.transport.html import render_html
+from geometrix.transport.html import render_html, render_tile_script
 from geometrix.transport.latex_viewer import show_latex
 
 
@@ -36,6 +51,7 @@ class SceneBundle:
 
     scene: Any
     arrays: dict[str, Any]
+    animation: Animation | None = None
 
 
 @dataclass
@@ -45,16 +61,47 @@ class GeomProgram:
     source: str
     ir: Any
 
-    def build_scene(self) -> SceneBundle:
-        """Compile the DSL into a SceneBundle."""
+    def build_scene(self, *, normals: bool = False) -> SceneBundle:
+        """Compile the DSL into a SceneBundle.
+
+        With ``normals`` the bundle also carries per-vertex normals, exact
+        from the parametrization's Jacobian where SymPy can differentiate it
+        and estimated from the sampled grid elsewhere, in place of the
+        viewer's own estimate (which is wrong along seams). Not supported
+        for animated surfaces.
+        """
+
+        return _build_scene_from_ir(self.ir, normals=normals)
+
+    def stream_scene(
+        self, *, preview: int = 32
+    ) -> tuple[SceneBundle, Iterator[SurfaceTile]]:
+        """Return a preview SceneBundle and the tiles that refine it.
+
+        The bundle's positions hold a surface interpolated from at most
+        ``preview`` samples per axis; iterating the tiles overwrites that
+        buffer in place with the exact samples.
+        """
+
+        return _stream_scene_from_ir(self.ir, preview=preview)
 
-        return _build_scene_from_ir(self.ir)
+    def sweep(self, params: dict[str, Iterable[float]]) -> np.ndarray:
+        """Sample the surface for every value of the swept ``params``.
+
+        ``params`` maps declared parameter names to ``P`` values each (other
+        parameters keep their declared values). The surface is compiled once
+        with the swept parameters as extra arguments and evaluated for all
+        values in one batched pass, returning a ``(P, Nu * Nv, 3)`` float32
+        array that lines up with ``build_scene()``'s positions. Domain bounds
+        use the declared parameter values.
+        """
+
+        return _sweep_from_ir(self.ir, params)
 
     def show(self, **kwargs: Any) -> None:
         """Render the program in a notebook."""
 
-        bundle = self.build_scene()
-        show(bundle, **kwargs)
+        show(self, **kwargs)
 
 
 def geom(text: str) -> GeomProgram:
@@ -222,10 +269,28 @@ def show(scene_or_program: Any, **kwargs: Any) -> None:
         scene_or_program: GeomProgram or SceneBundle instance.
         height: Optional output height in pixels.
         animation: Optional Animation instance for frame updates.
+        frame_codec: Optional frame encoding; ``"delta"`` embeds quantized,
+            deflated frame deltas instead of raw frames.
+        stream_frames: Keep animation frames in the kernel and send them to
+            the viewer over a widget comm as it plays instead of embedding
+            them.
+        compression: Optional scene buffer compression; ``"deflate"``
+            deflates the binary buffer container.
+        inline_vendor: Force the vendored three.js into this output
+            (``True``) or load it from the CDN (``False``); by default only
+            the first output of a session carries it.
+        stream: For a GeomProgram, show a coarse preview at once and refine
+            it in place as tiles are sampled; the finished output holds the
+            fully sampled scene.
+        preview: Samples per axis of the streamed preview (default 32).
+        normals: For a GeomProgram, ship per-vertex normals (see
+            ``GeomProgram.build_scene``); not supported with ``stream``.
     """
 
+    if isinstance(scene_or_program, GeomProgram) and kwargs.get("stream"):
+        return _show_stream(scene_or_program, **kwargs)
     if isinstance(scene_or_program, GeomProgram):
-        bundle = scene_or_program.build_scene()
+        bundle = scene_or_program.build_scene(normals=kwargs.get("normals", False))
         return show(bundle, **kwargs)
     if isinstance(scene_or_program, SceneBundle):
         bundle = scene_or_program
@@ -233,15 +298,24 @@ def show(scene_or_program: Any, **kwargs: Any) -> None:
         raise TypeError("Expected GeomProgram or SceneBundle")
 
     height = kwargs.get("height", 420)
-    animation = kwargs.get("animation")
+    animation = kwargs.get("animation") or bundle.animation
     html_bundle = render_html(
-        bundle.scene, bundle.arrays, height=height, animation=animation
+        bundle.scene,
+        bundle.arrays,
+        height=height,
+        animation=animation,
+        frame_codec=kwargs.get("frame_codec"),
+        stream_frames=kwargs.get("stream_frames", False),
+        compression=kwargs.get("compression"),
+        inline_vendor=kwargs.get("inline_vendor"),
     )
     try:
         from IPython.display import HTML, display
     except ImportError as exc:
         raise RuntimeError("IPython is required to render the scene") from exc
     display(HTML(html_bundle.html))
+    if html_bundle.channel is not None:
+        display(html_bundle.channel)
 
 
 def _resolve_allowed_symbols(
@@ -255,7 +329,58 @@ def _resolve_allowed_symbols(
     return list(allowed_symbols)
 
 
-def _build_scene_from_ir(ir) -> SceneBundle:
+def _show_stream(program: GeomProgram, **kwargs: Any) -> None:
+    if kwargs.get("normals"):
+        raise ValueError(
+            "Streaming does not support surface normals; drop normals or stream"
+        )
+    try:
+        from IPython.display import HTML, Javascript, display
+    except ImportError as exc:
+        raise RuntimeError("IPython is required to render the scene") from exc
+    bundle, tiles = program.stream_scene(preview=kwargs.get("preview", 32))
+    options = {
+        "height": kwargs.get("height", 420),
+        "compression": kwargs.get("compression"),
+        "inline_vendor": kwargs.get("inline_vendor"),
+    }
+    html_bundle = render_html(bundle.scene, bundle.arrays, **options)
+    # The final scene replaces the preview, so it carries three.js if that did.
+    options["inline_vendor"] = html_bundle.vendor
+    view = display(HTML(html_bundle.html), display_id=True)
+    handle = None
+    pending = next(tiles, None)
+    while pending is not None:
+        tile, pending = pending, next(tiles, None)
+        script = Javascript(
+            render_tile_script(
+                html_bundle.viewer_id,
+                "positions",
+                tile.start,
+                tile.positions,
+                last=pending is None,
+            )
+        )
+        # One output slot, re-executed per tile, keeps the cell output short.
+        if handle is None:
+            handle = display(script, display_id=True)
+        else:
+            handle.update(script)
+    # A saved notebook keeps only the latest output of each slot, so the
+    # preview is replaced by the fully sampled scene, whose positions the
+    # tiles filled in place, and the tile slot is cleared.
+    view.update(HTML(render_html(bundle.scene, bundle.arrays, **options).html))
+    if handle is not None:
+        handle.update(HTML(""))
+
+
+def _surface_request(
+    ir,
+    swept: Iterable[str] = (),
+    *,
+    normals: bool = False,
+    fixed: dict[str, float] | None = None,
+) -> tuple[Any, list[Domain], list[int]]:
     if not ir.render_requests:
         raise ValueError("No render requests found")
     request = ir.render_requests[0]
@@ -266,24 +391,119 @@ def _build_scene_from_ir(ir) -> SceneBundle:
     if not definition or definition.kind != DefinitionKind.VECTOR:
         raise ValueError("Surface render expects a vector definition")
 
-    coord_symbols = [sp.Symbol(name) for name in ir.coords]
-    param_symbols = {sp.Symbol(name): value for name, value in ir.params.items()}
+    # Swept params stay symbolic and become trailing arguments; the rest are
+    # substituted so they fold into the compiled constants.
+    swept = list(swept)
+    coord_symbols = [sp.Symbol(name) for name in [*ir.coords, *swept]]
+    param_symbols = {
+        sp.Symbol(name): value
+        for name, value in {**ir.params, **(fixed or {})}.items()
+        if name not in swept
+    }
 
     exprs = _parse_vector_expr(definition.expression, ir.coords, list(ir.params.keys()))
     exprs = [expr.subs(param_symbols) for expr in exprs]
 
-    compiled = compile_vector(exprs, coord_symbols)
+    normals = normals and supports_normals(exprs, coord_symbols)
+    compiled = compile_vector(exprs, coord_symbols, normals=normals)
     domains = _parse_domains(request.options, ir)
     validate_domains(domains)
     _validate_params(ir.params)
     counts = _parse_res(request.options)
-    surface = sample_surface_grid(compiled, domains, counts)
+    return compiled, domains, counts
 
-    scene = build_surface_scene(surface.positions, surface.grid_shape)
-    arrays = {"positions": surface.positions}
+
+def _build_scene_from_ir(ir, *, normals: bool = False) -> SceneBundle:
+    options = ir.render_requests[0].options if ir.render_requests else {}
+    if "time" in options and normals:
+        raise ValueError(
+            "Animated surfaces do not support normals; "
+            "drop the time option or normals"
+        )
+    if "time" in options:
+        return _build_animation_from_ir(ir, options)
+    compiled, domains, counts = _surface_request(ir, normals=normals)
+    surface = sample_surface_grid(compiled, domains, counts)
+    if not normals:
+        scene = build_surface_scene(surface.positions, surface.grid_shape)
+        return SceneBundle(scene=scene, arrays={"positions": surface.positions})
+
+    # Analytic normals vanish where the parametrization degenerates (the
+    # poles of a sphere, say); those vertices, or all of them when SymPy
+    # cannot differentiate the surface, take the mesh estimate instead.
+    vertex_normals = surface.normals
+    if vertex_normals is None:
+        vertex_normals = grid_normals(surface.positions, surface.grid_shape)
+    degenerate = ~vertex_normals.any(axis=1)
+    if degenerate.any():
+        estimate = grid_normals(surface.positions, surface.grid_shape)
+        vertex_normals[degenerate] = estimate[degenerate]
+    scene = build_surface_scene(surface.positions, surface.grid_shape, vertex_normals)
+    arrays = {"positions": surface.positions, "normals": vertex_normals}
     return SceneBundle(scene=scene, arrays=arrays)
 
 
+def _build_animation_from_ir(ir, options: dict[str, str]) -> SceneBundle:
+    # The time symbol stays symbolic and every frame is sampled in one sweep
+    # over a batched time axis, straight into a contiguous (F, N, 3) stack.
+    window = _parse_domain_entry(options["time"], ir)
+    validate_domains([window])
+    frames = int(options.get("frames", 60))
+    if frames < 1:
+        raise ValueError("frames must be >= 1")
+    times = np.linspace(window.start, window.stop, frames)
+    compiled, domains, counts = _surface_request(ir, swept=[window.name])
+    stack = sample_surface_sweep(compiled, domains, counts, [times])
+    animation = Animation.from_arrays(
+        "positions",
+        stack,
+        times,
+        fps=int(options.get("fps", 30)),
+        metadata={"time": window.name, "range": [window.start, window.stop]},
+    )
+    scene = build_surface_scene(stack[0], (counts[0], counts[1]))
+    scene = attach_animation(scene, animation)
+    arrays = {"positions": stack[0]}
+    return SceneBundle(scene=scene, arrays=arrays, animation=animation)
+
+
+def _sweep_from_ir(ir, params: dict[str, Iterable[float]]) -> np.ndarray:
+    for name in params:
+        if name not in ir.params:
+            raise ValueError(f"Unknown param: {name}")
+    values = {
+        name: np.asarray(list(vals), dtype=np.float64) for name, vals in params.items()
+    }
+    for name, vals in values.items():
+        if not np.all(np.isfinite(vals)):
+            raise ValueError(f"Param {name} must be finite")
+    # An animated surface is swept at its first frame, the one build_scene()
+    # puts in its positions buffer.
+    options = ir.render_requests[0].options if ir.render_requests else {}
+    fixed = {}
+    if "time" in options:
+        window = _parse_domain_entry(options["time"], ir)
+        fixed[window.name] = window.start
+    compiled, domains, counts = _surface_request(ir, swept=values, fixed=fixed)
+    return sample_surface_sweep(compiled, domains, counts, list(values.values()))
+
+
+def _stream_scene_from_ir(
+    ir, *, preview: int
+) -> tuple[SceneBundle, Iterator[SurfaceTile]]:
+    options = ir.render_requests[0].options if ir.render_requests else {}
+    if "time" in options:
+        raise ValueError(
+            "Streaming does not support animated surfaces; "
+            "drop the time option or use build_scene()"
+        )
+    compiled, domains, counts = _surface_request(ir)
+    tiles = iter_surface_grid(compiled, domains, counts, preview=preview)
+    positions = next(tiles).positions
+    scene = build_surface_scene(positions, (counts[0], counts[1]))
+    return SceneBundle(scene=scene, arrays={"positions": positions}), tiles
+
+
 def _parse_vector_expr(
     expr: str, coords: list[str], params: list[str]
 ) -> list[sp.Expr]:
@@ -299,16 +519,16 @@ def _parse_domains(options: dict[str, str], ir) -> list[Domain]:
     domain_text = options.get("domain")
     if not domain_text:
         return [Domain(name, 0.0, 1.0) for name in ir.coords]
-    entries = domain_text.split()
-    domains = []
-    for entry in entries:
-        name, rng = entry.split(":", 1)
-        rng = rng.strip().lstrip("[").rstrip("]")
-        start_text, stop_text = [part.strip() for part in rng.split(",", 1)]
-        start = float(sp.sympify(start_text, locals=ir.params))
-        stop = float(sp.sympify(stop_text, locals=ir.params))
-        domains.append(Domain(name, start, stop))
-    return domains
+    return [_parse_domain_entry(entry, ir) for entry in domain_text.split()]
+
+
+def _parse_domain_entry(entry: str, ir) -> Domain:
+    name, rng = entry.split(":", 1)
+    rng = rng.strip().lstrip("[").rstrip("]")
+    start_text, stop_text = [part.strip() for part in rng.split(",", 1)]
+    start = float(sp.sympify(start_text, locals=ir.params))
+    stop = float(sp.sympify(stop_text, locals=ir.params))
+    return Domain(name, start, stop)
 
 
 def _parse_res(options: dict[str, str]) -> list[int]:
@@ -324,10 +544,15 @@ def _validate_params(params: dict[str, float]) -> None:
             raise ValueError(f"Param {key} must be finite")
 
 
-def points(positions: Any, values: Any | None = None) -> SceneBundle:
-    """Build a point cloud SceneBundle from positions and optional values."""
+def points(
+    positions: Any, values: Any | None = None, *, quantize: bool = False
+) -> SceneBundle:
+    """Build a point cloud SceneBundle from positions and optional values.
 
-    scene = build_points_scene(positions, values=values)
+    With ``quantize`` the positions and values ship as 16-bit integers.
+    """
+
+    scene = build_points_scene(positions, values=values, quantize=quantize)
     arrays = {"positions": positions}
     if values is not None:
         arrays["values"] = values
@@ -345,14 +570,122 @@ def line(positions: Any, values: Any | None = None) -> SceneBundle:
 
 
 def mesh(
-    vertices: Any, faces: Any | None = None, values: Any | None = None
+    vertices: Any,
+    faces: Any | None = None,
+    values: Any | None = None,
+    *,
+    quantize: bool = False,
 ) -> SceneBundle:
-    """Build a mesh SceneBundle from vertices, faces, and optional values."""
+    """Build a mesh SceneBundle from vertices, faces, and optional values.
+
+    With ``quantize`` the vertices and values ship as 16-bit integers.
+    """
 
-    scene = build_mesh_scene(vertices, faces=faces, values=values)
+    scene = build_mesh_scene(vertices, faces=faces, values=values, quantize=quantize)
     arrays = {"vertices": vertices}
     if faces is not None:
         arrays["faces"] = faces
     if values is not None:
         arrays["values"] = values
     return SceneBundle(scene=scene, arrays=arrays)
+
+
+def implicit(
+    expr: str | sp.Expr,
+    *,
+    domain: dict[str, tuple[float, float]] | None = None,
+    res: int | list[int] = 64,
+    symbols: Iterable[str] = ("x", "y", "z"),
+    params: dict[str, float] | None = None,
+    memory_budget: int | None = None,
+    coarse: int | None = None,
+) -> SceneBundle:
+    """Build a mesh SceneBundle for the implicit surface ``F(x, y, z) = 0``.
+
+    ``expr`` is ``F`` or an equation ``lhs = rhs``, as a string or SymPy
+    expression. Each axis spans ``domain[name]`` (default ``[-2, 2]``) with
+    ``res`` samples. The lattice is processed in chunks within
+    ``memory_budget`` bytes, and chunks whose bounds rule out the surface
+    are never sampled. With ``coarse`` set, a lattice that many times
+    sparser is sampled first and only the narrow band of cells around the
+    surface is refined, which pays off at high ``res``.
+    """
+
+    names = list(symbols)
+    expr = _parse_implicit_expr(expr, names, params or {})
+    coord_symbols = [sp.Symbol(name) for name in names]
+    domains = _implicit_domains(names, domain)
+    counts = [res] * 3 if isinstance(res, int) else list(res)
+    func = compile_expr(expr, coord_symbols)
+    bounds = compile_interval(expr, coord_symbols)
+    if coarse is None:
+        surface = sample_implicit_surface(
+            func, domains, counts, bounds=bounds, memory_budget=memory_budget
+        )
+    else:
+        surface = sample_implicit_surface_sparse(
+            func,
+            domains,
+            counts,
+            coarse=coarse,
+            bounds=bounds,
+            memory_budget=memory_budget,
+        )
+    logging.getLogger("geometrix.sample").debug(
+        "implicit surface: %d of %d evaluations",
+        surface.evaluations,
+        surface.dense_evaluations,
+    )
+    return mesh(surface.vertices, faces=surface.faces)
+
+
+def implicit_curve(
+    expr: str | sp.Expr,
+    *,
+    domain: dict[str, tuple[float, float]] | None = None,
+    res: int | list[int] = 256,
+    symbols: Iterable[str] = ("x", "y"),
+    params: dict[str, float] | None = None,
+) -> SceneBundle:
+    """Build a line SceneBundle for the implicit curve ``F(x, y) = 0``.
+
+    ``expr``, ``domain`` and ``params`` are read as in ``implicit``. The
+    curve is traced by marching squares over ``res`` samples per axis and
+    each disjoint component becomes its own line object in the ``z = 0``
+    plane.
+    """
+
+    names = list(symbols)
+    expr = _parse_implicit_expr(expr, names, params or {})
+    domains = _implicit_domains(names, domain)
+    counts = [res] * 2 if isinstance(res, int) else list(res)
+    func = compile_expr(expr, [sp.Symbol(name) for name in names])
+    curve = sample_implicit_curve(func, domains, counts)
+    scene = build_polylines_scene(curve.polylines)
+    arrays = {
+        spec.buffers["positions"]: polyline
+        for spec, polyline in zip(scene.objects, curve.polylines, strict=True)
+    }
+    return SceneBundle(scene=scene, arrays=arrays)
+
+
+def _parse_implicit_expr(
+    expr: str | sp.Expr, names: list[str], params: dict[str, float]
+) -> sp.Expr:
+    _validate_params(params)
+    locals_ = {name: sp.Symbol(name) for name in [*names, *params]}
+    if isinstance(expr, str):
+        lhs, _, rhs = expr.partition("=")
+        expr = sp.sympify(lhs, locals=locals_) - sp.sympify(rhs or "0", locals=locals_)
+    elif isinstance(expr, sp.Equality):
+        expr = expr.lhs - expr.rhs
+    return sp.sympify(expr).subs({sp.Symbol(k): v for k, v in params.items()})
+
+
+def _implicit_domains(
+    names: list[str], domain: dict[str, tuple[float, float]] | None
+) -> list[Domain]:
+    domain = domain or {}
+    domains = [Domain(name, *domain.get(name, (-2.0, 2.0))) for name in names]
+    validate_domains(domains)
+    return domains
@@ -31,7 +31,10 @@ def parse_dsl(text: str) -> SymbolicIR:
             ir.params = _parse_params(line)
             continue
         if line.startswith("render:"):
-            ir.render_requests.append(_parse_render(line))
+            request = _parse_render(line)
+            ir.render_requests.append(request)
+            if "time" in request.options:
+                ir.time_param = request.options["time"].split(":", 1)[0].strip()
             continue
         if "=" in line:
             definition = _parse_definition(line)
@@ -205,8 +208,8 @@ def _parse_render_options(tokens: list[str]) -> dict[str, str]:
             options["res"] = f"{tokens[idx + 1]} {tokens[idx + 2]}"
             idx += 3
             continue
-        if token == "time" and idx + 1 < len(tokens):
-            options["time"] = tokens[idx + 1]
+        if token in ("time", "frames", "fps") and idx + 1 < len(tokens):
+            options[token] = tokens[idx + 1]
             idx += 2
             continue
         options[f"arg_{idx}"] = token
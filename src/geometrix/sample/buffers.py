@@ -0,0 +1,61 @@
+"""Output buffer helpers shared by the samplers."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+
+DEFAULT_MEMORY_BUDGET = 8 << 20
+
+# Rough float64 scratch per evaluated point: the parameter blocks, one array
+# per component, and the intermediates of a typical expression.
+_BYTES_PER_POINT = 8 * 8
+
+
+def positions_buffer(count: int, out: np.ndarray | None = None) -> np.ndarray:
+    """Return a ``(count, 3)`` positions buffer, validating ``out`` if given."""
+
+    if out is None:
+        return np.empty((count, 3), dtype=np.float32)
+    if out.shape != (count, 3):
+        raise ValueError(f"out must have shape {(count, 3)}, got {out.shape}")
+    if not np.issubdtype(out.dtype, np.floating):
+        raise ValueError("out must have a floating dtype")
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    return out
+
+
+def block_rows(row_points: int, memory_budget: int | None = None) -> int:
+    """Return how many rows of ``row_points`` samples fit the scratch budget.
+
+    At least one row is always returned, so a single row wider than the
+    budget is still evaluated in one piece.
+    """
+
+    budget = DEFAULT_MEMORY_BUDGET if memory_budget is None else memory_budget
+    if budget <= 0:
+        raise ValueError("memory_budget must be positive")
+    return max(1, budget // (_BYTES_PER_POINT * max(row_points, 1)))
+
+
+def write_components(
+    func: Callable[..., Any], args: Sequence[Any], out: np.ndarray
+) -> None:
+    """Evaluate ``func(*args)`` and write component ``k`` into ``out[..., k]``.
+
+    Compiled expressions write through ``evaluate_into``; other callables have
+    their components broadcast into the strided views of ``out``.
+    """
+
+    evaluate_into = getattr(func, "evaluate_into", None)
+    if evaluate_into is not None:
+        evaluate_into(out, *args)
+        return
+    values = func(*args)
+    if len(values) != out.shape[-1]:
+        raise ValueError(f"expected {out.shape[-1]} components, got {len(values)}")
+    for idx, value in enumerate(values):
+        np.copyto(out[..., idx], value, casting="same_kind")
@@ -4,34 +4,121 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 import numpy as np
 
+from geometrix.sample.buffers import positions_buffer, write_components
 from geometrix.sample.domains import Domain
+from geometrix.sample.tiles import fill_tiles, flat_tiles
+
+# Interval halving stops after this many rounds even if the tolerance is
+# not met, e.g. at discontinuities.
+_MAX_LEVELS = 30
 
 
 @dataclass(frozen=True)
 class CurveSamples:
     positions: np.ndarray
+    params: np.ndarray | None = None
 
 
 def sample_curve(
     func: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]],
     domain: Domain,
     count: int,
+    *,
+    out: np.ndarray | None = None,
+    memory_budget: int | None = None,
+    workers: int | None = None,
+    executor: str = "auto",
 ) -> CurveSamples:
-    """Sample a parametric curve over a 1D domain."""
+    """Sample a parametric curve over a 1D domain.
+
+    Components are written into ``out`` (a ``(count, 3)`` float array) when
+    given, otherwise into a new float32 buffer. Samples are evaluated in
+    tiles bounded by ``memory_budget``, on ``workers`` threads or processes
+    when given.
+    """
     t_vals = domain.linspace(count)
-    x_vals, y_vals, z_vals = func(t_vals)
-    x_vals = _broadcast_to(x_vals, t_vals.shape)
-    y_vals = _broadcast_to(y_vals, t_vals.shape)
-    z_vals = _broadcast_to(z_vals, t_vals.shape)
-    positions = np.stack([x_vals, y_vals, z_vals], axis=-1)
-    return CurveSamples(positions=positions.astype(np.float32))
-
-
-def _broadcast_to(values: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
-    array = np.asarray(values)
-    if array.shape != shape:
-        return np.broadcast_to(array, shape)
-    return array
+    positions = positions_buffer(count, out)
+    fill_tiles(
+        func,
+        flat_tiles((t_vals,), memory_budget),
+        positions,
+        workers=workers,
+        executor=executor,
+    )
+    return CurveSamples(positions=positions)
+
+
+def sample_curve_adaptive(
+    func: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]],
+    domain: Domain,
+    *,
+    tolerance: float = 1e-3,
+    max_vertices: int = 4096,
+    initial: int = 33,
+) -> CurveSamples:
+    """Sample a parametric curve with vertices placed by chord deviation.
+
+    Starting from ``initial`` uniform samples, every interval whose midpoint
+    lies more than ``tolerance`` from its chord is halved. Deviation grows
+    with curvature, so sharp features get dense vertices and flat stretches
+    stay coarse. Each round evaluates all candidate midpoints in one
+    vectorized call. When the ``max_vertices`` budget would be exceeded, only
+    the worst intervals are split. The sample parameters are returned as
+    ``params``.
+    """
+    if tolerance <= 0:
+        raise ValueError("tolerance must be positive")
+    if max_vertices < initial:
+        raise ValueError("max_vertices must be >= initial")
+    t_vals = domain.linspace(initial)
+    points = _evaluate(func, t_vals)
+    active = np.ones(initial - 1, dtype=bool)
+    for _ in range(_MAX_LEVELS):
+        budget = max_vertices - len(t_vals)
+        candidates = np.flatnonzero(active)
+        if budget <= 0 or candidates.size == 0:
+            break
+        mids = 0.5 * (t_vals[candidates] + t_vals[candidates + 1])
+        mid_points = _evaluate(func, mids)
+        error = chord_deviation(
+            points[candidates], points[candidates + 1], mid_points
+        )
+        split = error > tolerance
+        if np.count_nonzero(split) > budget:
+            worst = np.argpartition(error, -budget)[-budget:]
+            split = np.zeros_like(split)
+            split[worst] = True
+        if not split.any():
+            break
+        intervals = candidates[split]
+        t_vals = np.insert(t_vals, intervals + 1, mids[split])
+        points = np.insert(points, intervals + 1, mid_points[split], axis=0)
+        # Only the halves of intervals split this round stay candidates.
+        refined = np.zeros_like(active)
+        refined[intervals] = True
+        active = np.repeat(refined, np.where(refined, 2, 1))
+    return CurveSamples(positions=points.astype(np.float32), params=t_vals)
+
+
+def _evaluate(func: Callable[..., Any], t_vals: np.ndarray) -> np.ndarray:
+    points = np.empty((len(t_vals), 3), dtype=np.float64)
+    write_components(func, (t_vals,), points)
+    return points
+
+
+def chord_deviation(
+    start: np.ndarray, stop: np.ndarray, mid: np.ndarray
+) -> np.ndarray:
+    """Distance from ``mid`` to the segment ``start``-``stop``, row-wise."""
+
+    chord = stop - start
+    length_sq = np.einsum("ij,ij->i", chord, chord)
+    offset = mid - start
+    with np.errstate(invalid="ignore", divide="ignore"):
+        along = np.einsum("ij,ij->i", offset, chord) / length_sq
+    along = np.clip(np.nan_to_num(along), 0.0, 1.0)
+    return np.linalg.norm(offset - along[:, None] * chord, axis=1)
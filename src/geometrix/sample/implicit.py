@@ -0,0 +1,565 @@
+"""Implicit curve and surface sampling via marching squares and cubes."""
+
+from __future__ import annotations
+
+import itertools
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from geometrix.sample.buffers import block_rows
+from geometrix.sample.domains import Domain
+from geometrix.symbolic.interval import IntervalFunc
+
+# Welded vertices are matched on a grid this fine in index space.
+_WELD_SCALE = 1 << 16
+
+# Stand-in for samples outside the function's domain; float32 safe.
+_UNDEFINED = 1e30
+
+# Marching squares cell edges, counter-clockwise from the bottom, as the
+# (corner, corner) pairs they join; corners are numbered the same way.
+_SQUARE_EDGES = ((0, 1), (1, 2), (2, 3), (3, 0))
+_SQUARE_CORNERS = np.array([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+
+
+@dataclass(frozen=True)
+class ImplicitMesh:
+    vertices: np.ndarray
+    faces: np.ndarray
+    chunks: int
+    skipped: int
+    evaluations: int
+    dense_evaluations: int
+
+    @property
+    def evaluations_saved(self) -> int:
+        return self.dense_evaluations - self.evaluations
+
+
+@dataclass(frozen=True)
+class ImplicitCurve:
+    polylines: list[np.ndarray]
+    closed: np.ndarray
+    evaluations: int
+
+
+def sample_implicit_curve(
+    func: Callable[..., np.ndarray],
+    domains: list[Domain],
+    counts: list[int],
+    *,
+    level: float = 0.0,
+) -> ImplicitCurve:
+    """Extract the curve ``func(x, y) == level`` as a list of polylines.
+
+    ``func`` is evaluated once over the ``counts`` lattice spanning
+    ``domains``, and every cell is classified by marching squares at once
+    (saddles are resolved by the cell's mean value). Segments are oriented
+    with ``func > level`` on their left, so each crossing point starts at
+    most one segment and ends at most one; segments are then chained into
+    polylines by pointer jumping, without visiting cells in Python. Each
+    disjoint component becomes one ``(n, 3)`` polyline in the ``z = 0``
+    plane; ``closed`` flags loops, whose last vertex repeats the first.
+    """
+    if len(domains) != 2 or len(counts) != 2:
+        raise ValueError("implicit curve sampling expects two domains and counts")
+    if min(counts) < 2:
+        raise ValueError("implicit curve sampling needs at least 2 samples per axis")
+
+    axes = [
+        domain.linspace(count) for domain, count in zip(domains, counts, strict=True)
+    ]
+    values = np.empty(counts, dtype=np.float64)
+    _evaluate(func, axes, values)
+    starts, stops = _square_segments(values, level)
+    points = _crossings(values, axes, level)
+    polylines, closed = _chain(starts, stops, points)
+    return ImplicitCurve(polylines=polylines, closed=closed, evaluations=values.size)
+
+
+def sample_implicit_surface(
+    func: Callable[..., np.ndarray],
+    domains: list[Domain],
+    counts: list[int],
+    *,
+    level: float = 0.0,
+    bounds: IntervalFunc | None = None,
+    memory_budget: int | None = None,
+) -> ImplicitMesh:
+    """Extract the surface ``func(x, y, z) == level`` as an indexed mesh.
+
+    The ``counts`` sample lattice over ``domains`` is split into cubic
+    chunks sized to ``memory_budget``, overlapping by one sample. A chunk is
+    skipped without being sampled when its eight corners share a sign and
+    ``bounds`` (an interval function such as ``compile_interval`` returns)
+    proves ``func`` stays on that side of ``level`` over the chunk's box.
+    Other chunks are evaluated and run through marching cubes. Their
+    vertices are welded across chunk faces by their lattice position, so
+    the result is a single connected mesh.
+    """
+    if len(domains) != 3 or len(counts) != 3:
+        raise ValueError("implicit sampling expects three domains and counts")
+    from skimage.measure import marching_cubes
+
+    axes = [
+        domain.linspace(count) for domain, count in zip(domains, counts, strict=True)
+    ]
+    edge = max(1, math.floor(block_rows(1, memory_budget) ** (1 / 3)) - 1)
+    starts = [np.arange(0, count - 1, edge) for count in counts]
+    chunks = np.stack(np.meshgrid(*starts, indexing="ij"), axis=-1).reshape(-1, 3)
+    stops = np.minimum(chunks + edge, np.array(counts) - 1)
+    active = _active_chunks(func, axes, chunks, stops, level, bounds)
+
+    evaluations = 8 * len(chunks) if bounds is not None else 0
+    pieces = []
+    for start, stop in zip(chunks[active], stops[active], strict=True):
+        chunk_axes = [
+            axis[lo : hi + 1] for axis, lo, hi in zip(axes, start, stop, strict=True)
+        ]
+        volume = np.empty([len(axis) for axis in chunk_axes], dtype=np.float64)
+        _evaluate(func, chunk_axes, volume)
+        evaluations += volume.size
+        pieces.extend(_march(volume, level, start, marching_cubes))
+    vertices, faces = _weld(pieces, domains, axes)
+    return ImplicitMesh(
+        vertices=vertices,
+        faces=faces,
+        chunks=len(chunks),
+        skipped=int(np.count_nonzero(~active)),
+        evaluations=evaluations,
+        dense_evaluations=math.prod(counts),
+    )
+
+
+def sample_implicit_surface_sparse(
+    func: Callable[..., np.ndarray],
+    domains: list[Domain],
+    counts: list[int],
+    *,
+    coarse: int = 8,
+    level: float = 0.0,
+    bounds: IntervalFunc | None = None,
+    memory_budget: int | None = None,
+) -> ImplicitMesh:
+    """Extract ``func(x, y, z) == level`` by narrow-band coarse-to-fine sampling.
+
+    ``func`` is first evaluated on a lattice ``coarse`` times sparser than
+    ``counts``. Coarse cells whose corner values or ``bounds`` interval
+    bracket ``level`` are kept (without ``bounds`` the band is dilated by one
+    cell so surfaces grazing a cell are not lost), and only those cells are
+    evaluated at full resolution in batches within ``memory_budget``. The
+    band is meshed in blocks of whole coarse cells sized to the same budget,
+    one marching cubes pass per block. Cost grows with the surface area
+    rather than the volume; ``evaluations`` records the function evaluations
+    actually made. Here ``chunks`` counts coarse cells and ``skipped`` those
+    outside the band.
+
+    Without ``bounds``, a component small enough to fit between coarse
+    samples (a sphere narrower than a coarse cell, say) changes sign at no
+    coarse corner and is missed. Pass ``bounds`` or lower ``coarse`` to
+    find such components.
+    """
+    if len(domains) != 3 or len(counts) != 3:
+        raise ValueError("implicit sampling expects three domains and counts")
+    if coarse < 1:
+        raise ValueError("coarse must be >= 1")
+    from skimage.measure import marching_cubes
+
+    axes = [
+        domain.linspace(count) for domain, count in zip(domains, counts, strict=True)
+    ]
+    # Coarse lattice as indices into the fine one; the last cell may be short.
+    index = [np.unique(np.append(np.arange(0, n, coarse), n - 1)) for n in counts]
+    values = np.empty([len(idx) for idx in index], dtype=np.float64)
+    _evaluate(func, [axis[idx] for axis, idx in zip(axes, index, strict=True)], values)
+    evaluations = values.size
+
+    nx, ny, nz = (size - 1 for size in values.shape)
+    corners = [
+        values[i : i + nx, j : j + ny, k : k + nz]
+        for i, j, k in itertools.product((0, 1), repeat=3)
+    ]
+    band = (np.minimum.reduce(corners) <= level) & (np.maximum.reduce(corners) >= level)
+    if bounds is not None:
+        lower = np.meshgrid(
+            *(axis[idx[:-1]] for axis, idx in zip(axes, index, strict=True)),
+            indexing="ij",
+        )
+        upper = np.meshgrid(
+            *(axis[idx[1:]] for axis, idx in zip(axes, index, strict=True)),
+            indexing="ij",
+        )
+        lo, hi = bounds(
+            np.stack([grid.ravel() for grid in lower], axis=-1),
+            np.stack([grid.ravel() for grid in upper], axis=-1),
+        )
+        band |= ((lo <= level) & (hi >= level)).reshape(band.shape)
+    else:
+        band = _dilate(band)
+
+    # Band cells are meshed together per block of ``span`` coarse cells a
+    # side, one marching cubes pass each. Samples no band cell covers are
+    # filled with their coarse cell's corner value, which lies on the same
+    # side of ``level``, so no faces appear there.
+    edge = max(1, math.floor(block_rows(1, memory_budget) ** (1 / 3)) - 1)
+    span = max(1, edge // coarse)
+    cells = np.argwhere(band)
+    owner = [
+        np.minimum(np.searchsorted(idx, np.arange(n), side="right") - 1, len(idx) - 2)
+        for idx, n in zip(index, counts, strict=True)
+    ]
+    fill = values[:-1, :-1, :-1]
+    blocks, block_of = np.unique(cells // span, axis=0, return_inverse=True)
+    block_of = block_of.reshape(-1)
+    sizes = np.bincount(block_of, minlength=len(blocks))
+    groups = np.split(cells[np.argsort(block_of, kind="stable")], np.cumsum(sizes))
+    pieces = []
+    for first, members in zip(blocks * span, groups[:-1], strict=True):
+        lo = [idx[cell] for idx, cell in zip(index, first, strict=True)]
+        hi = [
+            idx[min(cell + span, len(idx) - 1)]
+            for idx, cell in zip(index, first, strict=True)
+        ]
+        volume = fill[
+            np.ix_(*(own[a : b + 1] for own, a, b in zip(owner, lo, hi, strict=True)))
+        ]
+        starts = np.stack(
+            [idx[members[:, dim]] for dim, idx in enumerate(index)], axis=-1
+        )
+        stops = np.stack(
+            [idx[members[:, dim] + 1] for dim, idx in enumerate(index)], axis=-1
+        )
+        evaluations += _fill_cells(
+            func, axes, starts, stops, volume, np.array(lo), memory_budget
+        )
+        pieces.extend(_march(volume, level, np.array(lo), marching_cubes))
+    vertices, faces = _weld(pieces, domains, axes)
+    return ImplicitMesh(
+        vertices=vertices,
+        faces=faces,
+        chunks=band.size,
+        skipped=int(band.size - len(cells)),
+        evaluations=evaluations,
+        dense_evaluations=math.prod(counts),
+    )
+
+
+def _fill_cells(
+    func: Callable[..., Any],
+    axes: list[np.ndarray],
+    starts: np.ndarray,
+    stops: np.ndarray,
+    volume: np.ndarray,
+    origin: np.ndarray,
+    memory_budget: int | None,
+) -> int:
+    """Evaluate the lattice cells ``[starts, stops]`` into ``volume``.
+
+    Cells are grouped by shape, since boundary cells can be short, and
+    evaluated in batches within ``memory_budget``. ``volume`` holds the
+    lattice from ``origin`` on. Returns the number of evaluations.
+    """
+
+    shapes = stops - starts + 1
+    evaluations = 0
+    for shape in np.unique(shapes, axis=0):
+        group = starts[np.all(shapes == shape, axis=1)]
+        batch = block_rows(int(np.prod(shape)), memory_budget)
+        offsets = [np.arange(size) for size in shape]
+        for first in range(0, len(group), batch):
+            corner = group[first : first + batch]
+            args = [
+                axis[corner[:, dim, None] + offsets[dim]].reshape(
+                    [-1, *(size if d == dim else 1 for d, size in enumerate(shape))]
+                )
+                for dim, axis in enumerate(axes)
+            ]
+            cubes = np.empty((len(corner), *shape), dtype=np.float64)
+            _evaluate(func, args, cubes)
+            evaluations += cubes.size
+            for cube, at in zip(cubes, corner - origin, strict=True):
+                block = zip(at, shape, strict=True)
+                volume[tuple(slice(a, a + size) for a, size in block)] = cube
+    return evaluations
+
+
+def _square_table() -> np.ndarray:
+    """Directed segments per marching squares case and saddle resolution.
+
+    ``table[case, joined]`` holds up to two ``(edge, edge)`` segments (``-1``
+    when unused); ``joined`` selects whether the positive corners of a
+    saddle cell are connected through its center.
+    """
+
+    table = np.full((16, 2, 2, 2), -1, dtype=np.int64)
+    for case in range(16):
+        inside = [bool(case >> corner & 1) for corner in range(4)]
+        crossed = [
+            edge for edge, (a, b) in enumerate(_SQUARE_EDGES) if inside[a] != inside[b]
+        ]
+        for joined in (0, 1):
+            if len(crossed) == 2:
+                pairs = [tuple(crossed)]
+            elif len(crossed) == 4:
+                # Cut off the corners that are not joined through the center.
+                cut = [c for c in range(4) if inside[c] != bool(joined)]
+                pairs = [((corner - 1) % 4, corner) for corner in cut]
+            else:
+                pairs = []
+            for idx, (a, b) in enumerate(pairs):
+                table[case, joined, idx] = _orient(a, b, inside)
+    return table
+
+
+def _orient(a: int, b: int, inside: list[bool]) -> tuple[int, int]:
+    """Order edges ``a`` and ``b`` so the inside corner of ``a`` is on the left."""
+
+    mid_a, mid_b = (
+        _SQUARE_CORNERS[list(_SQUARE_EDGES[edge])].mean(axis=0) for edge in (a, b)
+    )
+    corner = next(c for c in _SQUARE_EDGES[a] if inside[c])
+    direction, offset = mid_b - mid_a, _SQUARE_CORNERS[corner] - mid_a
+    left = direction[0] * offset[1] - direction[1] * offset[0] > 0
+    return (a, b) if left else (b, a)
+
+
+_SQUARE_TABLE = _square_table()
+
+
+def _square_segments(
+    values: np.ndarray, level: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Directed contour segments as pairs of lattice edge ids.
+
+    Edges along the first axis are numbered ``i * ny + j`` and those along
+    the second axis follow, as ``(nx - 1) * ny + i * (ny - 1) + j``.
+    """
+
+    nx, ny = values.shape
+    corners = [values[:-1, :-1], values[1:, :-1], values[1:, 1:], values[:-1, 1:]]
+    case = sum(
+        (corner > level).astype(np.int64) << bit for bit, corner in enumerate(corners)
+    )
+    finite = np.logical_and.reduce([np.isfinite(corner) for corner in corners])
+    case[~finite] = 0
+    joined = (sum(corners) / 4 > level).astype(np.int64)
+    i, j = np.nonzero((case != 0) & (case != 15))
+    segments = _SQUARE_TABLE[case[i, j], joined[i, j]]
+    first_axis = (nx - 1) * ny
+    edge_ids = np.stack(
+        [
+            i * ny + j,
+            first_axis + (i + 1) * (ny - 1) + j,
+            i * ny + j + 1,
+            first_axis + i * (ny - 1) + j,
+        ],
+        axis=-1,
+    )
+    cells = np.broadcast_to(np.arange(len(i))[:, None, None], segments.shape)
+    used = segments[:, :, 0] >= 0
+    ids = edge_ids[cells[used], segments[used]]
+    return ids[:, 0], ids[:, 1]
+
+
+def _crossings(
+    values: np.ndarray, axes: list[np.ndarray], level: float
+) -> np.ndarray:
+    """Interpolated crossing point on every lattice edge, by edge id."""
+
+    x, y = axes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tx = (level - values[:-1]) / (values[1:] - values[:-1])
+        ty = (level - values[:, :-1]) / (values[:, 1:] - values[:, :-1])
+    along_x = np.stack(
+        np.broadcast_arrays(x[:-1, None] + tx * np.diff(x)[:, None], y[None, :]),
+        axis=-1,
+    )
+    along_y = np.stack(
+        np.broadcast_arrays(x[:, None], y[None, :-1] + ty * np.diff(y)[None, :]),
+        axis=-1,
+    )
+    return np.concatenate([along_x.reshape(-1, 2), along_y.reshape(-1, 2)])
+
+
+def _chain(
+    starts: np.ndarray, stops: np.ndarray, points: np.ndarray
+) -> tuple[list[np.ndarray], np.ndarray]:
+    """Link directed segments sharing endpoints into ordered polylines."""
+
+    count = len(starts)
+    if count == 0:
+        return [], np.zeros(0, dtype=bool)
+    segment_at = np.full(len(points), -1, dtype=np.int64)
+    segment_at[starts] = np.arange(count)
+    succ = segment_at[stops]
+    # Pointer jumping: find each segment's chain tail and, on loops, the
+    # smallest segment id, in log2(count) rounds.
+    rounds = max(1, (count - 1).bit_length())
+    index = np.arange(count)
+    ptr = np.where(succ >= 0, succ, index)
+    label = index.copy()
+    for _ in range(rounds):
+        label = np.minimum(label, label[ptr])
+        ptr = ptr[ptr]
+    loop = succ[ptr] >= 0
+    # Open each loop just before its smallest segment.
+    cut = loop & (succ == label)
+    succ = np.where(cut, -1, succ)
+    ptr = np.where(succ >= 0, succ, index)
+    # Then rank each segment by its distance to the tail.
+    rank = (succ >= 0).astype(np.int64)
+    for _ in range(rounds):
+        rank = rank + rank[ptr]
+        ptr = ptr[ptr]
+    order = np.lexsort((-rank, ptr))
+    tails, first, sizes = np.unique(ptr[order], return_index=True, return_counts=True)
+    polylines, closed = [], []
+    for tail, begin, size in zip(tails, first, sizes, strict=True):
+        chain = order[begin : begin + size]
+        ids = np.append(starts[chain], stops[tail])
+        xy = points[ids]
+        polylines.append(
+            np.column_stack([xy, np.zeros(len(xy))]).astype(np.float32)
+        )
+        closed.append(bool(cut[tail]))
+    return polylines, np.array(closed, dtype=bool)
+
+
+def _march(
+    volume: np.ndarray,
+    level: float,
+    start: np.ndarray,
+    marching_cubes: Callable[..., Any],
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Run marching cubes on ``volume`` if it brackets ``level``.
+
+    Samples outside the function's domain (NaN) are marched as lying far
+    above ``level``, and the faces that closes off along the domain's edge
+    are dropped, leaving the surface open there.
+    """
+
+    finite = volume[np.isfinite(volume)]
+    if finite.size == 0 or not finite.min() < level < finite.max():
+        return []
+    undefined = np.isnan(volume)
+    volume = np.nan_to_num(
+        volume, nan=level + _UNDEFINED, posinf=_UNDEFINED, neginf=-_UNDEFINED
+    )
+    vertices, faces, _, _ = marching_cubes(volume, level, allow_degenerate=False)
+    if undefined.any():
+        vertices, faces = _drop_undefined(vertices, faces, volume, undefined, level)
+        if not len(faces):
+            return []
+    return [(vertices + start, faces)]
+
+
+def _drop_undefined(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    volume: np.ndarray,
+    undefined: np.ndarray,
+    level: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Drop faces touching vertices on edges to an undefined sample.
+
+    The sentinel puts those crossings exactly on the edge's finite end, a
+    lattice point whose value is not ``level``.
+    """
+
+    near = undefined.copy()
+    for axis in range(volume.ndim):
+        grown, source = np.moveaxis(near, axis, 0), np.moveaxis(undefined, axis, 0)
+        grown[:-1] |= source[1:]
+        grown[1:] |= source[:-1]
+    index = np.rint(vertices).astype(np.int64)
+    corner = tuple(index.T)
+    on_lattice = np.all(vertices == index, axis=1)
+    stray = on_lattice & near[corner] & (volume[corner] != level)
+    faces = faces[~stray[faces].any(axis=1)]
+    used, faces = np.unique(faces, return_inverse=True)
+    return vertices[used], faces.reshape(-1, 3)
+
+
+def _weld(
+    pieces: list[tuple[np.ndarray, np.ndarray]],
+    domains: list[Domain],
+    axes: list[np.ndarray],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge per-block meshes, welding vertices by lattice position."""
+
+    if not pieces:
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.uint32)
+    offsets = np.cumsum([0] + [len(vertices) for vertices, _ in pieces[:-1]])
+    lattice = np.concatenate([vertices for vertices, _ in pieces])
+    faces = np.concatenate(
+        [faces + offset for (_, faces), offset in zip(pieces, offsets, strict=True)]
+    )
+    keys = np.rint(lattice * _WELD_SCALE).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    faces = inverse.reshape(-1)[faces]
+    # Welding can collapse slivers along block faces to repeated indices.
+    distinct = (
+        (faces[:, 0] != faces[:, 1])
+        & (faces[:, 1] != faces[:, 2])
+        & (faces[:, 0] != faces[:, 2])
+    )
+    origin = np.array([domain.start for domain in domains])
+    steps = np.array([axis[1] - axis[0] for axis in axes])
+    positions = origin + lattice[first] * steps
+    return positions.astype(np.float32), faces[distinct].astype(np.uint32)
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    """Grow ``mask`` by one cell in all 26 directions."""
+
+    padded = np.pad(mask, 1)
+    grown = np.zeros_like(mask)
+    nx, ny, nz = mask.shape
+    for i, j, k in itertools.product(range(3), repeat=3):
+        grown |= padded[i : i + nx, j : j + ny, k : k + nz]
+    return grown
+
+
+def _active_chunks(
+    func: Callable[..., Any],
+    axes: list[np.ndarray],
+    chunks: np.ndarray,
+    stops: np.ndarray,
+    level: float,
+    bounds: IntervalFunc | None,
+) -> np.ndarray:
+    """Flag chunks that may contain the level set."""
+
+    if bounds is None:
+        return np.ones(len(chunks), dtype=bool)
+    corners = np.array(list(itertools.product((0, 1), repeat=3)))
+    index = np.where(corners[None], stops[:, None], chunks[:, None])
+    args = [axis[index[..., dim]] for dim, axis in enumerate(axes)]
+    values = np.empty(index.shape[:2], dtype=np.float64)
+    _evaluate(func, args, values)
+    side = np.sign(values - level)
+    mixed = ~np.all(side == side[:, :1], axis=1) | (side[:, 0] == 0)
+    lower = np.stack([axis[chunks[:, dim]] for dim, axis in enumerate(axes)], axis=-1)
+    upper = np.stack([axis[stops[:, dim]] for dim, axis in enumerate(axes)], axis=-1)
+    lo, hi = bounds(lower, upper)
+    return mixed | ((lo <= level) & (hi >= level))
+
+
+def _evaluate(
+    func: Callable[..., Any], args: list[np.ndarray], out: np.ndarray
+) -> None:
+    if out.ndim == len(args) and all(arg.ndim == 1 for arg in args) and out.ndim > 1:
+        # Lattice axes: broadcast views for compiled evaluators.
+        args = [
+            arg.reshape([-1 if dim == idx else 1 for dim in range(len(args))])
+            for idx, arg in enumerate(args)
+        ]
+    evaluate_into = getattr(func, "evaluate_into", None)
+    if evaluate_into is not None:
+        evaluate_into(out, *args)
+        return
+    np.copyto(out, func(*np.broadcast_arrays(*args)), casting="same_kind")
@@ -7,6 +7,9 @@ from dataclasses import dataclass
 
 import numpy as np
 
+from geometrix.sample.buffers import positions_buffer
+from geometrix.sample.tiles import fill_tiles, flat_tiles
+
 
 @dataclass(frozen=True)
 class PointSamples:
@@ -16,19 +19,28 @@ class PointSamples:
 def sample_points(
     func: Callable[..., tuple[np.ndarray, np.ndarray, np.ndarray]],
     coords: list[np.ndarray],
+    *,
+    out: np.ndarray | None = None,
+    memory_budget: int | None = None,
+    workers: int | None = None,
+    executor: str = "auto",
 ) -> PointSamples:
-    """Sample a point cloud from coordinate arrays."""
-    x_vals, y_vals, z_vals = func(*coords)
+    """Sample a point cloud from coordinate arrays.
+
+    Components are written into ``out`` (an ``(N, 3)`` float array, ``N`` the
+    number of coordinate samples) when given, otherwise into a new float32
+    buffer. Coordinates are flattened in C order and evaluated in tiles
+    bounded by ``memory_budget``, on ``workers`` threads or processes when
+    given.
+    """
     base_shape = np.asarray(coords[0]).shape
-    x_vals = _broadcast_to(x_vals, base_shape)
-    y_vals = _broadcast_to(y_vals, base_shape)
-    z_vals = _broadcast_to(z_vals, base_shape)
-    positions = np.stack([x_vals, y_vals, z_vals], axis=-1).reshape(-1, 3)
-    return PointSamples(positions=positions.astype(np.float32))
-
-
-def _broadcast_to(values: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
-    array = np.asarray(values)
-    if array.shape != shape:
-        return np.broadcast_to(array, shape)
-    return array
+    positions = positions_buffer(int(np.prod(base_shape)), out)
+    flat = [np.broadcast_to(coord, base_shape).reshape(-1) for coord in coords]
+    fill_tiles(
+        func,
+        flat_tiles(flat, memory_budget),
+        positions,
+        workers=workers,
+        executor=executor,
+    )
+    return PointSamples(positions=positions)
@@ -2,42 +2,270 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import itertools
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
 
 import numpy as np
 
-from geometrix.sample.domains import Domain, meshgrid
+from geometrix.sample.buffers import block_rows, positions_buffer, write_components
+from geometrix.sample.domains import Domain
+from geometrix.sample.tiles import Tile, fill_tiles, grid_tiles
 
 
 @dataclass(frozen=True)
 class SurfaceGrid:
     positions: np.ndarray
     grid_shape: tuple[int, int]
+    normals: np.ndarray | None = None
+
+
+@dataclass(frozen=True)
+class SurfaceTile:
+    """Rows ``[start, stop)`` of a flattened positions buffer.
+
+    ``positions`` is a view of those rows. A ``preview`` tile spans the whole
+    buffer with values interpolated from a coarse lattice.
+    """
+
+    start: int
+    stop: int
+    positions: np.ndarray
+    preview: bool = False
 
 
 def sample_surface_grid(
     func: Callable[..., tuple[np.ndarray, np.ndarray, np.ndarray]],
     domains: list[Domain],
     counts: list[int],
+    *,
+    out: np.ndarray | None = None,
+    memory_budget: int | None = None,
+    workers: int | None = None,
+    executor: str = "auto",
 ) -> SurfaceGrid:
-    """Sample a parametric surface on a grid."""
+    """Sample a parametric surface on a grid.
+
+    Positions are written into ``out`` (a C-contiguous ``(Nu * Nv, 3)`` float
+    array) when given, otherwise into a new float32 buffer. The grid is
+    evaluated in tiles of whole rows sized so their scratch arrays stay within
+    ``memory_budget`` bytes (8 MiB by default), and each tile's components are
+    written straight into strided views of the buffer. Peak memory is the
+    positions buffer plus one tile, whatever the resolution.
+
+    With ``workers`` > 1 the tiles are evaluated concurrently on a thread or
+    process pool (see ``fill_tiles`` for ``executor``). The tiling does not
+    depend on ``workers``, so parallel results are bit-identical to serial
+    ones.
+
+    Evaluators exposing a fused ``grid_kernel`` (numba-compiled expressions)
+    need no scratch and fill the whole buffer from the 1D parameter axes.
+
+    Evaluators compiled with ``compile_vector(..., normals=True)`` also
+    yield unit normals from their ``X_u x X_v`` components, returned as
+    ``normals`` (zero where the normal vanishes to round-off, e.g. at poles).
+    """
+    if len(domains) != 2 or len(counts) != 2:
+        raise ValueError("surface sampling expects two domains and counts")
+    nu, nv = counts
+    u_axis, v_axis = (
+        domain.linspace(count) for domain, count in zip(domains, counts, strict=True)
+    )
+    positions = positions_buffer(nu * nv, out)
+    if getattr(func, "normals", False):
+        if executor == "process":
+            raise ValueError("normals are sampled with threads, not processes")
+        normals = np.zeros_like(positions)
+        tiles = grid_tiles(u_axis, v_axis, memory_budget)
+        fill_tiles(
+            func,
+            (_NormalTile(tile, normals) for tile in tiles),
+            positions,
+            workers=workers,
+            executor="thread",
+        )
+        return SurfaceGrid(positions=positions, grid_shape=(nu, nv), normals=normals)
+    grid_kernel = getattr(func, "grid_kernel", None)
+    if grid_kernel is not None and len(func.component_backends) == 3:
+        grid_kernel(u_axis, v_axis, positions)
+        return SurfaceGrid(positions=positions, grid_shape=(nu, nv))
+
+    fill_tiles(
+        func,
+        grid_tiles(u_axis, v_axis, memory_budget),
+        positions,
+        workers=workers,
+        executor=executor,
+    )
+    return SurfaceGrid(positions=positions, grid_shape=(nu, nv))
+
+
+@dataclass(frozen=True)
+class _NormalTile:
+    """Grid tile of a fused position-and-normal evaluator.
+
+    The six components are evaluated into one contiguous plane each, from
+    which the positions are copied into ``out`` and the normalized
+    ``X_u x X_v`` into ``normals``.
+    """
+
+    tile: Tile
+    normals: np.ndarray
+
+    def write(self, func: Callable[..., object], out: np.ndarray) -> None:
+        start, stop = self.tile.start, self.tile.stop
+        u_axis, v_axis = self.tile.axes
+        planes = np.empty((6, *self.tile.shape), dtype=out.dtype)
+        func.evaluate_into(
+            np.moveaxis(planes, 0, -1), u_axis[:, None], v_axis[None, :]
+        )
+        planes = planes.reshape(6, -1)
+        x, y, z = planes[3:]
+        length = np.sqrt(x * x + y * y + z * z)
+        # Rounding leaves tiny normals where the parametrization degenerates;
+        # treat anything at round-off level of the tile's largest as zero.
+        largest = np.fmax.reduce(length, initial=0.0)
+        length[length <= np.finfo(out.dtype).eps * largest] = np.inf
+        scale = np.reciprocal(length, out=length)
+        for k in range(3):
+            out[start:stop, k] = planes[k]
+            np.multiply(planes[3 + k], scale, out=self.normals[start:stop, k])
+
+
+def sample_surface_sweep(
+    func: Callable[..., tuple[np.ndarray, np.ndarray, np.ndarray]],
+    domains: list[Domain],
+    counts: list[int],
+    params: Sequence[Sequence[float] | np.ndarray],
+    *,
+    out: np.ndarray | None = None,
+    memory_budget: int | None = None,
+) -> np.ndarray:
+    """Sample a family of parametric surfaces in one vectorized pass.
+
+    ``func`` takes ``(u, v, *params)``, and ``params`` holds ``P`` values for
+    each extra argument. All parameter sets are evaluated together along a
+    leading broadcast axis, so a compiled evaluator sees ``(P, 1, 1)``,
+    ``(1, Nu, 1)`` and ``(1, 1, Nv)`` arguments and the family costs a single
+    compile. Calls are batched over parameter values (and rows, for grids
+    larger than ``memory_budget``) and written straight into ``out``, a
+    C-contiguous ``(P, Nu * Nv, 3)`` float array, or a new float32 one.
+    """
+    if len(domains) != 2 or len(counts) != 2:
+        raise ValueError("surface sampling expects two domains and counts")
+    values = [np.asarray(param, dtype=np.float64).reshape(-1) for param in params]
+    sizes = {len(value) for value in values}
+    if len(sizes) > 1:
+        raise ValueError(f"params must have equal lengths, got {sorted(sizes)}")
+    count = sizes.pop() if sizes else 1
+    nu, nv = counts
+    u_axis, v_axis = (
+        domain.linspace(n) for domain, n in zip(domains, counts, strict=True)
+    )
+    if out is not None:
+        if out.shape != (count, nu * nv, 3):
+            raise ValueError(
+                f"out must have shape {(count, nu * nv, 3)}, got {out.shape}"
+            )
+        if not out.flags.c_contiguous:
+            raise ValueError("out must be C-contiguous")
+        out = out.reshape(-1, 3)
+    grid = positions_buffer(count * nu * nv, out).reshape(count, nu, nv, 3)
+
+    rows = min(nu, block_rows(nv, memory_budget))
+    batch = block_rows(rows * nv, memory_budget)
+    compiled = hasattr(func, "evaluate_into")
+    for first in range(0, count, batch):
+        block = slice(first, min(first + batch, count))
+        extra = [value[block].reshape(-1, 1, 1) for value in values]
+        for start in range(0, nu, rows):
+            span = slice(start, min(start + rows, nu))
+            args = [u_axis[span].reshape(1, -1, 1), v_axis.reshape(1, 1, -1), *extra]
+            if not compiled:
+                args = np.broadcast_arrays(*args)
+            write_components(func, args, grid[block, span])
+    return grid.reshape(count, nu * nv, 3)
+
+
+def iter_surface_grid(
+    func: Callable[..., tuple[np.ndarray, np.ndarray, np.ndarray]],
+    domains: list[Domain],
+    counts: list[int],
+    *,
+    out: np.ndarray | None = None,
+    preview: int = 32,
+    memory_budget: int | None = None,
+) -> Iterator[SurfaceTile]:
+    """Sample a parametric surface progressively, yielding tiles as they land.
+
+    The first tile is a preview: ``func`` evaluated on at most ``preview``
+    samples per axis and bilinearly interpolated over the whole buffer, so a
+    viewer can draw the full surface at once. The row tiles of
+    ``sample_surface_grid`` follow and overwrite it in place; once the
+    generator is exhausted the buffer matches ``sample_surface_grid``. A grid
+    no larger than the preview comes back as a single exact tile.
+    """
     if len(domains) != 2 or len(counts) != 2:
         raise ValueError("surface sampling expects two domains and counts")
-    u_grid, v_grid = meshgrid(domains, counts)
-    x_vals, y_vals, z_vals = func(u_grid, v_grid)
-    x_vals = _broadcast_to(x_vals, u_grid.shape)
-    y_vals = _broadcast_to(y_vals, u_grid.shape)
-    z_vals = _broadcast_to(z_vals, u_grid.shape)
-    positions = np.stack([x_vals, y_vals, z_vals], axis=-1).reshape(-1, 3)
-    return SurfaceGrid(
-        positions=positions.astype(np.float32),
-        grid_shape=(counts[0], counts[1]),
+    if preview < 2:
+        raise ValueError("preview must be >= 2")
+    nu, nv = counts
+    u_axis, v_axis = (
+        domain.linspace(count) for domain, count in zip(domains, counts, strict=True)
+    )
+    positions = positions_buffer(nu * nv, out)
+    tiles = grid_tiles(u_axis, v_axis, memory_budget)
+    index = [_preview_index(count, preview) for count in counts]
+    if len(index[0]) == nu and len(index[1]) == nv:
+        for tile in tiles:
+            tile.write(func, positions)
+        yield SurfaceTile(start=0, stop=nu * nv, positions=positions)
+        return
+
+    coarse = np.empty((len(index[0]), len(index[1]), 3), dtype=np.float64)
+    Tile(
+        start=0,
+        stop=len(index[0]) * len(index[1]),
+        shape=coarse.shape[:2],
+        axes=(u_axis[index[0]], v_axis[index[1]]),
+        grid=True,
+    ).write(func, coarse.reshape(-1, 3))
+    (_, wu), (kv, wv) = (
+        _interpolation(idx, count) for idx, count in zip(index, counts, strict=True)
     )
+    # Interpolate along v on the coarse rows, then fill the fine rows between
+    # each pair of coarse rows by broadcasting, without temporaries.
+    along_v = coarse[:, kv] + wv[None, :, None] * (coarse[:, kv + 1] - coarse[:, kv])
+    along_v = along_v.astype(positions.dtype)
+    step = np.diff(along_v, axis=0)
+    weights = wu.astype(positions.dtype)[:, None, None]
+    grid = positions.reshape(nu, nv, 3)
+    for k, (first, last) in enumerate(itertools.pairwise(index[0])):
+        rows = slice(first, last + 1)
+        np.multiply(weights[rows], step[k], out=grid[rows])
+        grid[rows] += along_v[k]
+    yield SurfaceTile(start=0, stop=nu * nv, positions=positions, preview=True)
+
+    for tile in tiles:
+        tile.write(func, positions)
+        yield SurfaceTile(
+            start=tile.start,
+            stop=tile.stop,
+            positions=positions[tile.start : tile.stop],
+        )
+
+
+def _preview_index(count: int, preview: int) -> np.ndarray:
+    """Indices of at most ``preview`` evenly spread samples, ends included."""
+
+    step = max(1, -(-(count - 1) // (preview - 1)))
+    return np.unique(np.append(np.arange(0, count, step), count - 1))
+
 
+def _interpolation(index: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Left coarse sample and weight for every fine index along one axis."""
 
-def _broadcast_to(values: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
-    array = np.asarray(values)
-    if array.shape != shape:
-        return np.broadcast_to(array, shape)
-    return array
+    fine = np.arange(count)
+    left = np.clip(np.searchsorted(index, fine, side="right") - 1, 0, len(index) - 2)
+    weight = (fine - index[left]) / (index[left + 1] - index[left])
+    return left, weight
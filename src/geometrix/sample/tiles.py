@@ -0,0 +1,229 @@
+"""Tiled and parallel evaluation of samplers into a positions buffer."""
+
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import pickle
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+
+from geometrix.sample.buffers import block_rows, write_components
+
+EXECUTORS = ("auto", "thread", "process")
+
+# Domains are split into at least this many tiles (when they have enough
+# rows) so a worker pool has something to balance. The split depends only on
+# the domain, never on the worker count, which keeps results bit-identical
+# between serial and parallel runs.
+MIN_TILES = 16
+
+logger = logging.getLogger("geometrix.sample")
+
+
+@dataclass(frozen=True)
+class Tile:
+    """A contiguous slice ``[start, stop)`` of the flattened positions buffer.
+
+    ``axes`` are the parameter values for the tile. With ``grid`` set they are
+    the tile's 1D axes: compiled evaluators receive them as broadcastable
+    ``(rows, 1)`` and ``(1, Nv)`` views and broadcast only when writing into
+    ``out``, while other callables get dense ``meshgrid`` blocks.
+    """
+
+    start: int
+    stop: int
+    shape: tuple[int, ...]
+    axes: tuple[np.ndarray, ...]
+    grid: bool = False
+
+    def write(self, func: Callable[..., Any], out: np.ndarray) -> None:
+        args = self.axes
+        if self.grid and hasattr(func, "evaluate_into"):
+            args = tuple(
+                axis.reshape([-1 if dim == idx else 1 for dim in range(len(args))])
+                for idx, axis in enumerate(args)
+            )
+        elif self.grid:
+            args = tuple(np.meshgrid(*args, indexing="ij"))
+        view = out[self.start : self.stop].reshape(*self.shape, out.shape[-1])
+        write_components(func, args, view)
+
+
+def tile_rows(rows: int, row_points: int, memory_budget: int | None = None) -> int:
+    """Return the number of rows per tile for a ``rows x row_points`` domain."""
+
+    step = min(block_rows(row_points, memory_budget), math.ceil(rows / MIN_TILES))
+    return max(1, step)
+
+
+def grid_tiles(
+    u_axis: np.ndarray, v_axis: np.ndarray, memory_budget: int | None = None
+) -> Iterator[Tile]:
+    """Yield row-block tiles of a ``len(u_axis) x len(v_axis)`` grid."""
+
+    nu, nv = len(u_axis), len(v_axis)
+    step = tile_rows(nu, nv, memory_budget)
+    for start in range(0, nu, step):
+        stop = min(start + step, nu)
+        yield Tile(
+            start=start * nv,
+            stop=stop * nv,
+            shape=(stop - start, nv),
+            axes=(u_axis[start:stop], v_axis),
+            grid=True,
+        )
+
+
+def flat_tiles(
+    coords: Iterable[np.ndarray], memory_budget: int | None = None
+) -> Iterator[Tile]:
+    """Yield tiles over equally sized flat coordinate arrays."""
+
+    arrays = tuple(coords)
+    count = len(arrays[0])
+    step = tile_rows(count, 1, memory_budget)
+    for start in range(0, count, step):
+        stop = min(start + step, count)
+        yield Tile(
+            start=start,
+            stop=stop,
+            shape=(stop - start,),
+            axes=tuple(array[start:stop] for array in arrays),
+        )
+
+
+def fill_tiles(
+    func: Callable[..., Any],
+    tiles: Iterable[Tile],
+    out: np.ndarray,
+    *,
+    workers: int | None = None,
+    executor: str = "auto",
+) -> None:
+    """Evaluate ``tiles`` into ``out``, optionally on a pool of ``workers``.
+
+    ``executor="auto"`` uses threads for compiled expressions, whose numpy,
+    numexpr, and numba kernels release the GIL, and a process pool writing
+    into shared memory for other callables (falling back to threads when the
+    callable cannot be pickled).
+    """
+
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unsupported executor: {executor}")
+    if workers is None or workers <= 1:
+        for tile in tiles:
+            tile.write(func, out)
+        return
+    if executor == "auto":
+        executor = "thread" if hasattr(func, "evaluate_into") else "process"
+        if executor == "process" and not _picklable(func):
+            logger.warning("%r is not picklable; sampling with threads", func)
+            executor = "thread"
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            _drain(pool, workers, ((tile.write, (func, out)) for tile in tiles))
+        return
+    _fill_processes(func, tiles, out, workers)
+
+
+def _fill_processes(
+    func: Callable[..., Any], tiles: Iterable[Tile], out: np.ndarray, workers: int
+) -> None:
+    # Each tile is evaluated into its own shared-memory segment, which is
+    # copied into ``out`` and released as soon as the tile completes. Peak
+    # memory is ``out`` plus the tiles in flight, not a second full buffer.
+    segments: dict[str, tuple[Tile, shared_memory.SharedMemory]] = {}
+
+    def calls() -> Iterator[tuple[Callable[..., Any], tuple]]:
+        for tile in tiles:
+            rows = tile.stop - tile.start
+            shm = shared_memory.SharedMemory(
+                create=True, size=max(rows * out.shape[-1] * out.itemsize, 1)
+            )
+            segments[shm.name] = (tile, shm)
+            local = replace(tile, start=0, stop=rows)
+            layout = (shm.name, (rows, out.shape[-1]), out.dtype.str)
+            yield _write_shared, (func, local, layout)
+
+    def collect(future: Future) -> None:
+        tile, shm = segments.pop(future.result())
+        try:
+            rows = tile.stop - tile.start
+            shared = np.ndarray((rows, out.shape[-1]), dtype=out.dtype, buffer=shm.buf)
+            out[tile.start : tile.stop] = shared
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_context()) as pool:
+            _drain(pool, workers, calls(), collect)
+    finally:
+        for _, shm in segments.values():
+            shm.close()
+            shm.unlink()
+
+
+def _write_shared(
+    func: Callable[..., Any], tile: Tile, layout: tuple[str, tuple[int, ...], str]
+) -> str:
+    name, shape, dtype = layout
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        tile.write(func, out)
+        del out
+    finally:
+        shm.close()
+    return name
+
+
+def _drain(
+    pool: Executor,
+    workers: int,
+    calls: Iterable[tuple[Callable[..., Any], tuple]],
+    collect: Callable[[Future], Any] = Future.result,
+) -> None:
+    # Keep a bounded number of tiles in flight so the scratch budget holds.
+    pending: set[Future] = set()
+    for fn, args in calls:
+        if len(pending) >= 2 * workers:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(future)
+        pending.add(pool.submit(fn, *args))
+    for future in pending:
+        collect(future)
+
+
+def _context() -> multiprocessing.context.BaseContext:
+    # Forking a process that has started native thread pools (numba's TBB or
+    # OpenMP layers) can deadlock either side, so workers start from a clean
+    # interpreter instead.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def _picklable(func: Callable[..., Any]) -> bool:
+    try:
+        pickle.dumps(func)
+    except Exception:
+        return False
+    return True
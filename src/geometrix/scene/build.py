@@ -2,12 +2,25 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
 
 import numpy as np
 
+from geometrix.scene.grid import grid_index_dtype, grid_normals
+from geometrix.scene.quantize import encoded_spec
 from geometrix.scene.spec import BufferSpec, ObjectSpec, SceneSpec
 
+# Encodings used by ``quantize=True``, per attribute role.
+QUANTIZED_ENCODINGS = {
+    "positions": "int16",
+    "vertices": "int16",
+    "values": "uint16",
+    "normals": "octahedral",
+}
+
 
 @dataclass(frozen=True)
 class BufferRegistry:
@@ -16,30 +29,60 @@ class BufferRegistry:
 
 
 def build_surface_scene(
-    positions: np.ndarray, grid_shape: tuple[int, int]
+    positions: np.ndarray,
+    grid_shape: tuple[int, int],
+    normals: np.ndarray | None = None,
+    *,
+    quantize: bool = False,
+    indices: bool = False,
+    compute_normals: bool = False,
 ) -> SceneSpec:
+    """Scene with one ``surface_grid`` object over ``grid_shape`` samples.
+
+    ``indices`` and ``compute_normals`` declare ``indices`` and ``normals``
+    buffers generated with numpy (see ``geometrix.scene.grid``) so the viewer
+    does not build them itself; the transport fills them in when the caller's
+    arrays leave them out.
+    """
+
     buffers = {
-        "positions": positions.astype(np.float32),
+        "positions": positions.astype(np.float32, copy=False),
     }
-    registry = build_buffers(buffers)
+    if normals is None and compute_normals and quantize:
+        # Quantized specs need the normals themselves for the error bound.
+        normals = grid_normals(positions, grid_shape)
+    if normals is not None:
+        buffers["normals"] = normals.astype(np.float32, copy=False)
+    registry = build_buffers(buffers, _encodings(buffers, quantize))
+    specs = dict(registry.specs)
+    if compute_normals and "normals" not in specs:
+        specs["normals"] = BufferSpec(dtype="float32", shape=(len(positions), 3))
+    if indices:
+        nu, nv = grid_shape
+        specs["indices"] = BufferSpec(
+            dtype=grid_index_dtype(nu, nv),
+            shape=(6 * max(nu - 1, 0) * max(nv - 1, 0),),
+        )
     obj = ObjectSpec(
         type="surface_grid",
         name="surface",
-        buffers={"positions": "positions"},
+        buffers={key: key for key in specs},
         metadata={"grid": {"Nu": grid_shape[0], "Nv": grid_shape[1]}},
     )
-    return SceneSpec(version="1.0", objects=[obj], buffers=registry.specs)
+    return SceneSpec(version="1.0", objects=[obj], buffers=specs)
 
 
 def build_points_scene(
-    positions: np.ndarray, values: np.ndarray | None = None
+    positions: np.ndarray, values: np.ndarray | None = None, *, quantize: bool = False
 ) -> SceneSpec:
-    buffers: dict[str, np.ndarray] = {"positions": positions.astype(np.float32)}
+    buffers: dict[str, np.ndarray] = {
+        "positions": positions.astype(np.float32, copy=False)
+    }
     buffer_map = {"positions": "positions"}
     if values is not None:
-        buffers["values"] = values.astype(np.float32)
+        buffers["values"] = values.astype(np.float32, copy=False)
         buffer_map["values"] = "values"
-    registry = build_buffers(buffers)
+    registry = build_buffers(buffers, _encodings(buffers, quantize))
     obj = ObjectSpec(type="points", name="points", buffers=buffer_map)
     return SceneSpec(version="1.0", objects=[obj], buffers=registry.specs)
 
@@ -47,36 +90,136 @@ def build_points_scene(
 def build_line_scene(
     positions: np.ndarray, values: np.ndarray | None = None
 ) -> SceneSpec:
-    buffers: dict[str, np.ndarray] = {"positions": positions.astype(np.float32)}
+    buffers: dict[str, np.ndarray] = {
+        "positions": positions.astype(np.float32, copy=False)
+    }
     buffer_map = {"positions": "positions"}
     if values is not None:
-        buffers["values"] = values.astype(np.float32)
+        buffers["values"] = values.astype(np.float32, copy=False)
         buffer_map["values"] = "values"
     registry = build_buffers(buffers)
     obj = ObjectSpec(type="line", name="line", buffers=buffer_map)
     return SceneSpec(version="1.0", objects=[obj], buffers=registry.specs)
 
 
+def build_polylines_scene(polylines: list[np.ndarray]) -> SceneSpec:
+    """One line object per polyline, backed by ``positions_<i>`` buffers."""
+
+    buffers = {
+        f"positions_{idx}": polyline.astype(np.float32, copy=False)
+        for idx, polyline in enumerate(polylines)
+    }
+    registry = build_buffers(buffers)
+    objects = [
+        ObjectSpec(type="line", name=f"line_{idx}", buffers={"positions": key})
+        for idx, key in enumerate(buffers)
+    ]
+    return SceneSpec(version="1.0", objects=objects, buffers=registry.specs)
+
+
 def build_mesh_scene(
     vertices: np.ndarray,
     faces: np.ndarray | None = None,
     values: np.ndarray | None = None,
+    normals: np.ndarray | None = None,
+    *,
+    quantize: bool = False,
 ) -> SceneSpec:
-    buffers: dict[str, np.ndarray] = {"vertices": vertices.astype(np.float32)}
+    buffers: dict[str, np.ndarray] = {
+        "vertices": vertices.astype(np.float32, copy=False)
+    }
     buffer_map = {"vertices": "vertices"}
     if faces is not None:
-        buffers["faces"] = faces.astype(np.uint32)
+        buffers["faces"] = faces.astype(np.uint32, copy=False)
         buffer_map["faces"] = "faces"
     if values is not None:
-        buffers["values"] = values.astype(np.float32)
+        buffers["values"] = values.astype(np.float32, copy=False)
         buffer_map["values"] = "values"
-    registry = build_buffers(buffers)
+    if normals is not None:
+        buffers["normals"] = normals.astype(np.float32, copy=False)
+        buffer_map["normals"] = "normals"
+    registry = build_buffers(buffers, _encodings(buffers, quantize))
     obj = ObjectSpec(type="mesh", name="mesh", buffers=buffer_map)
     return SceneSpec(version="1.0", objects=[obj], buffers=registry.specs)
 
 
-def build_buffers(arrays: dict[str, np.ndarray]) -> BufferRegistry:
+def build_buffers(
+    arrays: dict[str, np.ndarray], encodings: dict[str, str] | None = None
+) -> BufferRegistry:
+    """Describe ``arrays``, storing keys in ``encodings`` with that encoding.
+
+    Encoded buffers are recorded with their encoded dtype and shape; the
+    transport encodes the float arrays on the way out (see
+    ``geometrix.scene.quantize``).
+    """
+
     specs: dict[str, BufferSpec] = {}
+    encodings = encodings or {}
     for key, array in arrays.items():
-        specs[key] = BufferSpec(dtype=str(array.dtype), shape=tuple(array.shape))
+        if key in encodings:
+            specs[key] = encoded_spec(array, encodings[key])
+        else:
+            specs[key] = BufferSpec(dtype=str(array.dtype), shape=tuple(array.shape))
     return BufferRegistry(specs=specs, arrays=arrays)
+
+
+def dedupe_buffers(
+    scene: SceneSpec, arrays: dict[str, np.ndarray], *, keep: Iterable[str] = ()
+) -> tuple[SceneSpec, dict[str, np.ndarray]]:
+    """Merge buffers with identical content into one shared buffer id.
+
+    Every buffer is content-addressed by a digest of its spec (dtype, shape,
+    encoding) and bytes, recorded on its ``BufferSpec``. Objects referencing
+    a duplicate are pointed at the first buffer with the same digest, and the
+    duplicates are dropped, so each unique buffer is encoded and shipped
+    once. Keys in ``keep`` (buffers updated in place, such as animated ones)
+    are never merged.
+    """
+
+    keep = set(keep)
+    specs: dict[str, BufferSpec] = {}
+    unique: dict[str, np.ndarray] = {}
+    alias: dict[str, str] = {}
+    owners: dict[str, str] = {}
+    for key, spec in scene.buffers.items():
+        if key not in arrays:
+            specs[key] = spec
+            continue
+        array = np.ascontiguousarray(arrays[key])
+        digest = _digest(spec, array)
+        owner = owners.get(digest)
+        if owner is not None and key not in keep and owner not in keep:
+            alias[key] = owner
+            continue
+        owners.setdefault(digest, key)
+        specs[key] = replace(spec, digest=digest)
+        unique[key] = arrays[key]
+    objects = [
+        replace(
+            obj,
+            buffers={role: alias.get(key, key) for role, key in obj.buffers.items()},
+        )
+        for obj in scene.objects
+    ]
+    extra = {key: array for key, array in arrays.items() if key not in scene.buffers}
+    deduped = replace(scene, objects=objects, buffers=specs)
+    return deduped, {**unique, **extra}
+
+
+def _digest(spec: BufferSpec, array: np.ndarray) -> str:
+    header = json.dumps(
+        [str(array.dtype), list(array.shape), spec.encoding], sort_keys=True
+    )
+    digest = hashlib.blake2b(header.encode("utf-8"), digest_size=16)
+    digest.update(memoryview(array).cast("B"))
+    return digest.hexdigest()
+
+
+def _encodings(arrays: dict[str, np.ndarray], quantize: bool) -> dict[str, str]:
+    if not quantize:
+        return {}
+    return {
+        key: encoding
+        for key, encoding in QUANTIZED_ENCODINGS.items()
+        if key in arrays
+    }
@@ -0,0 +1,106 @@
+"""Triangle indices and vertex normals for structured surface grids."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from geometrix.scene.spec import SceneSpec
+
+
+def grid_indices(nu: int, nv: int) -> np.ndarray:
+    """Triangle indices of an ``nu x nv`` row-major grid.
+
+    Each quad ``a = i * nv + j`` contributes the triangles ``(a, a + nv,
+    a + 1)`` and ``(a + 1, a + nv, a + nv + 1)``, the winding the viewer
+    uses. Indices are uint16 when every vertex fits, else uint32.
+    """
+
+    dtype = np.dtype(grid_index_dtype(nu, nv)).type
+    if nu < 2 or nv < 2:
+        return np.zeros(0, dtype=dtype)
+    a = np.arange(nu * nv, dtype=dtype).reshape(nu, nv)[:-1, :-1]
+    b = a + dtype(1)
+    c = a + dtype(nv)
+    d = c + dtype(1)
+    return np.stack([a, c, b, b, c, d], axis=-1).reshape(-1)
+
+
+def grid_index_dtype(nu: int, nv: int) -> str:
+    """Smallest unsigned dtype able to index every vertex of the grid."""
+
+    return "uint16" if nu * nv <= 1 << 16 else "uint32"
+
+
+def grid_normals(positions: np.ndarray, grid_shape: tuple[int, int]) -> np.ndarray:
+    """Area-weighted vertex normals of a surface grid, as float32 ``(n, 3)``.
+
+    Matches the viewer's own normal computation for the ``grid_indices``
+    triangles: every vertex sums the unnormalized normals of the triangles
+    around it. Vertices without a finite normal get a zero vector.
+    """
+
+    nu, nv = grid_shape
+    # One (nu, nv) plane per coordinate keeps every slice contiguous by row.
+    planes = np.asarray(positions, dtype=np.float32).reshape(nu * nv, 3).T
+    x, y, z = np.ascontiguousarray(planes).reshape(3, nu, nv)
+    normals = np.zeros((3, nu, nv), dtype=np.float32)
+    if nu > 1 and nv > 1:
+        first = _cross(_edge(x, y, z, 1, 0, 0, 0), _edge(x, y, z, 0, 1, 0, 0))
+        second = _cross(_edge(x, y, z, 1, 0, 0, 1), _edge(x, y, z, 1, 1, 0, 1))
+        for out, a, b in zip(normals, first, second, strict=True):
+            both = a + b
+            out[:-1, :-1] += a
+            out[1:, :-1] += both
+            out[:-1, 1:] += both
+            out[1:, 1:] += b
+    length = np.sqrt(np.einsum("ijk,ijk->jk", normals, normals))
+    valid = np.isfinite(length) & (length > 0)
+    normals /= np.where(valid, length, 1.0)
+    np.copyto(normals, 0.0, where=~valid)
+    return np.ascontiguousarray(normals.reshape(3, -1).T)
+
+
+def _edge(
+    x: np.ndarray, y: np.ndarray, z: np.ndarray, di: int, dj: int, si: int, sj: int
+) -> tuple[np.ndarray, ...]:
+    """Per-quad vector from corner ``(si, sj)`` to corner ``(di, dj)``."""
+
+    nu, nv = x.shape
+    head = (slice(di, nu - 1 + di), slice(dj, nv - 1 + dj))
+    tail = (slice(si, nu - 1 + si), slice(sj, nv - 1 + sj))
+    return tuple(plane[head] - plane[tail] for plane in (x, y, z))
+
+
+def _cross(
+    u: tuple[np.ndarray, ...], v: tuple[np.ndarray, ...]
+) -> tuple[np.ndarray, ...]:
+    return (
+        u[1] * v[2] - u[2] * v[1],
+        u[2] * v[0] - u[0] * v[2],
+        u[0] * v[1] - u[1] * v[0],
+    )
+
+
+def derive_arrays(scene: SceneSpec, arrays: dict[str, Any]) -> dict[str, Any]:
+    """Fill in the index and normal buffers a surface grid declares.
+
+    ``build_surface_scene(..., indices=True, compute_normals=True)`` records
+    ``indices`` and ``normals`` buffers that the caller does not have to
+    supply; they are generated here from the grid's positions.
+    """
+
+    derived = dict(arrays)
+    for obj in scene.objects:
+        grid = obj.metadata.get("grid")
+        if obj.type != "surface_grid" or not grid:
+            continue
+        shape = (grid["Nu"], grid["Nv"])
+        indices = obj.buffers.get("indices")
+        if indices and indices not in derived:
+            derived[indices] = grid_indices(*shape)
+        normals = obj.buffers.get("normals")
+        if normals and normals not in derived:
+            derived[normals] = grid_normals(derived[obj.buffers["positions"]], shape)
+    return derived
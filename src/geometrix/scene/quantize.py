@@ -0,0 +1,146 @@
+"""Quantized vertex attribute encodings.
+
+Quantized buffers ship as normalized integers, ``n`` in ``[-1, 1]`` (signed)
+or ``[0, 1]`` (unsigned), and the viewer decodes them on load as
+``value = offset + scale * n`` per component. Normals ship as
+octahedral-encoded pairs decoded in the vertex shader.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from geometrix.scene.spec import BufferSpec
+
+QUANTIZED_DTYPES = ("int8", "uint8", "int16", "uint16")
+ENCODINGS = (*QUANTIZED_DTYPES, "octahedral")
+
+
+def encoded_spec(array: np.ndarray, encoding: str) -> BufferSpec:
+    """BufferSpec for ``array`` stored with ``encoding``.
+
+    ``encoding`` is one of ``QUANTIZED_DTYPES``, quantizing each component
+    against its bounding box, or ``"octahedral"`` for unit normals stored as
+    int8 pairs. The spec's ``encoding`` records the parameters needed to
+    decode and ``error``, the largest absolute error per component
+    (quantized) or angle in radians (octahedral) the encoding introduces.
+    """
+
+    array = np.asarray(array, dtype=np.float64)
+    if encoding == "octahedral":
+        if array.ndim != 2 or array.shape[1] != 3:
+            raise ValueError("octahedral encoding expects (n, 3) normals")
+        spec = BufferSpec(
+            dtype="int8",
+            shape=(array.shape[0], 2),
+            encoding={"type": "octahedral", "normalized": True, "error": 0.0},
+        )
+        decoded = decode_attribute(encode_attribute(array, spec), spec)
+        error = _angle_error(array, decoded)
+        return BufferSpec(spec.dtype, spec.shape, {**spec.encoding, "error": error})
+    if encoding not in QUANTIZED_DTYPES:
+        raise ValueError(f"Unsupported attribute encoding: {encoding}")
+
+    planar = _components(array)
+    finite = np.where(np.isfinite(planar), planar, np.nan)
+    if np.isnan(finite).all(axis=0).any():
+        low = high = np.zeros(planar.shape[1])
+    else:
+        low, high = np.nanmin(finite, axis=0), np.nanmax(finite, axis=0)
+    signed = np.dtype(encoding).kind == "i"
+    # Signed codes are centred on the box, unsigned ones start at its corner.
+    offset = (low + high) / 2 if signed else low
+    scale = (high - low) / 2 if signed else high - low
+    levels = np.iinfo(encoding).max
+    return BufferSpec(
+        dtype=encoding,
+        shape=tuple(array.shape),
+        encoding={
+            "type": "quantized",
+            "normalized": True,
+            "offset": offset.tolist(),
+            "scale": scale.tolist(),
+            "error": float(scale.max(initial=0.0) / (2 * levels)),
+        },
+    )
+
+
+def encode_attribute(array: np.ndarray, spec: BufferSpec) -> np.ndarray:
+    """Encode float ``array`` as described by ``spec``."""
+
+    array = np.asarray(array, dtype=np.float64)
+    if spec.encoding["type"] == "octahedral":
+        return _octahedral(array)
+    levels = np.iinfo(spec.dtype).max
+    low = -levels if np.dtype(spec.dtype).kind == "i" else 0
+    offset = np.array(spec.encoding["offset"])
+    scale = np.array(spec.encoding["scale"])
+    planar = _components(array)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        codes = np.where(scale > 0, (planar - offset) / scale * levels, 0.0)
+    codes = np.clip(np.rint(np.nan_to_num(codes)), low, levels)
+    return codes.astype(spec.dtype).reshape(array.shape)
+
+
+def decode_attribute(array: np.ndarray, spec: BufferSpec) -> np.ndarray:
+    """Float32 values of an ``encode_attribute`` result."""
+
+    levels = np.iinfo(spec.dtype).max
+    normalized = np.maximum(np.asarray(array, dtype=np.float64) / levels, -1.0)
+    if spec.encoding["type"] == "octahedral":
+        x, y = normalized[:, 0], normalized[:, 1]
+        z = 1.0 - np.abs(x) - np.abs(y)
+        fold = np.maximum(-z, 0.0)
+        x = x - np.copysign(fold, x)
+        y = y - np.copysign(fold, y)
+        normals = np.stack([x, y, z], axis=1)
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        return (normals / np.where(length > 0, length, 1.0)).astype(np.float32)
+    planar = _components(normalized)
+    values = np.array(spec.encoding["offset"]) + planar * spec.encoding["scale"]
+    return values.astype(np.float32).reshape(normalized.shape)
+
+
+def encode_arrays(
+    buffers: dict[str, BufferSpec], arrays: dict[str, Any]
+) -> dict[str, np.ndarray]:
+    """Apply each buffer's encoding to float arrays that are not encoded yet."""
+
+    encoded = {}
+    for key, array in arrays.items():
+        spec = buffers.get(key)
+        array = np.asarray(array)
+        if spec is not None and spec.encoding and str(array.dtype) != spec.dtype:
+            array = encode_attribute(array, spec)
+        encoded[key] = array
+    return encoded
+
+
+def _components(array: np.ndarray) -> np.ndarray:
+    """``(n, components)`` view with one row per vertex."""
+
+    return array.reshape(-1, int(np.prod(array.shape[1:])))
+
+
+def _octahedral(normals: np.ndarray) -> np.ndarray:
+    norm = np.abs(normals).sum(axis=1, keepdims=True)
+    unit = np.nan_to_num(normals / np.where(norm > 0, norm, 1.0))
+    x, y, z = unit[:, 0], unit[:, 1], unit[:, 2]
+    # Fold the lower hemisphere over the diagonals of the upper square.
+    folded_x = (1.0 - np.abs(y)) * np.where(x >= 0, 1.0, -1.0)
+    folded_y = (1.0 - np.abs(x)) * np.where(y >= 0, 1.0, -1.0)
+    pairs = np.stack(
+        [np.where(z < 0, folded_x, x), np.where(z < 0, folded_y, y)], axis=1
+    )
+    return np.clip(np.rint(pairs * 127), -127, 127).astype(np.int8)
+
+
+def _angle_error(normals: np.ndarray, decoded: np.ndarray) -> float:
+    length = np.linalg.norm(normals, axis=1)
+    valid = length > 0
+    if not valid.any():
+        return 0.0
+    cosine = np.sum(normals[valid] * decoded[valid], axis=1) / length[valid]
+    return float(np.arccos(np.clip(cosine, -1.0, 1.0)).max())
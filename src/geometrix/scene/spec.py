@@ -10,6 +10,8 @@ from typing import Any
 class BufferSpec:
     dtype: str
     shape: tuple[int, ...]
+    encoding: dict[str, Any] | None = None
+    digest: str | None = None
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,180 @@
+"""Bounded LRU cache for compiled SymPy evaluators."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import sympy as sp
+
+CACHE_DIR_ENV = "GEOMETRIX_COMPILE_CACHE_DIR"
+DEFAULT_MAXSIZE = 128
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of compile cache counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    disk_hits: int
+    disk_writes: int
+    size: int
+    maxsize: int
+
+
+def fingerprint(
+    exprs: Iterable[sp.Basic],
+    symbols: Iterable[sp.Symbol],
+    backend: str,
+    **options: Any,
+) -> str:
+    """Return a structural hash for an expression vector and its symbols."""
+
+    parts = [
+        backend,
+        repr(sorted(options.items())),
+        sp.srepr(tuple(symbols)),
+        sp.srepr(tuple(exprs)),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class CompileCache:
+    """LRU cache of compiled evaluators with an optional source-on-disk tier."""
+
+    def __init__(
+        self, maxsize: int = DEFAULT_MAXSIZE, directory: str | Path | None = None
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._disk_hits = 0
+        self._disk_writes = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: str, value: Any) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def load_source(self, key: str) -> str | None:
+        """Return generated source stored on disk for ``key``, if any."""
+
+        path = self._source_path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            source = path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        with self._lock:
+            self._disk_hits += 1
+        return source
+
+    def store_source(self, key: str, source: str) -> Path | None:
+        """Persist generated source for ``key`` when a directory is configured."""
+
+        path = self._source_path(key)
+        if path is None:
+            return None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(source, encoding="utf-8")
+            tmp_path.replace(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._disk_writes += 1
+        return path
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                disk_hits=self._disk_hits,
+                disk_writes=self._disk_writes,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self) -> None:
+        """Drop in-memory entries and reset counters; disk sources are kept."""
+
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._disk_hits = 0
+            self._disk_writes = 0
+
+    def _source_path(self, key: str) -> Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / key[:2] / f"gx_{key}.py"
+
+
+_default_cache = CompileCache(directory=os.environ.get(CACHE_DIR_ENV) or None)
+
+
+def get_compile_cache() -> CompileCache:
+    """Return the process-wide compile cache."""
+
+    return _default_cache
+
+
+def configure_compile_cache(
+    maxsize: int | None = None, directory: str | Path | None = None
+) -> CompileCache:
+    """Replace the process-wide compile cache with a new configuration."""
+
+    global _default_cache
+    current = _default_cache
+    _default_cache = CompileCache(
+        maxsize=current.maxsize if maxsize is None else maxsize,
+        directory=current.directory if directory is None else directory,
+    )
+    return _default_cache
+
+
+def compile_cache_stats() -> CacheStats:
+    """Return hit/miss/eviction counters for the process-wide cache."""
+
+    return _default_cache.stats()
+
+
+def clear_compile_cache() -> None:
+    """Clear the in-memory tier of the process-wide cache."""
+
+    _default_cache.clear()
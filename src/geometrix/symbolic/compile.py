@@ -2,33 +2,662 @@
 
 from __future__ import annotations
 
+import importlib.util
+import logging
+import os
+import sys
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import sympy as sp
+from sympy.printing.lambdarepr import NumExprPrinter
+from sympy.printing.numpy import NumPyPrinter
+from sympy.printing.pycode import PythonCodePrinter
+
+from geometrix.symbolic.cache import CompileCache, fingerprint, get_compile_cache
+
+BACKENDS = ("numpy", "numexpr", "numba")
+
+_FUNC_NAME = "_geometrix_compiled"
+_INTO_NAME = "_geometrix_into"
+_POINT_NAME = "_geometrix_point"
+_POINTS_NAME = "_geometrix_points"
+_GRID_NAME = "_geometrix_grid"
+_JIT_OPTIONS = 'cache=True, error_model="numpy"'
+_COMPONENTS_TAG = "# components:"
+# Bump when generated source changes so on-disk caches are not reused.
+_CODEGEN_REVISION = 2
+
+logger = logging.getLogger("geometrix.compile")
 
 
 @dataclass(frozen=True)
 class CompiledExpression:
     symbols: tuple[sp.Symbol, ...]
     func: Callable[..., Any]
+    source: str = ""
+    backend: str = "numpy"
+    component_backends: tuple[str, ...] = ()
+    grid_kernel: Callable[..., None] | None = None
+    into: Callable[..., None] | None = None
+    normals: bool = False
 
     def __call__(self, *args: Any) -> Any:
         return self.func(*args)
 
+    def evaluate_into(self, out: np.ndarray, *args: Any) -> None:
+        """Evaluate and write component ``k`` into ``out[..., k]``.
+
+        ``out`` must have the broadcast shape of ``args`` plus a trailing
+        component axis (none for scalar expressions); numexpr and numba
+        evaluators write into it without full-size intermediates.
+        """
+
+        if self.into is not None:
+            self.into(out, *args)
+            return
+        values = self.func(*args)
+        if isinstance(values, (list, tuple)):
+            for idx, value in enumerate(values):
+                np.copyto(out[..., idx], value, casting="same_kind")
+        else:
+            np.copyto(out, values, casting="same_kind")
 
-def compile_expr(expr: sp.Expr, symbols: list[sp.Symbol]) -> CompiledExpression:
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Generated functions are not picklable; rebuild them from the source
+        # (or, for numba, the generated module) in the receiving process.
+        if self.backend == "numba":
+            path = Path(sys.modules[self.func.__module__].__file__)
+            return _from_module, (self.source, list(self.symbols), path, self.normals)
+        return _from_source, (
+            self.source,
+            list(self.symbols),
+            self.backend,
+            self.normals,
+        )
+
+
+def compile_expr(
+    expr: sp.Expr,
+    symbols: list[sp.Symbol],
+    *,
+    backend: str = "numpy",
+    cse: bool = True,
+    cache: bool | CompileCache = True,
+) -> CompiledExpression:
     """Compile a SymPy expression to a numpy-backed callable."""
 
-    func = sp.lambdify(symbols, expr, modules=["numpy"])
-    return CompiledExpression(symbols=tuple(symbols), func=func)
+    return _compile(
+        [sp.sympify(expr)],
+        symbols,
+        vector=False,
+        backend=backend,
+        cse=cse,
+        cache=cache,
+    )
 
 
 def compile_vector(
+    exprs: list[sp.Expr],
+    symbols: list[sp.Symbol],
+    *,
+    backend: str = "numpy",
+    cse: bool = True,
+    cache: bool | CompileCache = True,
+    normals: bool = False,
+) -> CompiledExpression:
+    """Compile a vector of SymPy expressions into a callable.
+
+    ``backend`` selects the evaluator: ``"numpy"`` (default), ``"numexpr"``,
+    which evaluates each component as one fused, multithreaded numexpr
+    expression and falls back to numpy per component when numexpr cannot
+    represent it, or ``"numba"``, which JIT-compiles a parallel kernel into an
+    on-disk numba cache and falls back to numpy when numba cannot type the
+    expressions. The backend actually used is reported on the result; numba
+    results of two symbols also expose ``grid_kernel(u, v, out)``, which fills
+    a ``(len(u) * len(v), n)`` array straight from the 1D parameter axes.
+
+    With ``cse`` enabled, subterms shared across components (``sin(theta)``
+    in a sphere parametrization, say) are hoisted into temporaries so each is
+    evaluated once per call. The numexpr backend ignores it, since sharing
+    would reintroduce the full-size temporaries numexpr avoids.
+
+    Compiled evaluators are memoized on a structural fingerprint of the
+    expressions, symbols, and backend. ``cache`` may be ``False`` to bypass
+    memoization or a ``CompileCache`` to use instead of the process-wide one.
+
+    With ``normals`` the three position components are followed by the
+    unnormalized surface normal ``X_u x X_v``, where ``u`` and ``v`` are the
+    first two symbols. The partials come from the symbolic Jacobian and are
+    compiled into the same evaluator, so CSE shares their subterms with the
+    positions; the result has six components and ``normals`` set.
+    """
+
+    exprs = [sp.sympify(expr) for expr in exprs]
+    if normals:
+        exprs = [*exprs, *_normal_components(exprs, symbols)]
+    compiled = _compile(
+        exprs,
+        symbols,
+        vector=True,
+        backend=backend,
+        cse=cse,
+        cache=cache,
+    )
+    return replace(compiled, normals=True) if normals else compiled
+
+
+def supports_normals(exprs: list[sp.Expr], symbols: list[sp.Symbol]) -> bool:
+    """Whether ``compile_vector(exprs, symbols, normals=True)`` can succeed."""
+
+    if len(exprs) != 3 or len(symbols) < 2:
+        return False
+    jacobian = sp.Matrix(exprs).jacobian(list(symbols[:2]))
+    return not jacobian.has(sp.Derivative)
+
+
+def _normal_components(
     exprs: list[sp.Expr], symbols: list[sp.Symbol]
+) -> list[sp.Expr]:
+    if len(exprs) != 3 or len(symbols) < 2:
+        raise ValueError("normals need three components and two parameters")
+    jacobian = sp.Matrix(exprs).jacobian(list(symbols[:2]))
+    if jacobian.has(sp.Derivative):
+        raise ValueError("normals need components SymPy can differentiate")
+    return list(jacobian[:, 0].cross(jacobian[:, 1]))
+
+
+def _compile(
+    exprs: list[sp.Expr],
+    symbols: list[sp.Symbol],
+    *,
+    vector: bool,
+    backend: str,
+    cse: bool,
+    cache: bool | CompileCache,
+) -> CompiledExpression:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend}")
+    options = {"vector": vector, "backend": backend, "cse": cse}
+    key = fingerprint(
+        exprs, symbols, backend, vector=vector, cse=cse, revision=_CODEGEN_REVISION
+    )
+    if cache is False:
+        return _build(exprs, symbols, key, None, **options)
+
+    store = cache if isinstance(cache, CompileCache) else get_compile_cache()
+    compiled = store.get(key)
+    if compiled is not None:
+        return compiled
+    compiled = _build(exprs, symbols, key, store, **options)
+    store.put(key, compiled)
+    return compiled
+
+
+def _build(
+    exprs: list[sp.Expr],
+    symbols: list[sp.Symbol],
+    key: str,
+    store: CompileCache | None,
+    **options: Any,
+) -> CompiledExpression:
+    backend = options["backend"]
+    if backend != "numba":
+        source = _cached_source(exprs, symbols, key, store, **options)
+        return _from_source(source, symbols, backend)
+    try:
+        source = _cached_source(exprs, symbols, key, store, **options)
+        return _from_module(source, symbols, _numba_module_path(key, store))
+    except Exception as exc:  # sympy and numba report failures with many types
+        logger.debug("numba fallback for %s: %s", exprs, exc)
+    source = _generate_source(exprs, symbols, **{**options, "backend": "numpy"})
+    return _from_source(source, symbols, "numpy")
+
+
+def _cached_source(
+    exprs: list[sp.Expr],
+    symbols: list[sp.Symbol],
+    key: str,
+    store: CompileCache | None,
+    **options: Any,
+) -> str:
+    source = store.load_source(key) if store is not None else None
+    if source is None:
+        source = _generate_source(exprs, symbols, **options)
+        if store is not None:
+            store.store_source(key, source)
+    return source
+
+
+def _generate_source(
+    exprs: list[sp.Expr],
+    symbols: list[sp.Symbol],
+    *,
+    vector: bool,
+    backend: str,
+    cse: bool,
+) -> str:
+    args, replacements = _argument_names(symbols)
+    exprs = [expr.xreplace(replacements) for expr in exprs]
+    if backend == "numba":
+        return _numba_module_source(exprs, args, vector=vector, cse=cse)
+    if backend == "numexpr":
+        lines, components = _numexpr_body(exprs, args)
+    else:
+        lines, components = _numpy_body(exprs, args, cse=cse)
+    values = [_component_value(kind, code) for kind, code in components]
+    body = f"[{', '.join(values)}]" if vector else values[0]
+    targets = (
+        [f"_out[..., {idx}]" for idx in range(len(components))]
+        if vector
+        else ["_out"]
+    )
+    writes = [
+        _component_write(kind, code, target)
+        for (kind, code), target in zip(components, targets, strict=True)
+    ]
+    return "\n".join(
+        [
+            f"{_COMPONENTS_TAG} {' '.join(kind for kind, _ in components)}",
+            f"def {_FUNC_NAME}({', '.join(args)}):",
+            *lines,
+            f"    return {body}",
+            "",
+            "",
+            f"def {_INTO_NAME}({', '.join(['_out', *args])}):",
+            *lines,
+            *(f"    {write}" for write in writes),
+            "",
+        ]
+    )
+
+
+def _component_value(kind: str, code: str) -> str:
+    if kind == "numexpr":
+        return f"evaluate({code!r}, local_dict=_env)"
+    return code
+
+
+def _component_write(kind: str, code: str, target: str) -> str:
+    if kind == "numexpr":
+        return (
+            f"evaluate({code!r}, local_dict=_env, out={target}, "
+            'casting="same_kind")'
+        )
+    return f'numpy.copyto({target}, {code}, casting="same_kind")'
+
+
+def _numpy_body(
+    exprs: list[sp.Expr], args: list[str], *, cse: bool
+) -> tuple[list[str], list[tuple[str, str]]]:
+    assignments, exprs = _eliminate_common_subexpressions(exprs, enabled=cse)
+    assignments, exprs = _separate_variables(assignments, exprs, args)
+    printer = _numpy_printer()
+    lines = [f"    {temp} = {printer.doprint(value)}" for temp, value in assignments]
+    components = [("numpy", printer.doprint(expr)) for expr in exprs]
+    return _module_imports(printer) + lines, components
+
+
+def _numexpr_body(
+    exprs: list[sp.Expr], args: list[str]
+) -> tuple[list[str], list[tuple[str, str]]]:
+    # Single-variable temporaries and components are evaluated by numpy on
+    # the broadcast axes; numexpr only sees the terms that need the full grid.
+    separable = [len(expr.free_symbols) <= 1 for expr in exprs]
+    assignments, exprs = _separate_variables([], exprs, args)
+    numpy_printer = _numpy_printer()
+    temps = [
+        f"    {temp} = {numpy_printer.doprint(value)}" for temp, value in assignments
+    ]
+    names = [*args, *(str(temp) for temp, _ in assignments)]
+    env = ", ".join(f"{name!r}: {name}" for name in names)
+    components: list[tuple[str, str]] = []
+    for expr, single in zip(exprs, separable, strict=True):
+        text = None if single else _numexpr_string(expr, names)
+        if text is None:
+            components.append(("numpy", numpy_printer.doprint(expr)))
+        else:
+            components.append(("numexpr", text))
+    lines = [*_module_imports(numpy_printer), *temps, f"    _env = {{{env}}}"]
+    return lines, components
+
+
+def _numexpr_string(expr: sp.Expr, args: list[str]) -> str | None:
+    import numexpr
+
+    try:
+        text = _NumExprStringPrinter()._print(expr)
+    except TypeError as exc:
+        logger.debug("numexpr fallback for %s: %s", expr, exc)
+        return None
+    probe = {name: np.ones(1, dtype=np.float64) for name in args}
+    try:
+        numexpr.evaluate(text, local_dict=probe)
+    except Exception as exc:  # numexpr raises several error types on parse
+        logger.debug("numexpr fallback for %s: %s", expr, exc)
+        return None
+    return text
+
+
+def _numba_module_source(
+    exprs: list[sp.Expr], args: list[str], *, vector: bool, cse: bool
+) -> str:
+    if not args:
+        raise ValueError("numba backend needs at least one symbol")
+    assignments, exprs = _eliminate_common_subexpressions(exprs, enabled=cse)
+    assignments, exprs = _separate_variables(assignments, exprs, args)
+    printer = PythonCodePrinter({"fully_qualified_modules": True})
+    point_lines = [
+        f"    {temp} = {printer.doprint(value)}" for temp, value in assignments
+    ]
+    printed = ", ".join(printer.doprint(expr) for expr in exprs)
+    count = len(exprs)
+    axes = [f"_a{idx}" for idx in range(len(args))]
+    writes = [f"out[_k, {idx}] = _r[{idx}]" for idx in range(count)]
+    lines = [
+        f"{_COMPONENTS_TAG} {' '.join(['numba'] * count)}",
+        *(f"import {name}" for name in sorted(printer.module_imports)),
+        "",
+        "import numpy",
+        "from numba import njit, prange",
+        "",
+        "",
+        f"@njit({_JIT_OPTIONS})",
+        f"def {_POINT_NAME}({', '.join(args)}):",
+        *point_lines,
+        f"    return ({printed},)",
+        "",
+        "",
+        f"@njit({_JIT_OPTIONS}, parallel=True)",
+        f"def {_POINTS_NAME}({', '.join(axes)}, out):",
+        "    for _k in prange(out.shape[0]):",
+        f"        _r = {_POINT_NAME}({', '.join(f'{axis}[_k]' for axis in axes)})",
+        *(f"        {write}" for write in writes),
+    ]
+    if len(args) == 2:
+        # Values depending only on the first axis are hoisted out of the
+        # inner loop, so they are evaluated once per row.
+        results = [(sp.Symbol(f"_r{idx}"), expr) for idx, expr in enumerate(exprs)]
+        outer, inner = _split_by_axis([*assignments, *results], args[0])
+        lines += [
+            "",
+            "",
+            f"@njit({_JIT_OPTIONS}, parallel=True)",
+            f"def {_GRID_NAME}(_a0, _a1, out):",
+            "    _n1 = _a1.shape[0]",
+            "    for _i in prange(_a0.shape[0]):",
+            f"        {args[0]} = _a0[_i]",
+            *(f"        {temp} = {printer.doprint(value)}" for temp, value in outer),
+            "        for _j in range(_n1):",
+            f"            {args[1]} = _a1[_j]",
+            *(
+                f"            {temp} = {printer.doprint(value)}"
+                for temp, value in inner
+            ),
+            "            _k = _i * _n1 + _j",
+            *(f"            out[_k, {idx}] = _r{idx}" for idx in range(count)),
+        ]
+    flat = ", ".join(f"{axis}.ravel()" for axis in axes)
+    result = (
+        f"[_out[:, _c].reshape(_shape) for _c in range({count})]"
+        if vector
+        else "_out[:, 0].reshape(_shape)"
+    )
+    lines += [
+        "",
+        "",
+        f"def {_FUNC_NAME}({', '.join(args)}):",
+        f"    {', '.join(axes)}, = numpy.broadcast_arrays(",
+        *(f"        numpy.asarray({name}, dtype=numpy.float64)," for name in args),
+        "    )",
+        "    _shape = _a0.shape",
+        f"    _out = numpy.empty((_a0.size, {count}))",
+        f"    {_POINTS_NAME}({flat}, _out)",
+        f"    return {result}",
+        "",
+        "",
+        f"def {_INTO_NAME}(_out, {', '.join(args)}):",
+        f"    {', '.join(axes)}, = numpy.broadcast_arrays(",
+        *(f"        numpy.asarray({name}, dtype=numpy.float64)," for name in args),
+        "    )",
+        f"    _target = _out.reshape(_a0.size, {count})",
+        f"    {_POINTS_NAME}({flat}, _target)",
+        "    if not numpy.shares_memory(_target, _out):",
+        "        _out[...] = _target.reshape(_out.shape)",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+class _NumExprStringPrinter(NumExprPrinter):
+    """Print bare numexpr expressions with numeric constants inlined."""
+
+    def _print(self, expr: Any, **kwargs: Any) -> str:
+        if isinstance(expr, sp.NumberSymbol):
+            return repr(float(expr))
+        return super()._print(expr, **kwargs)
+
+    def _print_Float(self, expr: sp.Float) -> str:
+        return repr(float(expr))
+
+    def _print_Max(self, expr: sp.Expr) -> str:
+        return self._print_extremum(expr, ">=")
+
+    def _print_Min(self, expr: sp.Expr) -> str:
+        return self._print_extremum(expr, "<=")
+
+    def _print_extremum(self, expr: sp.Expr, op: str) -> str:
+        text = self._print(expr.args[0])
+        for arg in expr.args[1:]:
+            other = self._print(arg)
+            text = f"where(({text}) {op} ({other}), {text}, {other})"
+        return text
+
+
+def _eliminate_common_subexpressions(
+    exprs: list[sp.Expr], *, enabled: bool
+) -> tuple[list[tuple[sp.Symbol, sp.Expr]], list[sp.Expr]]:
+    if not enabled:
+        return [], exprs
+    temps = sp.numbered_symbols("_c")
+    assignments, reduced = sp.cse(exprs, symbols=temps, optimizations="basic")
+    return assignments, list(reduced)
+
+
+def _separate_variables(
+    assignments: list[tuple[sp.Symbol, sp.Expr]],
+    exprs: list[sp.Expr],
+    args: list[str],
+) -> tuple[list[tuple[sp.Symbol, sp.Expr]], list[sp.Expr]]:
+    """Hoist single-variable parts of multi-variable terms into temporaries.
+
+    In a sum or product over several arguments the terms that depend on the
+    same single argument are grouped into one temporary, e.g.
+    ``u*v*sin(u)`` becomes ``_s0 = u*sin(u)`` and ``_s0*v``. Evaluated on
+    broadcast axes the temporaries stay one-dimensional, and only the final
+    combination runs over the full grid.
+    """
+
+    deps: dict[sp.Symbol, frozenset[sp.Symbol]] = {
+        sp.Symbol(name): frozenset({sp.Symbol(name)}) for name in args
+    }
+    temps = sp.numbered_symbols("_s")
+    hoisted: list[tuple[sp.Symbol, sp.Expr]] = []
+
+    def variables(expr: sp.Basic) -> frozenset[sp.Symbol]:
+        found = (deps.get(symbol, frozenset()) for symbol in expr.free_symbols)
+        return frozenset().union(*found)
+
+    def hoist(expr: sp.Expr) -> sp.Expr:
+        if expr.is_Atom:
+            return expr
+        temp = next(temps)
+        deps[temp] = variables(expr)
+        hoisted.append((temp, expr))
+        return temp
+
+    def split(expr: sp.Basic) -> sp.Basic:
+        if expr.is_Atom or len(variables(expr)) <= 1:
+            return expr
+        if not isinstance(expr, (sp.Add, sp.Mul)):
+            return expr.func(
+                *(
+                    hoist(arg)
+                    if isinstance(arg, sp.Expr) and len(variables(arg)) <= 1
+                    else split(arg)
+                    for arg in expr.args
+                )
+            )
+        groups: dict[frozenset[sp.Symbol], list[sp.Basic]] = {}
+        rest: list[sp.Basic] = []
+        for arg in expr.args:
+            found = variables(arg)
+            if len(found) > 1:
+                rest.append(split(arg))
+            else:
+                groups.setdefault(found, []).append(arg)
+        constants = groups.pop(frozenset(), [])
+        parts = list(groups.values())
+        if parts:
+            parts[0] = constants + parts[0]
+        else:
+            rest.extend(constants)
+        rest.extend(hoist(expr.func(*part)) for part in parts)
+        return expr.func(*rest)
+
+    separated: list[tuple[sp.Symbol, sp.Expr]] = []
+    for temp, value in assignments:
+        value = split(value)
+        separated += hoisted
+        hoisted.clear()
+        deps[temp] = variables(value)
+        separated.append((temp, value))
+    reduced = []
+    for expr in exprs:
+        reduced.append(split(expr))
+        separated += hoisted
+        hoisted.clear()
+    return separated, reduced
+
+
+def _split_by_axis(
+    assignments: list[tuple[sp.Symbol, sp.Expr]], outer: str
+) -> tuple[list[tuple[sp.Symbol, sp.Expr]], list[tuple[sp.Symbol, sp.Expr]]]:
+    """Partition ordered assignments into those needing only ``outer`` and the rest."""
+
+    inner_symbols: set[sp.Symbol] = set()
+    hoisted, remaining = [], []
+    for temp, value in assignments:
+        symbols = {symbol for symbol in value.free_symbols if symbol.name != outer}
+        local = {symbol for symbol in symbols if symbol.name.startswith("_x")}
+        if local or symbols & inner_symbols:
+            inner_symbols.add(temp)
+            remaining.append((temp, value))
+        else:
+            hoisted.append((temp, value))
+    return hoisted, remaining
+
+
+def _argument_names(
+    symbols: list[sp.Symbol],
+) -> tuple[list[str], dict[sp.Symbol, sp.Symbol]]:
+    args = [f"_x{idx}" for idx in range(len(symbols))]
+    replacements = {
+        sp.sympify(symbol): sp.Symbol(name)
+        for symbol, name in zip(symbols, args, strict=True)
+    }
+    return args, replacements
+
+
+def _numpy_printer() -> NumPyPrinter:
+    # Match lambdify: unknown functions print by name instead of raising.
+    return NumPyPrinter(
+        {"fully_qualified_modules": True, "allow_unknown_functions": True}
+    )
+
+
+def _module_imports(printer: NumPyPrinter) -> list[str]:
+    # Helpers such as ``functools.reduce`` (Max/Min) live outside numpy.
+    modules = sorted(name for name in printer.module_imports if name != "numpy")
+    return [f"    import {name}" for name in modules]
+
+
+def _namespace(backend: str) -> dict[str, Any]:
+    namespace: dict[str, Any] = {"numpy": np}
+    if backend == "numexpr":
+        import numexpr
+
+        namespace["evaluate"] = numexpr.evaluate
+    return namespace
+
+
+def _from_source(
+    source: str, symbols: list[sp.Symbol], backend: str, normals: bool = False
+) -> CompiledExpression:
+    namespace = _namespace(backend)
+    exec(compile(source, f"<geometrix:{backend}>", "exec"), namespace)
+    components = _parse_components(source)
+    if backend not in components:
+        backend = "numpy"
+    return CompiledExpression(
+        symbols=tuple(symbols),
+        func=namespace[_FUNC_NAME],
+        source=source,
+        backend=backend,
+        component_backends=components,
+        into=namespace.get(_INTO_NAME),
+        normals=normals,
+    )
+
+
+def _from_module(
+    source: str, symbols: list[sp.Symbol], path: Path, normals: bool = False
 ) -> CompiledExpression:
-    """Compile a vector of SymPy expressions into a callable."""
+    # numba only caches functions defined in real files, so the generated
+    # kernels are imported from ``path`` rather than exec'd from a string.
+    if not path.is_file() or path.read_text(encoding="utf-8") != source:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(source, encoding="utf-8")
+        tmp_path.replace(path)
+    module = sys.modules.get(path.stem)
+    if module is None or getattr(module, "__file__", None) != str(path):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Cannot load generated kernel {path}")
+        module = importlib.util.module_from_spec(spec)
+        # numba's cache loader re-imports the defining module by name.
+        sys.modules[path.stem] = module
+        spec.loader.exec_module(module)
+    from numba import types
+
+    getattr(module, _POINT_NAME).compile((types.float64,) * len(symbols))
+    return CompiledExpression(
+        symbols=tuple(symbols),
+        func=getattr(module, _FUNC_NAME),
+        source=source,
+        backend="numba",
+        component_backends=_parse_components(source),
+        grid_kernel=getattr(module, _GRID_NAME, None),
+        into=getattr(module, _INTO_NAME, None),
+        normals=normals,
+    )
+
+
+def _numba_module_path(key: str, store: CompileCache | None) -> Path:
+    if store is not None and store.directory is not None:
+        directory = store.directory
+    else:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        directory = Path(cache_home) / "geometrix" / "numba"
+    return directory / key[:2] / f"gx_{key}.py"
+
 
-    func = sp.lambdify(symbols, exprs, modules=["numpy"])
-    return CompiledExpression(symbols=tuple(symbols), func=func)
+def _parse_components(source: str) -> tuple[str, ...]:
+    first_line = source.split("\n", 1)[0]
+    if not first_line.startswith(_COMPONENTS_TAG):
+        return ()
+    return tuple(first_line[len(_COMPONENTS_TAG) :].split())
@@ -0,0 +1,152 @@
+"""Vectorized interval bounds for SymPy expressions over boxes."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import numpy as np
+import sympy as sp
+
+Bounds = tuple[np.ndarray, np.ndarray]
+IntervalFunc = Callable[[np.ndarray, np.ndarray], Bounds]
+
+_MONOTONE = {
+    sp.exp: np.exp,
+    sp.log: np.log,
+    sp.tanh: np.tanh,
+    sp.atan: np.arctan,
+    sp.sinh: np.sinh,
+    sp.asinh: np.arcsinh,
+}
+
+
+def compile_interval(expr: sp.Expr, symbols: list[sp.Symbol]) -> IntervalFunc | None:
+    """Return a function bounding ``expr`` over axis-aligned boxes.
+
+    The returned callable takes ``lower`` and ``upper`` arrays of shape
+    ``(n, len(symbols))`` and returns ``(lo, hi)`` arrays of shape ``(n,)``
+    enclosing the expression's range on each box. Bounds are conservative
+    (natural interval extension), so ``lo > c`` proves ``expr > c`` on the
+    box. Returns ``None`` when the expression uses an unsupported function.
+    """
+
+    expr = sp.sympify(expr)
+    index = {sp.sympify(symbol): idx for idx, symbol in enumerate(symbols)}
+    try:
+        _check(expr, index)
+    except NotImplementedError:
+        return None
+
+    def bounds(lower: np.ndarray, upper: np.ndarray) -> Bounds:
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        with np.errstate(all="ignore"):
+            lo, hi = _interval(expr, index, lower, upper)
+        shape = lower.shape[:1]
+        return _widen(np.broadcast_to(lo, shape), np.broadcast_to(hi, shape))
+
+    return bounds
+
+
+def _check(expr: sp.Basic, index: dict[sp.Basic, int]) -> None:
+    if expr.is_Number or expr.is_NumberSymbol or expr in index:
+        return
+    if isinstance(expr, sp.Pow) and not expr.exp.is_Number:
+        raise NotImplementedError(expr)
+    if not isinstance(
+        expr, (sp.Add, sp.Mul, sp.Pow, sp.sin, sp.cos, sp.Abs, *_MONOTONE)
+    ):
+        raise NotImplementedError(expr)
+    for arg in expr.args:
+        _check(arg, index)
+
+
+def _interval(
+    expr: sp.Basic, index: dict[sp.Basic, int], lower: np.ndarray, upper: np.ndarray
+) -> Bounds:
+    if expr in index:
+        return lower[:, index[expr]], upper[:, index[expr]]
+    if expr.is_Number or expr.is_NumberSymbol:
+        value = np.float64(float(expr))
+        return value, value
+    args = [_interval(arg, index, lower, upper) for arg in expr.args]
+    if isinstance(expr, sp.Add):
+        return sum(lo for lo, _ in args), sum(hi for _, hi in args)
+    if isinstance(expr, sp.Mul):
+        lo, hi = args[0]
+        for other_lo, other_hi in args[1:]:
+            lo, hi = _widen(*_product(lo, hi, other_lo, other_hi))
+        return lo, hi
+    if isinstance(expr, sp.Pow):
+        return _power(*args[0], expr.exp)
+    if isinstance(expr, sp.sin):
+        return _sine(*args[0])
+    if isinstance(expr, sp.cos):
+        lo, hi = args[0]
+        return _sine(lo + np.pi / 2, hi + np.pi / 2)
+    if isinstance(expr, sp.Abs):
+        lo, hi = args[0]
+        low = np.where(lo >= 0, lo, np.where(hi <= 0, -hi, 0.0))
+        return low, np.maximum(np.abs(lo), np.abs(hi))
+    func = _MONOTONE[type(expr)]
+    lo, hi = args[0]
+    return func(lo), func(hi)
+
+
+def _product(
+    lo: np.ndarray, hi: np.ndarray, other_lo: np.ndarray, other_hi: np.ndarray
+) -> Bounds:
+    candidates = np.stack(
+        np.broadcast_arrays(lo * other_lo, lo * other_hi, hi * other_lo, hi * other_hi)
+    )
+    return candidates.min(axis=0), candidates.max(axis=0)
+
+
+def _power(lo: np.ndarray, hi: np.ndarray, exponent: sp.Number) -> Bounds:
+    power = float(exponent)
+    if power == int(power):
+        # Float exponents such as 2.0 keep the integer power's sign handling.
+        n = int(power)
+        if n < 0:
+            # Reciprocal first; unbounded when the base interval spans zero.
+            spans_zero = (lo <= 0) & (hi >= 0)
+            lo, hi = (
+                np.where(spans_zero, -np.inf, 1.0 / hi),
+                np.where(spans_zero, np.inf, 1.0 / lo),
+            )
+            n = -n
+        if n % 2:
+            return lo**n, hi**n
+        low = np.where(lo >= 0, lo**n, np.where(hi <= 0, hi**n, 0.0))
+        return low, np.maximum(lo**n, hi**n)
+    # Fractional powers of a negative base have no real bound to offer, so
+    # boxes where the base can go negative stay unbounded.
+    negative = lo < 0
+    lo, hi = np.maximum(lo, 0.0), np.maximum(hi, 0.0)
+    if power > 0:
+        low, high = lo**power, hi**power
+    else:
+        low, high = hi**power, lo**power
+    return np.where(negative, -np.inf, low), np.where(negative, np.inf, high)
+
+
+def _sine(lo: np.ndarray, hi: np.ndarray) -> Bounds:
+    low = np.minimum(np.sin(lo), np.sin(hi))
+    high = np.maximum(np.sin(lo), np.sin(hi))
+    # An extremum x = pi/2 + 2k pi (max) or -pi/2 + 2k pi (min) inside the box.
+    has_max = np.ceil((lo - np.pi / 2) / (2 * np.pi)) <= np.floor(
+        (hi - np.pi / 2) / (2 * np.pi)
+    )
+    has_min = np.ceil((lo + np.pi / 2) / (2 * np.pi)) <= np.floor(
+        (hi + np.pi / 2) / (2 * np.pi)
+    )
+    unbounded = ~(np.isfinite(lo) & np.isfinite(hi))
+    return (
+        np.where(has_min | unbounded, -1.0, low),
+        np.where(has_max | unbounded, 1.0, high),
+    )
+
+
+def _widen(lo: np.ndarray, hi: np.ndarray) -> Bounds:
+    # NaNs come from inf - inf or 0 * inf; treat them as unbounded.
+    return np.where(np.isnan(lo), -np.inf, lo), np.where(np.isnan(hi), np.inf, hi)
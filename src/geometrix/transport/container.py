@@ -0,0 +1,74 @@
+"""Binary scene container: a JSON header over one aligned byte blob."""
+
+from __future__ import annotations
+
+import base64
+import zlib
+from typing import Any
+
+import numpy as np
+
+CONTAINER_COMPRESSIONS = ("deflate",)
+
+# Offsets are multiples of the widest supported element so that every buffer
+# can be viewed in place as a typed array.
+_ALIGN = 8
+
+
+def pack_buffers(
+    arrays: dict[str, np.ndarray],
+    *,
+    compression: str | None = None,
+    level: int = 6,
+) -> dict[str, Any]:
+    """Pack arrays into a single blob described by a small header.
+
+    Every array is copied once into a contiguous blob at an 8-byte aligned
+    offset. The header records each buffer's ``dtype``, ``shape``, byte
+    ``offset`` and byte ``length`` within the (uncompressed) blob, plus the
+    total ``byte_length``. With ``compression="deflate"`` the blob is zlib
+    compressed at ``level``. ``data`` holds the blob as base64, the only
+    binary-safe encoding for a text HTML payload, decoded once in bulk.
+    """
+
+    if compression is not None and compression not in CONTAINER_COMPRESSIONS:
+        raise ValueError(f"Unsupported container compression: {compression}")
+    buffers: dict[str, Any] = {}
+    size = 0
+    for key, array in arrays.items():
+        array = np.asarray(array)
+        buffers[key] = {
+            "dtype": str(array.dtype),
+            "shape": list(array.shape),
+            "offset": size,
+            "length": array.nbytes,
+        }
+        size += -(-array.nbytes // _ALIGN) * _ALIGN
+
+    blob = bytearray(size)
+    for key, array in arrays.items():
+        spec = buffers[key]
+        view = np.frombuffer(blob, np.uint8, spec["length"], spec["offset"])
+        view[:] = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+    data = zlib.compress(blob, level) if compression else bytes(blob)
+    return {
+        "compression": compression,
+        "byte_length": size,
+        "buffers": buffers,
+        "data": base64.b64encode(data).decode("ascii"),
+    }
+
+
+def unpack_buffers(container: dict[str, Any]) -> dict[str, np.ndarray]:
+    """Read-only array views onto the blob of a ``pack_buffers`` container."""
+
+    data = base64.b64decode(container["data"])
+    if container["compression"] == "deflate":
+        data = zlib.decompress(data)
+    arrays = {}
+    for key, spec in container["buffers"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = spec["length"] // dtype.itemsize
+        array = np.frombuffer(data, dtype, count, spec["offset"])
+        arrays[key] = array.reshape(spec["shape"])
+    return arrays
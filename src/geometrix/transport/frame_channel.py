@@ -0,0 +1,37 @@
+"""Widget carrying one viewer's animation frames over its comm."""
+
+from __future__ import annotations
+
+from importlib import resources
+from typing import Any
+
+import anywidget
+import traitlets
+
+from geometrix.animation import Animation
+from geometrix.transport.frame_stream import handle_request
+
+
+class FrameChannel(anywidget.AnyWidget):
+    """Invisible widget serving ``animation`` to the viewer ``viewer``.
+
+    Its front end (``templates/frame_channel.js``) publishes the widget
+    model under ``window.geometrixChannels[viewer]``; the viewer sends
+    ``{"frames": [...]}`` requests through it and gets one custom message
+    with binary buffers back per frame (see ``frame_message``).
+    """
+
+    _esm = (
+        resources.files("geometrix.transport")
+        .joinpath("templates", "frame_channel.js")
+        .read_text(encoding="utf-8")
+    )
+    viewer = traitlets.Unicode("").tag(sync=True)
+
+    def __init__(self, animation: Animation, viewer: str) -> None:
+        super().__init__(viewer=viewer)
+        self.animation = animation
+        self.on_msg(self._on_request)
+
+    def _on_request(self, _widget: Any, content: Any, _buffers: Any) -> None:
+        handle_request(self, self.animation, content)
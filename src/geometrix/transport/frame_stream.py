@@ -0,0 +1,85 @@
+"""On-demand delivery of animation frames over a Jupyter widget comm."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from geometrix.animation import Animation
+
+# Channels kept open for viewers that may still request frames; the oldest
+# is closed once more are open.
+_MAX_CHANNELS = 16
+_CHANNELS: OrderedDict[str, Any] = OrderedDict()
+
+
+def serve_frames(
+    animation: Animation, viewer_id: str, *, window: int = 8
+) -> tuple[dict[str, Any], Any] | None:
+    """Serve ``animation`` to the viewer ``viewer_id`` over a widget comm.
+
+    Returns the ``frame_stream`` spec the viewer reads and the
+    ``FrameChannel`` widget carrying the frames, which has to be displayed
+    next to the viewer (``show`` does). The viewer keeps at most ``window``
+    decoded frames ahead of the playhead. Widgets work in every Jupyter
+    frontend, so the frames need not be embedded as well. Returns ``None``
+    outside a kernel, in which case they have to be.
+    """
+
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    if not _in_kernel() or not animation.frames:
+        return None
+    from geometrix.transport.frame_channel import FrameChannel
+
+    channel = FrameChannel(animation, viewer_id)
+    previous = _CHANNELS.pop(viewer_id, None)
+    if previous is not None:
+        previous.close()
+    _CHANNELS[viewer_id] = channel
+    while len(_CHANNELS) > _MAX_CHANNELS:
+        _CHANNELS.popitem(last=False)[1].close()
+    spec = {
+        "viewer": viewer_id,
+        "frame_count": len(animation.frames),
+        "window": min(window, len(animation.frames)),
+    }
+    return spec, channel
+
+
+def frame_message(
+    animation: Animation, index: int
+) -> tuple[dict[str, Any], list[memoryview]]:
+    """Comm message for frame ``index``: array metadata plus binary buffers."""
+
+    if not 0 <= index < len(animation.frames):
+        raise ValueError(f"Frame index out of range: {index}")
+    keys = []
+    buffers = []
+    for key, values in animation.frames[index].arrays.items():
+        array = np.ascontiguousarray(values)
+        keys.append({"key": key, "dtype": str(array.dtype), "shape": list(array.shape)})
+        buffers.append(memoryview(array).cast("B"))
+    return {"index": index, "keys": keys}, buffers
+
+
+def handle_request(channel: Any, animation: Animation, data: dict[str, Any]) -> None:
+    """Answer a viewer's ``{"frames": [...]}`` request, one message per frame."""
+
+    for index in data.get("frames", []):
+        try:
+            content, buffers = frame_message(animation, int(index))
+        except ValueError as exc:
+            channel.send({"index": index, "error": str(exc)})
+            continue
+        channel.send(content, buffers=buffers)
+
+
+def _in_kernel() -> bool:
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return False
+    return getattr(get_ipython(), "kernel", None) is not None
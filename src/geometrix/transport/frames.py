@@ -0,0 +1,138 @@
+"""Compact encoding of animation frames for the HTML transport."""
+
+from __future__ import annotations
+
+import base64
+import zlib
+from typing import Any
+
+import numpy as np
+
+from geometrix.animation import Animation
+
+FRAME_CODECS = ("delta",)
+
+# Quantized values span the full uint16 range over each buffer's bounding box.
+_LEVELS = (1 << 16) - 1
+
+
+def encode_delta_frames(animation: Animation, *, level: int = 6) -> dict[str, Any]:
+    """Encode frames as a quantized keyframe plus per-frame deltas.
+
+    Each buffer is quantized to uint16 against its per-component bounding box
+    over all frames. Frame 0 stores the quantized values; later frames store
+    the difference from the previous frame modulo 2**16 (an int16 delta, so
+    decoding is exact integer arithmetic with no drift), and buffers whose
+    quantized values did not change are left out of the frame. Sections are
+    laid out one component at a time with low and high bytes split into
+    separate planes, which lets deflate (run once over all sections at
+    ``level``) find the runs that small deltas leave in the high bytes.
+
+    The result maps ``buffers`` to each buffer's dtype, shape, ``offset`` and
+    ``scale`` (``value = offset + q * scale`` per component), ``frames`` to
+    the byte offset of every stored section in the inflated ``data``, and
+    ``data`` to the base64 zlib stream.
+    """
+
+    if not animation.frames:
+        raise ValueError("animation has no frames")
+    keys = list(animation.frames[0].arrays)
+    buffers = {key: _quantization(animation, key) for key in keys}
+
+    sections: list[bytes] = []
+    frames: list[dict[str, int]] = []
+    previous: dict[str, np.ndarray] = {}
+    size = 0
+    for idx, frame in enumerate(animation.frames):
+        entry: dict[str, int] = {}
+        for key in keys:
+            current = _quantize(frame.arrays[key], buffers[key])
+            # Wrapping uint16 subtraction: the int16 delta modulo 2**16.
+            section = current - previous[key] if idx else current
+            previous[key] = current
+            if idx and not section.any():
+                continue
+            entry[key] = size
+            sections.append(_pack(section))
+            size += section.nbytes
+        frames.append(entry)
+
+    data = zlib.compress(b"".join(sections), level)
+    return {
+        "codec": "delta",
+        "frame_count": len(frames),
+        "buffers": buffers,
+        "frames": frames,
+        "data": base64.b64encode(data).decode("ascii"),
+    }
+
+
+def _quantization(animation: Animation, key: str) -> dict[str, Any]:
+    """Per-component bounding box of buffer ``key`` over all frames."""
+
+    first = np.asarray(animation.frames[0].arrays[key])
+    components = first.shape[-1] if first.ndim > 1 else 1
+    low = np.full(components, np.inf)
+    high = np.full(components, -np.inf)
+    for frame in animation.frames:
+        planar = _planar(frame.arrays[key], components)
+        low = np.fmin(low, np.nanmin(planar, axis=1, initial=np.inf))
+        high = np.fmax(high, np.nanmax(planar, axis=1, initial=-np.inf))
+    low = np.where(np.isfinite(low), low, 0.0)
+    span = np.where(np.isfinite(high), high - low, 0.0)
+    return {
+        "dtype": str(first.dtype),
+        "shape": list(first.shape),
+        "offset": low.tolist(),
+        "scale": np.where(span > 0, span / _LEVELS, 1.0).tolist(),
+    }
+
+
+def _planar(values: Any, components: int) -> np.ndarray:
+    """``(components, n)`` copy of interleaved values, one row per component."""
+
+    return np.ascontiguousarray(np.asarray(values).reshape(-1, components).T)
+
+
+def _quantize(values: Any, spec: dict[str, Any]) -> np.ndarray:
+    planar = _planar(values, len(spec["offset"]))
+    offset = np.array(spec["offset"])[:, None]
+    levels = (planar - offset) / np.array(spec["scale"])[:, None]
+    levels = np.clip(np.rint(np.nan_to_num(levels)), 0, _LEVELS)
+    return levels.astype(np.uint16)
+
+
+def _pack(section: np.ndarray) -> bytes:
+    """Planar uint16 values as a plane of low bytes followed by high bytes."""
+
+    return np.ascontiguousarray(section.view(np.uint8).reshape(-1, 2).T).tobytes()
+
+
+def _unpack(raw: bytes, offset: int, count: int, components: int) -> np.ndarray:
+    planes = np.frombuffer(raw, np.uint8, 2 * count, offset).reshape(2, count)
+    planar = planes[0].astype(np.uint16) | planes[1].astype(np.uint16) << 8
+    return planar.reshape(components, -1)
+
+
+def decode_delta_frames(encoded: dict[str, Any]) -> list[dict[str, np.ndarray]]:
+    """Rebuild per-frame arrays from ``encode_delta_frames`` output.
+
+    Frames that left a buffer out reuse the previous frame's array.
+    """
+
+    raw = zlib.decompress(base64.b64decode(encoded["data"]))
+    state: dict[str, np.ndarray] = {}
+    decoded: list[dict[str, np.ndarray]] = []
+    current: dict[str, np.ndarray] = {}
+    for idx, entry in enumerate(encoded["frames"]):
+        for key, offset in entry.items():
+            spec = encoded["buffers"][key]
+            components = len(spec["offset"])
+            count = int(np.prod(spec["shape"]))
+            section = _unpack(raw, offset, count, components)
+            state[key] = state[key] + section if idx else section
+            values = state[key].T * np.array(spec["scale"])
+            values += np.array(spec["offset"])
+            current[key] = values.astype(spec["dtype"]).reshape(spec["shape"])
+        decoded.append(dict(current))
+    return decoded
@@ -3,35 +3,88 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
+import logging
+import re
+import sys
+import uuid
+import zlib
+from collections.abc import Sequence
 from dataclasses import dataclass
+from functools import lru_cache
 from importlib import resources
 from typing import Any
 
 import numpy as np
 
-from geometrix.animation import Animation
+from geometrix.animation import Animation, Frame
+from geometrix.scene.build import dedupe_buffers
+from geometrix.scene.grid import derive_arrays
+from geometrix.scene.quantize import encode_arrays
 from geometrix.scene.spec import SceneSpec
+from geometrix.transport.container import CONTAINER_COMPRESSIONS, pack_buffers
+from geometrix.transport.frame_stream import serve_frames
+from geometrix.transport.frames import FRAME_CODECS, encode_delta_frames
+
+VIEWER_BUNDLE = "viewer.min.js"
+THREE_VERSION = "0.168.0"
+
+# Vendored ES modules under templates/vendor, written by scripts/build_js.py
+# from the official npm release of three.js THREE_VERSION along with their
+# sha256 sums in VENDOR_CHECKSUMS. OrbitControls imports three.js from
+# "__THREE__", swapped for the URL the viewer loads three.js from.
+VENDOR_MODULES = {"three": "three.module.min.js", "orbit-controls": "OrbitControls.js"}
+VENDOR_CHECKSUMS = "SHA256SUMS"
+
+# Whether a viewer carrying the vendored modules has been rendered yet.
+_VENDOR_SENT = False
+
+logger = logging.getLogger("geometrix.transport")
+
+# Placeholders filled per render; __CSS__ and __SCRIPT__ are filled once.
+_PLACEHOLDERS = re.compile(r"(__HEIGHT__|__CONTAINER_ID__|__PAYLOAD__|__VENDOR__)")
 
 DEFAULT_TEMPLATE = """
-<div id="geometrix-container" style="width:100%;height:__HEIGHT__px;"></div>
+<div id="__CONTAINER_ID__" class="geometrix-container"
+  style="width:100%;height:__HEIGHT__px;"></div>
 <style>__CSS__</style>
 <script type="importmap">
 {
   "imports": {
-    "three": "https://cdn.jsdelivr.net/npm/three@0.163.0/build/three.module.js"
+    "three": "https://cdn.jsdelivr.net/npm/three@0.168.0/build/three.module.js"
   }
 }
 </script>
+__VENDOR__
 <script type="module">
 __SCRIPT__
 </script>
 """
 
+_TILE_SCRIPT = """
+(() => {
+  const viewerId = __VIEWER__;
+  const tile = __TILE__;
+  const viewer = (window.geometrixViewers || {})[viewerId];
+  if (viewer) {
+    viewer.applyTile(tile);
+    return;
+  }
+  const queue = (window.geometrixTileQueue = window.geometrixTileQueue || {});
+  (queue[viewerId] = queue[viewerId] || []).push(tile);
+})();
+"""
+
 
 @dataclass(frozen=True)
 class HtmlBundle:
     html: str
+    viewer_id: str = ""
+    # Widget streaming the animation frames; display it after ``html``.
+    channel: Any | None = None
+    # Whether ``html`` carries the vendored three.js modules.
+    vendor: bool = False
 
 
 def render_html(
@@ -39,45 +92,194 @@ def render_html(
     arrays: dict[str, np.ndarray],
     height: int = 420,
     animation: Animation | None = None,
+    viewer_id: str | None = None,
+    frame_codec: str | None = None,
+    stream_frames: bool = False,
+    compression: str | None = None,
+    inline_vendor: bool | None = None,
 ) -> HtmlBundle:
-    payload = _build_payload(scene, arrays, animation)
-    html = _build_html(payload, height)
-    return HtmlBundle(html=html)
+    """Render a scene to a self-contained HTML snippet.
+
+    Animation frames are embedded raw unless ``frame_codec`` names one of
+    ``FRAME_CODECS``; ``"delta"`` ships a quantized keyframe plus deflated
+    deltas that the viewer inflates and applies frame by frame. With
+    ``stream_frames`` the frames stay in the kernel and the viewer fetches
+    them through ``HtmlBundle.channel`` as it plays, with only the first
+    frame embedded as a still; outside a kernel they are all embedded.
+
+    Scene buffers are packed into one binary container (see
+    ``geometrix.transport.container``), deflated when ``compression`` is
+    ``"deflate"``.
+
+    The vendored three.js modules (when built, see ``VENDOR_MODULES``) are
+    inlined, deflated and inert, into the first viewer of a kernel session;
+    later viewers only carry their scene and reuse the page's copy, or the
+    CDN once that output is gone. ``inline_vendor`` forces them in
+    (``True``, for standalone HTML) or out (``False``, loading three.js from
+    the CDN).
+    """
+
+    if frame_codec is not None and frame_codec not in FRAME_CODECS:
+        raise ValueError(f"Unsupported frame codec: {frame_codec}")
+    if compression is not None and compression not in CONTAINER_COMPRESSIONS:
+        raise ValueError(f"Unsupported container compression: {compression}")
+    viewer_id = viewer_id or f"geometrix-{uuid.uuid4().hex[:12]}"
+    frame_stream = channel = None
+    if stream_frames and animation:
+        served = serve_frames(animation, viewer_id)
+        if served is not None:
+            frame_stream, channel = served
+    payload = _build_payload(
+        scene, arrays, animation, frame_codec, frame_stream, compression
+    )
+    vendor = _vendor_block(inline_vendor)
+    html = _build_html(payload, height, viewer_id, vendor)
+    return HtmlBundle(
+        html=html, viewer_id=viewer_id, channel=channel, vendor=bool(vendor)
+    )
+
+
+def render_tile_script(
+    viewer_id: str, key: str, start: int, array: np.ndarray, *, last: bool = False
+) -> str:
+    """Return JavaScript writing ``array`` into rows ``start:`` of buffer ``key``.
+
+    The script updates the viewer rendered with ``viewer_id`` in place. Tiles
+    that arrive before the viewer has loaded are queued and applied when it
+    registers; ``last`` marks the final tile, after which the grid and axes
+    are refit to the data.
+    """
+
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    tile = {
+        "key": key,
+        "start": int(start),
+        "dtype": str(array.dtype),
+        "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        "last": last,
+    }
+    return _TILE_SCRIPT.replace("__VIEWER__", json.dumps(viewer_id)).replace(
+        "__TILE__", json.dumps(tile)
+    )
 
 
 def _build_payload(
-    scene: SceneSpec, arrays: dict[str, np.ndarray], animation: Animation | None
+    scene: SceneSpec,
+    arrays: dict[str, np.ndarray],
+    animation: Animation | None,
+    frame_codec: str | None = None,
+    frame_stream: dict[str, Any] | None = None,
+    compression: str | None = None,
 ) -> dict[str, Any]:
-    buffers: dict[str, Any] = {}
-    for key, array in arrays.items():
-        data = base64.b64encode(array.tobytes()).decode("ascii")
-        buffers[key] = {
-            "dtype": str(array.dtype),
-            "shape": list(array.shape),
-            "data": data,
-        }
+    animated = list(animation.frames[0].arrays) if animation else []
+    for key in animated:
+        if key in scene.buffers and scene.buffers[key].encoding:
+            raise ValueError(f"Cannot animate encoded buffer: {key}")
+    arrays = encode_arrays(scene.buffers, derive_arrays(scene, arrays))
+    scene, arrays = dedupe_buffers(scene, arrays, keep=animated)
     payload = {
         "scene": _scene_to_dict(scene),
-        "buffers": buffers,
+        "container": pack_buffers(arrays, compression=compression),
     }
     if animation:
         payload["scene"]["animation"] = animation.to_spec()
-        payload["frames"] = _encode_frames(animation)
+        if frame_stream:
+            payload["frame_stream"] = frame_stream
+            # A still for viewers whose channel never connects.
+            payload["frames"] = _encode_frames(animation.frames[:1])
+        elif frame_codec == "delta":
+            payload["frame_codec"] = encode_delta_frames(animation)
+        else:
+            payload["frames"] = _encode_frames(animation.frames)
     return payload
 
 
-def _build_html(payload: dict[str, Any], height: int) -> str:
-    payload_json = json.dumps(payload)
-    css = _load_css()
-    template = _load_template()
-    script = _load_script()
-    script = script.replace("__PAYLOAD__", payload_json)
-    html = template.replace("__HEIGHT__", str(height))
-    html = html.replace("__CSS__", css)
-    html = html.replace("__SCRIPT__", script)
-    return html
+def _build_html(
+    payload: dict[str, Any], height: int, viewer_id: str, vendor: str = ""
+) -> str:
+    fill = {
+        "__HEIGHT__": str(height),
+        "__CONTAINER_ID__": viewer_id,
+        "__PAYLOAD__": json.dumps(payload),
+        "__VENDOR__": vendor,
+    }
+    # Literal chunks and placeholder names alternate; one join builds the page
+    # without re-copying the payload for every substitution.
+    parts = list(_template_parts())
+    parts[1::2] = [fill[name] for name in parts[1::2]]
+    return "".join(parts)
+
+
+@lru_cache(maxsize=1)
+def _template_parts() -> tuple[str, ...]:
+    """Page template with the static assets inlined, split at placeholders.
+
+    Even items are literal HTML, odd items the names of the per-render
+    placeholders in ``_PLACEHOLDERS``.
+    """
+
+    html = _load_template().replace("__CSS__", _load_css())
+    html = html.replace("__SCRIPT__", _load_script())
+    return tuple(_PLACEHOLDERS.split(html))
+
+
+def _vendor_block(inline: bool | None) -> str:
+    global _VENDOR_SENT
+    if inline is None:
+        # Colab renders every output in its own frame, so nothing is shared.
+        inline = not _VENDOR_SENT or "google.colab" in sys.modules
+    if not inline:
+        return ""
+    block = _load_vendor()
+    _VENDOR_SENT = _VENDOR_SENT or bool(block)
+    return block
+
+
+@lru_cache(maxsize=1)
+def _load_vendor() -> str:
+    try:
+        vendor_dir = resources.files("geometrix.transport") / "templates" / "vendor"
+    except Exception:
+        return ""
+    return _vendor_blocks(vendor_dir)
+
+
+def _vendor_blocks(vendor_dir: Any) -> str:
+    """Inert script blocks holding the deflated, base64 vendored modules.
 
+    Returns ``""`` unless every module in ``vendor_dir`` is present and
+    matches its sum in ``VENDOR_CHECKSUMS``, so unbuilt or edited vendor
+    files leave the viewer on the CDN.
+    """
 
+    try:
+        listed = (vendor_dir / VENDOR_CHECKSUMS).read_text(encoding="utf-8")
+        sources = {
+            name: (vendor_dir / filename).read_bytes()
+            for name, filename in VENDOR_MODULES.items()
+        }
+    except OSError:
+        return ""
+    sums = dict(
+        line.split()[::-1]
+        for line in listed.splitlines()
+        if line.strip() and not line.startswith("#")
+    )
+    blocks = []
+    for name, source in sources.items():
+        filename = VENDOR_MODULES[name]
+        if hashlib.sha256(source).hexdigest() != sums.get(filename):
+            logger.warning("Vendored %s does not match %s", filename, VENDOR_CHECKSUMS)
+            return ""
+        data = base64.b64encode(zlib.compress(source, 9)).decode("ascii")
+        blocks.append(
+            f'<script type="application/octet-stream" '
+            f'data-geometrix-module="{name}">{data}</script>'
+        )
+    return "\n".join(blocks)
+
+
+@lru_cache(maxsize=1)
 def _load_css() -> str:
     try:
         css_path = resources.files("geometrix.transport") / "html_ui.css"
@@ -89,6 +291,7 @@ def _load_css() -> str:
         return ""
 
 
+@lru_cache(maxsize=1)
 def _load_template() -> str:
     try:
         template_path = (
@@ -102,7 +305,35 @@ def _load_template() -> str:
         return DEFAULT_TEMPLATE
 
 
+@lru_cache(maxsize=1)
 def _load_script() -> str:
+    """The viewer script: the prebuilt bundle if current, else the sources."""
+
+    source = _script_sources()
+    try:
+        bundle_path = (
+            resources.files("geometrix.transport") / "templates" / VIEWER_BUNDLE
+        )
+        bundle = bundle_path.read_text(encoding="utf-8")
+    except Exception:
+        return source
+    header, _, body = bundle.partition("\n")
+    return body if header == _bundle_header(source) else source
+
+
+def bundle_script() -> str:
+    """Minified viewer script, as written to ``templates/viewer.min.js``.
+
+    ``scripts/build_js.py`` writes the bundle at build time. Its first line
+    records a digest of the source scripts, and the bundle is only used while
+    it matches them, so editing a script never renders a stale bundle.
+    """
+
+    source = _script_sources()
+    return f"{_bundle_header(source)}\n{_minify_script(source)}"
+
+
+def _script_sources() -> str:
     try:
         scripts_dir = (
             resources.files("geometrix.transport") / "templates" / "scripts"
@@ -118,6 +349,64 @@ def _load_script() -> str:
         return ""
 
 
+def _bundle_header(source: str) -> str:
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    return f"// geometrix viewer {digest}"
+
+
+def _minify_script(source: str) -> str:
+    """Drop indentation, blank lines and whole-line comments.
+
+    Line breaks are kept, so automatic semicolon insertion is unaffected,
+    and lines that start or end inside a template literal (GLSL chunks,
+    panel HTML) keep their whitespace byte for byte.
+    """
+
+    out = []
+    # Each entry is the brace depth of a ``${...}`` substitution, or None
+    # while inside the template text itself.
+    stack: list[int | None] = []
+    for line in source.splitlines():
+        starts_in_template = bool(stack) and stack[-1] is None
+        i, quote = 0, ""
+        while i < len(line):
+            char = line[i]
+            if stack and stack[-1] is None:
+                if char == "\\":
+                    i += 1
+                elif char == "`":
+                    stack.pop()
+                elif line.startswith("${", i):
+                    stack.append(0)
+                    i += 1
+            elif quote:
+                if char == "\\":
+                    i += 1
+                elif char == quote:
+                    quote = ""
+            elif line.startswith("//", i):
+                break
+            elif char in "'\"":
+                quote = char
+            elif char == "`":
+                stack.append(None)
+            elif stack and char == "{":
+                stack[-1] += 1
+            elif stack and char == "}":
+                if stack[-1]:
+                    stack[-1] -= 1
+                else:
+                    stack.pop()
+            i += 1
+        if starts_in_template:
+            out.append(line if stack and stack[-1] is None else line.rstrip())
+            continue
+        line = line.lstrip() if stack and stack[-1] is None else line.strip()
+        if line and not line.startswith("//"):
+            out.append(line)
+    return "\n".join(out)
+
+
 def _scene_to_dict(scene: SceneSpec) -> dict[str, Any]:
     return {
         "version": scene.version,
@@ -132,7 +421,12 @@ def _scene_to_dict(scene: SceneSpec) -> dict[str, Any]:
             for obj in scene.objects
         ],
         "buffers": {
-            key: {"dtype": spec.dtype, "shape": list(spec.shape)}
+            key: {
+                "dtype": spec.dtype,
+                "shape": list(spec.shape),
+                "encoding": spec.encoding,
+                "digest": spec.digest,
+            }
             for key, spec in scene.buffers.items()
         },
         "camera": scene.camera,
@@ -146,9 +440,9 @@ def _scene_to_dict(scene: SceneSpec) -> dict[str, Any]:
     }
 
 
-def _encode_frames(animation: Animation) -> list[dict[str, Any]]:
-    frames: list[dict[str, Any]] = []
-    for frame in animation.frames:
+def _encode_frames(frames: Sequence[Frame]) -> list[dict[str, Any]]:
+    encoded: list[dict[str, Any]] = []
+    for frame in frames:
         payload: dict[str, Any] = {}
         for key, array in frame.arrays.items():
             data = base64.b64encode(array.tobytes()).decode("ascii")
@@ -157,5 +451,5 @@ def _encode_frames(animation: Animation) -> list[dict[str, Any]]:
                 "shape": list(array.shape),
                 "data": data,
             }
-        frames.append(payload)
-    return frames
+        encoded.append(payload)
+    return encoded
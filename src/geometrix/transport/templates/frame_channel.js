@@ -0,0 +1,14 @@
+// Front end of geometrix.transport.frame_channel.FrameChannel. Publishes the
+// widget model for the viewer it serves; the viewer requests frames through
+// the model and listens for the frames sent back.
+function publish({ model, el }) {
+  const channels = (window.geometrixChannels = window.geometrixChannels || {});
+  const viewer = model.get("viewer");
+  channels[viewer] = model;
+  window.dispatchEvent(new CustomEvent("geometrix-channel", { detail: viewer }));
+  if (el) {
+    el.style.display = "none";
+  }
+}
+
+export default { initialize: publish, render: publish };
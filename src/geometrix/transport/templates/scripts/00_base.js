@@ -1,8 +1,59 @@
-import * as THREE from "three";
-import { OrbitControls } from "https://cdn.jsdelivr.net/npm/three@0.163.0/examples/jsm/controls/OrbitControls.js";
+const THREE_CDN = "https://cdn.jsdelivr.net/npm/three@0.168.0/";
+
+// three.js is loaded once per page and shared by every viewer through this
+// registry. The first viewer of a kernel session carries the vendored modules
+// as inert, deflated <script data-geometrix-module> blocks; later viewers
+// decode them from that output if the page has not registered three.js yet,
+// and fall back to the CDN once it is gone.
+function loadThree() {
+  const registry = (window.geometrixModules = window.geometrixModules || {});
+  if (!registry.three) {
+    registry.three = importThree().catch((error) => {
+      delete registry.three;
+      throw error;
+    });
+  }
+  return registry.three;
+}
+
+async function vendoredModule(name) {
+  const block = document.querySelector(`script[data-geometrix-module="${name}"]`);
+  if (!block) {
+    return null;
+  }
+  return inflateBuffer(decodeBuffer(block.textContent.trim()));
+}
+
+async function importThree() {
+  const [threeSource, controlsSource] = await Promise.all([
+    vendoredModule("three"),
+    vendoredModule("orbit-controls"),
+  ]);
+  if (threeSource && controlsSource) {
+    const moduleUrl = (source) =>
+      URL.createObjectURL(new Blob([source], { type: "text/javascript" }));
+    const threeUrl = moduleUrl(threeSource);
+    const controls = new TextDecoder().decode(controlsSource);
+    const controlsUrl = moduleUrl(controls.replaceAll("__THREE__", threeUrl));
+    const [THREE, { OrbitControls }] = await Promise.all([
+      import(threeUrl),
+      import(controlsUrl),
+    ]);
+    return { THREE, OrbitControls };
+  }
+  // The page's import map resolves "three" for the CDN OrbitControls module.
+  const [THREE, { OrbitControls }] = await Promise.all([
+    import("three"),
+    import(`${THREE_CDN}examples/jsm/controls/OrbitControls.js`),
+  ]);
+  return { THREE, OrbitControls };
+}
+
+const { THREE, OrbitControls } = await loadThree();
 
 const payload = __PAYLOAD__;
-const container = document.getElementById("geometrix-container");
+const viewerId = "__CONTAINER_ID__";
+const container = document.getElementById(viewerId);
 const panel = document.createElement("div");
 panel.className = "geometrix-panel";
 panel.innerHTML = `
@@ -46,6 +97,35 @@ function decode(base64) {
   return bytes.buffer;
 }
 
+// Native bulk base64 decode where available, else one pass over the blob.
+function decodeBuffer(base64) {
+  if (Uint8Array.fromBase64) {
+    return Uint8Array.fromBase64(base64).buffer;
+  }
+  return decode(base64);
+}
+
+async function inflateBuffer(buffer) {
+  const stream = new Blob([buffer])
+    .stream()
+    .pipeThrough(new DecompressionStream("deflate"));
+  return new Response(stream).arrayBuffer();
+}
+
+// Typed-array views onto one blob; offsets are aligned by the packer.
+async function loadContainer(packed) {
+  let blob = decodeBuffer(packed.data);
+  if (packed.compression === "deflate") {
+    blob = await inflateBuffer(blob);
+  }
+  const views = {};
+  for (const [key, spec] of Object.entries(packed.buffers)) {
+    const ctor = dtypeToCtor[spec.dtype];
+    views[key] = new ctor(blob, spec.offset, spec.length / ctor.BYTES_PER_ELEMENT);
+  }
+  return views;
+}
+
 function buildColors(values) {
   let min = values[0] ?? 0;
   let max = values[0] ?? 1;
@@ -83,14 +163,61 @@ function makeLabelSprite(text, color) {
   return sprite;
 }
 
-const buffers = {};
-for (const [key, spec] of Object.entries(payload.buffers)) {
-  const ctor = dtypeToCtor[spec.dtype];
-  const raw = decode(spec.data);
-  buffers[key] = new ctor(raw);
+const buffers = await loadContainer(payload.container);
+const bufferSpecs = payload.scene.buffers;
+
+const normalizedMax = { int8: 127, uint8: 255, int16: 32767, uint16: 65535 };
+
+// Float values of a quantized buffer: offset + scale * n per component.
+function dequantize(values, spec) {
+  const { offset, scale } = spec.encoding;
+  const levels = normalizedMax[spec.dtype];
+  const out = new Float32Array(values.length);
+  for (let i = 0; i < values.length; i += 1) {
+    const c = i % offset.length;
+    out[i] = offset[c] + scale[c] * Math.max(values[i] / levels, -1);
+  }
+  return out;
+}
+
+// Octahedral normals stay integers on the GPU, which normalizes them for the
+// vertex shader to unfold.
+function vertexAttribute(key, itemSize) {
+  const normalized = bufferSpecs[key]?.encoding?.type === "octahedral";
+  return new THREE.BufferAttribute(buffers[key], itemSize, normalized);
+}
+
+function useOctahedralNormals(material) {
+  material.customProgramCacheKey = () => "geometrix-octahedral-normals";
+  material.onBeforeCompile = (shader) => {
+    shader.vertexShader = shader.vertexShader
+      .replace(
+        "#include <common>",
+        `#include <common>
+attribute vec2 octNormal;
+vec3 octDecode(vec2 e) {
+  vec3 n = vec3(e, 1.0 - abs(e.x) - abs(e.y));
+  float t = max(-n.z, 0.0);
+  n.x += n.x >= 0.0 ? -t : t;
+  n.y += n.y >= 0.0 ? -t : t;
+  return normalize(n);
+}`
+      )
+      .replace("#include <beginnormal_vertex>", "vec3 objectNormal = octDecode(octNormal);");
+  };
+}
+
+// Quantized buffers are decoded once, up front, so positions live in scene
+// space with an identity object transform (a per-axis scale there would skew
+// the shipped normals) and colors and the readout see float values.
+for (const [key, spec] of Object.entries(bufferSpecs)) {
+  if (spec.encoding?.type === "quantized" && buffers[key]) {
+    buffers[key] = dequantize(buffers[key], spec);
+  }
 }
 
 const bufferAttributes = {};
+const bufferGeometries = {};
 const valueBindings = [];
 const lineMaterials = [];
 const pointMaterials = [];
@@ -247,14 +374,46 @@ function updateAxesFromBounds() {
   axisLabelZ.position.set(xStart, yStart, zEnd);
 }
 
+// Shades a triangle geometry with the object's normals (or computed ones) and
+// value colors, and adds the mesh to the scene.
+function addSurface(geometry, obj) {
+  const normalsKey = obj.buffers.normals;
+  const octahedral = bufferSpecs[normalsKey]?.encoding?.type === "octahedral";
+  if (octahedral) {
+    geometry.setAttribute("octNormal", vertexAttribute(normalsKey, 2));
+  } else if (normalsKey) {
+    geometry.setAttribute("normal", vertexAttribute(normalsKey, 3));
+  } else {
+    geometry.computeVertexNormals();
+  }
+  const valuesKey = obj.buffers.values;
+  let material = new THREE.MeshStandardMaterial({
+    color: 0xffffff,
+    side: THREE.DoubleSide
+  });
+  if (valuesKey) {
+    const colors = buildColors(buffers[valuesKey]);
+    geometry.setAttribute("color", new THREE.BufferAttribute(colors, 3));
+    valueBindings.push({ key: valuesKey, geometry });
+    material = new THREE.MeshStandardMaterial({
+      vertexColors: true,
+      side: THREE.DoubleSide
+    });
+  }
+  if (octahedral) {
+    useOctahedralNormals(material);
+  }
+  const mesh = new THREE.Mesh(geometry, material);
+  mesh.userData = { valuesKey };
+  scene.add(mesh);
+}
+
 for (const obj of payload.scene.objects) {
   if (obj.type === "points") {
     const geometry = new THREE.BufferGeometry();
-    geometry.setAttribute(
-      "position",
-      new THREE.BufferAttribute(buffers[obj.buffers.positions], 3)
-    );
+    geometry.setAttribute("position", vertexAttribute(obj.buffers.positions, 3));
     bufferAttributes[obj.buffers.positions] = geometry.getAttribute("position");
+    bufferGeometries[obj.buffers.positions] = geometry;
     const material = new THREE.PointsMaterial({ size: 0.05, color: 0xffffff });
     pointMaterials.push(material);
     const points = new THREE.Points(geometry, material);
@@ -262,19 +421,18 @@ for (const obj of payload.scene.objects) {
     scene.add(points);
   } else if (obj.type === "line") {
     const geometry = new THREE.BufferGeometry();
-    geometry.setAttribute(
-      "position",
-      new THREE.BufferAttribute(buffers[obj.buffers.positions], 3)
-    );
+    geometry.setAttribute("position", vertexAttribute(obj.buffers.positions, 3));
     bufferAttributes[obj.buffers.positions] = geometry.getAttribute("position");
+    bufferGeometries[obj.buffers.positions] = geometry;
     const material = new THREE.LineBasicMaterial({ color: 0xffffff });
     lineMaterials.push(material);
-    scene.add(new THREE.Line(geometry, material));
+    const line = new THREE.Line(geometry, material);
+    scene.add(line);
   } else if (obj.type === "surface_grid") {
     const geometry = new THREE.BufferGeometry();
-    const positions = buffers[obj.buffers.positions];
-    geometry.setAttribute("position", new THREE.BufferAttribute(positions, 3));
+    geometry.setAttribute("position", vertexAttribute(obj.buffers.positions, 3));
     bufferAttributes[obj.buffers.positions] = geometry.getAttribute("position");
+    bufferGeometries[obj.buffers.positions] = geometry;
     const gridMeta = obj.metadata?.grid;
     if (gridMeta) {
       const divU = Math.max(gridMeta.Nu - 1, 1);
@@ -286,35 +444,42 @@ for (const obj of payload.scene.objects) {
     if (!grid) throw new Error("Missing grid metadata");
     const nu = grid.Nu;
     const nv = grid.Nv;
-    const indices = [];
-    for (let i = 0; i < nu - 1; i += 1) {
-      for (let j = 0; j < nv - 1; j += 1) {
-        const a = i * nv + j;
-        const b = a + 1;
-        const c = a + nv;
-        const d = c + 1;
-        indices.push(a, c, b, b, c, d);
+    if (obj.buffers.indices) {
+      geometry.setIndex(new THREE.BufferAttribute(buffers[obj.buffers.indices], 1));
+    } else {
+      const indices = new (nu * nv > 65536 ? Uint32Array : Uint16Array)(
+        6 * Math.max(nu - 1, 0) * Math.max(nv - 1, 0)
+      );
+      let k = 0;
+      for (let i = 0; i < nu - 1; i += 1) {
+        for (let j = 0; j < nv - 1; j += 1) {
+          const a = i * nv + j;
+          const b = a + 1;
+          const c = a + nv;
+          const d = c + 1;
+          indices[k] = a;
+          indices[k + 1] = c;
+          indices[k + 2] = b;
+          indices[k + 3] = b;
+          indices[k + 4] = c;
+          indices[k + 5] = d;
+          k += 6;
+        }
       }
+      geometry.setIndex(new THREE.BufferAttribute(indices, 1));
     }
-    geometry.setIndex(indices);
-    geometry.computeVertexNormals();
-    const valuesKey = obj.buffers.values;
-    let material = new THREE.MeshStandardMaterial({
-      color: 0xffffff,
-      side: THREE.DoubleSide
-    });
-    if (valuesKey) {
-      const colors = buildColors(buffers[valuesKey]);
-      geometry.setAttribute("color", new THREE.BufferAttribute(colors, 3));
-      valueBindings.push({ key: valuesKey, geometry });
-      material = new THREE.MeshStandardMaterial({
-        vertexColors: true,
-        side: THREE.DoubleSide
-      });
+    addSurface(geometry, obj);
+  } else if (obj.type === "mesh") {
+    const geometry = new THREE.BufferGeometry();
+    geometry.setAttribute("position", vertexAttribute(obj.buffers.vertices, 3));
+    bufferAttributes[obj.buffers.vertices] = geometry.getAttribute("position");
+    bufferGeometries[obj.buffers.vertices] = geometry;
+    if (obj.buffers.faces) {
+      geometry.setIndex(new THREE.BufferAttribute(buffers[obj.buffers.faces], 1));
     }
-    const mesh = new THREE.Mesh(geometry, material);
-    mesh.userData = { valuesKey };
-    scene.add(mesh);
+    addSurface(geometry, obj);
+  } else {
+    console.warn(`geometrix: no renderer for "${obj.type}" objects`);
   }
 }
 
@@ -18,7 +18,7 @@ const raycaster = new THREE.Raycaster();
 raycaster.params.Points.threshold = 0.05;
 const pointer = new THREE.Vector2();
 function updateReadout(event) {
-  const readout = document.getElementById("gx-readout");
+  const readout = container.querySelector("#gx-readout");
   if (!readout) {
     return;
   }
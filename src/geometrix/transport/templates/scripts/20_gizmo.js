@@ -65,7 +65,7 @@ const gizmoPointer = new THREE.Vector2();
 let gizmoDragging = false;
 let gizmoAxis = null;
 let lastPointer = null;
-const locationReadout = document.getElementById("gx-location");
+const locationReadout = container.querySelector("#gx-location");
 
 function updateGizmoReadout() {
   const { x, y, z } = gizmoGroup.position;
@@ -25,31 +25,228 @@ function applyFrame(frame) {
 }
 window.geometrixApplyFrame = applyFrame;
 
-if (payload.frames && payload.scene.animation) {
-  const frames = payload.frames.map(decodeFrame);
+async function inflate(base64) {
+  return new Uint8Array(await inflateBuffer(decodeBuffer(base64)));
+}
+
+// Rebuilds "delta" frames incrementally: frame 0 is a quantized keyframe,
+// later frames add uint16 deltas (wrapping) to the running state. Sections
+// store each component's low bytes, then its high bytes.
+function createDeltaDecoder(codec, bytes) {
+  const state = {};
+  const scratch = {};
+  let current = -1;
+
+  function step(index) {
+    const frame = {};
+    for (const [key, offset] of Object.entries(codec.frames[index])) {
+      const spec = codec.buffers[key];
+      const components = spec.offset.length;
+      const count = spec.shape.reduce((a, b) => a * b, 1);
+      const rows = count / components;
+      if (!state[key]) {
+        state[key] = new Uint16Array(count);
+        scratch[key] = new dtypeToCtor[spec.dtype](count);
+      }
+      const q = state[key];
+      const out = scratch[key];
+      for (let c = 0; c < components; c += 1) {
+        const scale = spec.scale[c];
+        const base = spec.offset[c];
+        for (let r = 0; r < rows; r += 1) {
+          const k = c * rows + r;
+          const value = bytes[offset + k] | (bytes[offset + count + k] << 8);
+          const idx = r * components + c;
+          q[idx] = index === 0 ? value : q[idx] + value;
+          out[idx] = base + q[idx] * scale;
+        }
+      }
+      frame[key] = out;
+    }
+    current = index;
+    return frame;
+  }
+
+  return (index) => {
+    if (index <= current) {
+      current = -1;
+    }
+    let frame = {};
+    for (let i = current + 1; i <= index; i += 1) {
+      frame = { ...frame, ...step(i) };
+    }
+    return frame;
+  };
+}
+
+function toArrayBuffer(buffer) {
+  if (buffer instanceof ArrayBuffer) {
+    return buffer;
+  }
+  const { buffer: raw, byteOffset, byteLength } = buffer;
+  return raw.slice(byteOffset, byteOffset + byteLength);
+}
+
+// Milliseconds to wait for the frame channel widget before giving up.
+const CHANNEL_TIMEOUT = 10000;
+
+// Resolves to the FrameChannel widget model that
+// geometrix.transport.frame_channel publishes for this viewer. The widget may
+// render before or after the viewer, so wait for it up to CHANNEL_TIMEOUT.
+function frameChannel(viewer) {
+  const published = (window.geometrixChannels || {})[viewer];
+  if (published) {
+    return Promise.resolve(published);
+  }
+  return new Promise((resolve, reject) => {
+    const onChannel = (event) => {
+      if (event.detail === viewer) {
+        done();
+        resolve(window.geometrixChannels[viewer]);
+      }
+    };
+    const timer = setTimeout(() => {
+      done();
+      reject(new Error("frame channel widget did not load; showing the first frame"));
+    }, CHANNEL_TIMEOUT);
+    function done() {
+      clearTimeout(timer);
+      window.removeEventListener("geometrix-channel", onChannel);
+    }
+    window.addEventListener("geometrix-channel", onChannel);
+  });
+}
+
+// Subscribes to the frames served by geometrix.transport.frame_stream and
+// resolves to a function sending requests to the kernel.
+function openFrameComm(stream, onMessage) {
+  return frameChannel(stream.viewer).then((model) => {
+    model.on("msg:custom", (msg, buffers) => onMessage(msg, buffers || []));
+    return (msg) => model.send(msg);
+  });
+}
+
+function reportFrameError(message) {
+  console.warn("geometrix:", message);
+  const readout = container.querySelector("#gx-readout");
+  if (readout) {
+    readout.textContent = `Animation: ${message}`;
+  }
+}
+
+// Requests per frame before a failing frame is skipped instead of retried.
+const FRAME_RETRIES = 3;
+
+// Keeps at most `window` decoded frames, from the playhead onwards, and
+// requests the missing ones ahead of it.
+function createFrameStream(stream) {
+  const count = stream.frame_count;
+  const frames = new Map();
+  const pending = new Set();
+  const failures = new Map();
+  let send = null;
+
+  function receive(data, buffers) {
+    if (data.error) {
+      reportFrameError(data.error);
+      if (data.index !== undefined) {
+        // Free the slot so the frame is requested again; a frame that keeps
+        // failing becomes an empty frame and playback moves past it.
+        pending.delete(data.index);
+        const failed = (failures.get(data.index) || 0) + 1;
+        failures.set(data.index, failed);
+        if (failed >= FRAME_RETRIES) {
+          frames.set(data.index, {});
+        }
+      }
+      return;
+    }
+    const frame = {};
+    data.keys.forEach((spec, i) => {
+      frame[spec.key] = new dtypeToCtor[spec.dtype](toArrayBuffer(buffers[i]));
+    });
+    pending.delete(data.index);
+    frames.set(data.index, frame);
+  }
+
+  function prefetch(index) {
+    for (const key of frames.keys()) {
+      if ((key - index + count) % count >= stream.window) {
+        frames.delete(key);
+      }
+    }
+    const wanted = [];
+    for (let i = 0; i < stream.window; i += 1) {
+      const key = (index + i) % count;
+      if (!frames.has(key) && !pending.has(key)) {
+        pending.add(key);
+        wanted.push(key);
+      }
+    }
+    if (send && wanted.length) {
+      send({ frames: wanted });
+    }
+  }
+
+  const ready = openFrameComm(stream, receive).then((sender) => {
+    send = sender;
+  });
+  return {
+    ready,
+    frameAt(index) {
+      prefetch(index);
+      return frames.get(index) || null;
+    },
+  };
+}
+
+function startPlayback(frameAt, frameCount) {
   let frameIndex = 0;
   const fps = payload.scene.animation.fps || 30;
   const loop = payload.scene.animation.loop !== false;
   const timer = setInterval(() => {
-    if (!loop && frameIndex >= frames.length) {
+    if (!loop && frameIndex >= frameCount) {
       clearInterval(timer);
       return;
     }
-    const frame = frames[frameIndex % frames.length];
+    // Streamed frames may not have arrived yet; hold the playhead.
+    const frame = frameAt(frameIndex % frameCount);
+    if (!frame) {
+      return;
+    }
     applyFrame(frame);
     frameIndex += 1;
   }, 1000 / fps);
 }
 
-const axesToggle = document.getElementById("gx-axes");
-const gridToggle = document.getElementById("gx-grid");
-const gizmoToggle = document.getElementById("gx-gizmo");
-const legendToggle = document.getElementById("gx-legend-toggle");
-const themeToggle = document.getElementById("gx-theme");
-const collapseToggle = document.getElementById("gx-collapse");
-const panelBody = document.getElementById("gx-panel-body");
-const lightSlider = document.getElementById("gx-light");
-const legendPanel = document.getElementById("gx-legend");
+if (payload.frame_stream && payload.scene.animation) {
+  // Show the embedded first frame until the kernel's frames arrive.
+  applyFrame(decodeFrame(payload.frames[0]));
+  const stream = createFrameStream(payload.frame_stream);
+  stream.ready.then(
+    () => startPlayback(stream.frameAt, payload.frame_stream.frame_count),
+    (error) => reportFrameError(error.message),
+  );
+} else if (payload.frames && payload.scene.animation) {
+  // Decode each frame as it is shown rather than holding them all decoded.
+  const frames = payload.frames;
+  startPlayback((index) => decodeFrame(frames[index]), frames.length);
+} else if (payload.frame_codec && payload.scene.animation) {
+  const codec = payload.frame_codec;
+  inflate(codec.data).then((bytes) => {
+    startPlayback(createDeltaDecoder(codec, bytes), codec.frame_count);
+  });
+}
+
+const axesToggle = container.querySelector("#gx-axes");
+const gridToggle = container.querySelector("#gx-grid");
+const gizmoToggle = container.querySelector("#gx-gizmo");
+const legendToggle = container.querySelector("#gx-legend-toggle");
+const themeToggle = container.querySelector("#gx-theme");
+const collapseToggle = container.querySelector("#gx-collapse");
+const panelBody = container.querySelector("#gx-panel-body");
+const lightSlider = container.querySelector("#gx-light");
+const legendPanel = container.querySelector("#gx-legend");
 
 const showAxes = payload.scene.axes?.visible ?? true;
 const showGrid = payload.scene.grid?.visible ?? true;
@@ -0,0 +1,47 @@
+const pendingGeometries = new Set();
+let refreshScheduled = false;
+
+function refreshGeometries() {
+  refreshScheduled = false;
+  pendingGeometries.forEach((geometry) => {
+    if (geometry.index) {
+      geometry.computeVertexNormals();
+    }
+    geometry.computeBoundingSphere();
+  });
+  pendingGeometries.clear();
+}
+
+function applyTile(tile) {
+  const attr = bufferAttributes[tile.key];
+  if (!attr) {
+    return;
+  }
+  const values = new dtypeToCtor[tile.dtype](decode(tile.data));
+  const offset = tile.start * attr.itemSize;
+  attr.array.set(values, offset);
+  attr.addUpdateRange(offset, values.length);
+  attr.needsUpdate = true;
+  const geometry = bufferGeometries[tile.key];
+  if (geometry) {
+    pendingGeometries.add(geometry);
+  }
+  if (tile.last) {
+    refreshGeometries();
+    updateGridBoundsFromPositions();
+    applyGridConfig();
+    return;
+  }
+  // Normals are recomputed at most once per animation frame.
+  if (!refreshScheduled) {
+    refreshScheduled = true;
+    requestAnimationFrame(refreshGeometries);
+  }
+}
+
+window.geometrixViewers = window.geometrixViewers || {};
+window.geometrixViewers[viewerId] = { applyFrame, applyTile };
+const tileQueue = window.geometrixTileQueue || {};
+const queuedTiles = tileQueue[viewerId] || [];
+delete tileQueue[viewerId];
+queuedTiles.forEach(applyTile);
@@ -1,8 +1,19 @@
+import json
+import re
+
 import numpy as np
+import pytest
 import sympy as sp
 
 from geometrix import cylindrical_to_cartesian, lorentz_metric, spherical_to_cartesian
-from geometrix.api import geom, line, mesh, points
+from geometrix.api import geom, implicit, implicit_curve, line, mesh, points, show
+from geometrix.sample.domains import Domain
+from geometrix.sample.quadtree import sample_surface_quadtree
+from geometrix.scene.quantize import decode_attribute
+from geometrix.scene.spec import BufferSpec
+from geometrix.symbolic.compile import compile_vector
+from geometrix.transport.container import unpack_buffers
+from geometrix.transport.html import _script_sources
 
 
 def test_geom_builds_surface_scene():
@@ -15,6 +26,141 @@ def test_geom_builds_surface_scene():
     bundle = program.build_scene()
     assert bundle.scene.version == "1.0"
     assert bundle.arrays["positions"].shape == (12, 3)
+    assert "normals" not in bundle.arrays
+    bundle = program.build_scene(normals=True)
+    assert np.allclose(bundle.arrays["normals"], [0.0, 0.0, 1.0])
+    assert bundle.scene.buffers["normals"].shape == (12, 3)
+    assert bundle.scene.objects[0].buffers["normals"] == "normals"
+
+
+def test_geom_stream_scene_refines_to_built_scene():
+    program = geom(
+        """
+        coords: u v
+        X(u,v) = (cos(u), sin(u), u*v)
+        render: surface X domain u:[0,3] v:[0,1] res 60 20
+        """
+    )
+    bundle, tiles = program.stream_scene(preview=8)
+    positions = bundle.arrays["positions"]
+    assert bundle.scene.objects[0].metadata["grid"] == {"Nu": 60, "Nv": 20}
+    assert len(list(tiles)) > 1
+    assert np.array_equal(positions, program.build_scene().arrays["positions"])
+
+
+class _Slot:
+    """Stand-in for an IPython display handle, recording every update."""
+
+    def __init__(self, obj):
+        self.outputs = [obj]
+
+    def update(self, obj):
+        self.outputs.append(obj)
+
+
+def _shown_payload(html):
+    return json.loads(re.search(r"const payload = (.*);$", html, re.M).group(1))
+
+
+def test_show_stream_leaves_fully_sampled_scene(monkeypatch):
+    program = geom(
+        """
+        coords: u v
+        X(u,v) = (cos(u), sin(u), u*v)
+        render: surface X domain u:[0,3] v:[0,1] res 60 20
+        """
+    )
+    slots = []
+    monkeypatch.setattr(
+        "IPython.display.display",
+        lambda obj, display_id=False: slots.append(_Slot(obj)) or slots[-1],
+    )
+    show(program, stream=True, preview=8, inline_vendor=False)
+    view, tiles = slots
+    assert len(tiles.outputs) > 2 and tiles.outputs[-1].data == ""
+
+    # The saved output is the finished scene, not the interpolated preview.
+    preview, final = (output.data for output in view.outputs)
+    assert 'data-geometrix-module="three"' not in final
+    exact = program.build_scene().arrays["positions"]
+    for html, matches in ((preview, False), (final, True)):
+        positions = unpack_buffers(_shown_payload(html)["container"])["positions"]
+        assert np.allclose(positions, exact, atol=1e-6) == matches
+
+    with pytest.raises(ValueError, match="normals"):
+        show(program, stream=True, normals=True)
+
+
+def test_geom_sweep_matches_per_value_scenes():
+    text = """
+    coords: u v
+    params: R=2 r=0.5
+    X(u,v) = ((R + r*cos(v))*cos(u), (R + r*cos(v))*sin(u), r*sin(v))
+    render: surface X domain u:[0,6.28] v:[0,6.28] res 24 16
+    """
+    radii = [1.0, 1.5, 2.5]
+    stack = geom(text).sweep({"R": radii})
+    assert stack.shape == (3, 24 * 16, 3) and stack.dtype == np.float32
+    for idx, radius in enumerate(radii):
+        single = geom(text.replace("R=2", f"R={radius}")).build_scene()
+        assert np.allclose(stack[idx], single.arrays["positions"], atol=1e-6)
+
+    with pytest.raises(ValueError, match="Unknown param"):
+        geom(text).sweep({"a": [1.0]})
+
+
+def test_geom_time_option_builds_contiguous_animation():
+    text = """
+    coords: u v
+    params: a=0.5
+    X(u,v) = (u, v, a*sin(u + t)*cos(v))
+    render: surface X domain u:[0,3] v:[0,2] res 12 9 time t:[0,2] frames 5 fps 12
+    """
+    bundle = geom(text).build_scene()
+    animation = bundle.animation
+    assert bundle.scene.animation["frame_count"] == 5
+    assert animation.fps == 12
+    assert [frame.t for frame in animation.frames] == [0.0, 0.5, 1.0, 1.5, 2.0]
+    stack = animation.frames[0].arrays["positions"]
+    assert stack.dtype == np.float32 and stack.shape == (12 * 9, 3)
+    # Every frame is a view into one contiguous (F, N, 3) block.
+    starts = [frame.arrays["positions"].ctypes.data for frame in animation.frames]
+    assert np.all(np.diff(starts) == stack.nbytes)
+    assert np.shares_memory(bundle.arrays["positions"], stack)
+    for frame in animation.frames:
+        still = geom(text.replace("params: a=0.5", f"params: a=0.5 t={frame.t}"))
+        still.ir.render_requests[0].options.pop("time")
+        expected = still.build_scene().arrays["positions"]
+        assert np.allclose(frame.arrays["positions"], expected, atol=1e-6)
+
+
+def test_geom_sweep_with_time_option_uses_first_frame():
+    program = geom(
+        """
+        coords: u v
+        params: a=1
+        X(u,v) = (u, v, a*sin(u + t))
+        render: surface X domain u:[0,1] v:[0,1] res 8 8 time t:[0.5,1] frames 3
+        """
+    )
+    stack = program.sweep({"a": [1.0, 2.0]})
+    first = program.build_scene().animation.frames[0].arrays["positions"]
+    assert np.allclose(stack[0], first, atol=1e-6)
+    assert np.allclose(stack[1][:, 2], 2 * first[:, 2], atol=1e-6)
+
+
+def test_geom_time_option_rejects_streaming_and_normals():
+    program = geom(
+        """
+        coords: u v
+        X(u,v) = (u, v, sin(u + t))
+        render: surface X domain u:[0,1] v:[0,1] res 8 8 time t:[0,1] frames 3
+        """
+    )
+    with pytest.raises(ValueError, match="animated surfaces"):
+        program.stream_scene()
+    with pytest.raises(ValueError, match="Animated surfaces do not support normals"):
+        program.build_scene(normals=True)
 
 
 def test_points_line_mesh_helpers():
@@ -31,6 +177,45 @@ def test_points_line_mesh_helpers():
     assert msh.scene.objects[0].type == "mesh"
 
 
+def test_show_draws_quadtree_surface(monkeypatch):
+    u, v = sp.symbols("u v")
+    bump = compile_vector([u, v, sp.exp(-50 * (u**2 + v**2))], [u, v])
+    domains = [Domain("u", -1.0, 1.0), Domain("v", -1.0, 1.0)]
+    surface = sample_surface_quadtree(bump, domains, max_level=3)
+    shown = []
+    monkeypatch.setattr("IPython.display.display", shown.append)
+    show(mesh(surface.vertices, faces=surface.faces))
+
+    payload = _shown_payload(shown[0].data)
+    (obj,) = payload["scene"]["objects"]
+    handled = re.findall(r'obj\.type === "(\w+)"', _script_sources())
+    assert obj["type"] == "mesh" and "mesh" in handled
+    arrays = unpack_buffers(payload["container"])
+    vertices = arrays[obj["buffers"]["vertices"]]
+    faces = arrays[obj["buffers"]["faces"]].astype(np.int64)
+    assert faces.shape == surface.faces.shape and faces.max() < len(vertices)
+    corner = vertices[faces]
+    area = np.cross(corner[:, 1] - corner[:, 0], corner[:, 2] - corner[:, 0])
+    assert np.linalg.norm(area, axis=1).min() > 0
+
+
+def test_show_draws_quantized_mesh(monkeypatch):
+    vertices = np.array([[0, 0, 0], [2, 0, 0], [0, 1, 0], [0, 0, 3]], np.float32)
+    faces = np.array([[0, 1, 2], [0, 1, 3], [0, 2, 3]], np.uint32)
+    shown = []
+    monkeypatch.setattr("IPython.display.display", shown.append)
+    show(mesh(vertices, faces=faces, quantize=True))
+
+    payload = _shown_payload(shown[0].data)
+    (obj,) = payload["scene"]["objects"]
+    assert obj["type"] == "mesh"
+    key = obj["buffers"]["vertices"]
+    spec = BufferSpec(**payload["scene"]["buffers"][key])
+    assert spec.encoding["type"] == "quantized"
+    decoded = decode_attribute(unpack_buffers(payload["container"])[key], spec)
+    assert np.abs(decoded.reshape(-1, 3) - vertices).max() <= spec.encoding["error"]
+
+
 def test_coordinate_helpers():
     r, phi, z = sp.symbols("r phi z")
     x, y, zz = cylindrical_to_cartesian(r, phi, z)
@@ -46,3 +231,33 @@ def test_coordinate_helpers():
 
     metric = lorentz_metric()
     assert metric.shape == (4, 4)
+
+
+def test_implicit_surface_mesh_is_welded():
+    bundle = implicit(
+        "x**2 + y**2 + z**2 = r**2",
+        params={"r": 1.0},
+        domain={"x": (-1.5, 1.5), "y": (-1.5, 1.5), "z": (-1.5, 1.5)},
+        res=40,
+        memory_budget=1 << 16,
+    )
+    assert bundle.scene.objects[0].type == "mesh"
+    vertices, faces = bundle.arrays["vertices"], bundle.arrays["faces"]
+    assert np.allclose(np.linalg.norm(vertices, axis=1), 1.0, atol=1e-3)
+
+    # Welded across chunks: a closed sphere shares every edge between two
+    # triangles and has Euler characteristic 2.
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    edges, counts = np.unique(edges, axis=0, return_counts=True)
+    assert set(counts) == {2}
+    assert len(vertices) - len(edges) + len(faces) == 2
+
+
+def test_implicit_curve_builds_line_per_component():
+    bundle = implicit_curve("sin(x) = y**2", domain={"x": (-4, 4)}, res=200)
+    objects = bundle.scene.objects
+    assert len(objects) == 2 and {obj.type for obj in objects} == {"line"}
+    for obj in objects:
+        positions = bundle.arrays[obj.buffers["positions"]]
+        assert positions.dtype == np.float32 and positions.shape[1] == 3
+        assert np.all(positions[:, 2] == 0)
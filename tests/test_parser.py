@@ -43,6 +43,13 @@ def test_parse_dsl_time_default_and_override():
     ir = parse_dsl("coords: u v\nparams: t=2")
     assert ir.time_value == 2.0
 
+    ir = parse_dsl(
+        "coords: u v\nrender: surface X res 4 4 time s:[0,2] frames 12 fps 24"
+    )
+    options = ir.render_requests[0].options
+    assert options["time"] == "s:[0,2]" and options["frames"] == "12"
+    assert options["fps"] == "24" and ir.time_param == "s"
+
 
 def test_parse_dsl_rejects_unknown_statement():
     with pytest.raises(DSLParseError):
@@ -1,11 +1,31 @@
 import numpy as np
+import pytest
+import skimage.measure
 import sympy as sp
 
-from geometrix.sample.curves import sample_curve
+from geometrix.sample.buffers import block_rows
+from geometrix.sample.curves import (
+    chord_deviation,
+    sample_curve,
+    sample_curve_adaptive,
+)
 from geometrix.sample.domains import Domain
+from geometrix.sample.implicit import (
+    sample_implicit_curve,
+    sample_implicit_surface,
+    sample_implicit_surface_sparse,
+)
 from geometrix.sample.points import sample_points
-from geometrix.sample.surface import sample_surface_grid
-from geometrix.symbolic.compile import compile_expr, compile_vector
+from geometrix.sample.quadtree import sample_surface_quadtree
+from geometrix.sample.surface import (
+    iter_surface_grid,
+    sample_surface_grid,
+    sample_surface_sweep,
+)
+from geometrix.scene.build import build_mesh_scene
+from geometrix.symbolic.cache import CompileCache
+from geometrix.symbolic.compile import compile_expr, compile_vector, supports_normals
+from geometrix.symbolic.interval import compile_interval
 
 
 def test_compile_expr_scalar():
@@ -45,3 +65,381 @@ def test_point_sampling():
     coords = [np.array([0.0, 1.0]), np.array([2.0, 3.0])]
     points = sample_points(func, coords)
     assert points.positions.shape == (2, 3)
+
+
+def test_compile_cache_reuses_structurally_equal_vectors():
+    cache = CompileCache(maxsize=1)
+    u, v = sp.symbols("u v")
+    first = compile_vector([sp.cos(u), sp.sin(u), v], [u, v], cache=cache)
+    second = compile_vector([sp.cos(u), sp.sin(u), v], [u, v], cache=cache)
+    assert first is second
+    compile_vector([u, v, u * v], [u, v], cache=cache)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 2, 1)
+
+
+def test_compile_cache_disk_tier_round_trip(tmp_path):
+    u = sp.Symbol("u")
+    writer = CompileCache(directory=tmp_path)
+    compiled = compile_expr(sp.exp(u), [u], cache=writer)
+    reader = CompileCache(directory=tmp_path)
+    restored = compile_expr(sp.exp(u), [u], cache=reader)
+    assert writer.stats().disk_writes == 1
+    assert reader.stats().disk_hits == 1
+    assert restored.source == compiled.source
+    assert np.allclose(restored(np.array([0.0, 1.0])), [1.0, np.e])
+
+
+def test_compile_vector_cse_shares_subterms():
+    theta, phi = sp.symbols("theta phi")
+    vector = [
+        sp.sin(theta) * sp.cos(phi),
+        sp.sin(theta) * sp.sin(phi),
+        sp.cos(theta),
+    ]
+    shared = compile_vector(vector, [theta, phi], cache=False)
+    plain = compile_vector(vector, [theta, phi], cse=False, cache=False)
+    assert plain.source.count("numpy.sin(_x0)") == 2 * shared.source.count(
+        "numpy.sin(_x0)"
+    )
+    args = (np.linspace(0.0, np.pi, 5), np.linspace(0.0, 2 * np.pi, 5))
+    assert np.allclose(shared(*args), plain(*args))
+
+
+def test_compile_vector_numexpr_backend_with_fallback():
+    u, v = sp.symbols("u v")
+    vector = [sp.sin(u) * sp.cos(v) + sp.pi, sp.Max(u, v), sp.sec(u)]
+    compiled = compile_vector(vector, [u, v], backend="numexpr", cache=False)
+    reference = compile_vector(vector, [u, v], cache=False)
+    assert compiled.backend == "numexpr"
+    assert compiled.component_backends == ("numexpr", "numexpr", "numpy")
+    args = (np.linspace(0.0, 1.0, 7), np.linspace(1.0, 0.0, 7))
+    for got, expected in zip(compiled(*args), reference(*args), strict=True):
+        assert np.allclose(got, expected)
+
+
+def test_numba_backend_fills_surface_grid(tmp_path):
+    u, v = sp.symbols("u v")
+    vector = [sp.cos(u) * v, sp.sin(u) * v, u * v]
+    cache = CompileCache(directory=tmp_path)
+    compiled = compile_vector(vector, [u, v], backend="numba", cache=cache)
+    assert compiled.backend == "numba"
+    assert compiled.grid_kernel is not None
+    assert list(tmp_path.rglob("gx_*.py"))
+
+    domains = [Domain("u", 0.0, np.pi), Domain("v", 0.0, 1.0)]
+    fused = sample_surface_grid(compiled, domains, [5, 4])
+    reference = sample_surface_grid(compile_vector(vector, [u, v]), domains, [5, 4])
+    assert fused.positions.dtype == np.float32
+    assert np.allclose(fused.positions, reference.positions, atol=1e-6)
+
+
+def test_numba_backend_falls_back_to_numpy():
+    x = sp.Symbol("x")
+    compiled = compile_expr(sp.besselj(0, x), [x], backend="numba", cache=False)
+    assert compiled.backend == "numpy"
+    assert compiled.grid_kernel is None
+
+
+def test_samplers_write_into_caller_buffer():
+    u, v = sp.symbols("u v")
+    compiled = compile_vector([u, v, sp.sin(u) * v], [u, v])
+    domains = [Domain("u", 0.0, 1.0), Domain("v", -1.0, 1.0)]
+    out = np.zeros((12, 3), dtype=np.float32)
+    surface = sample_surface_grid(compiled, domains, [4, 3], out=out)
+    assert surface.positions is out
+    u_grid, v_grid = np.meshgrid(
+        np.linspace(0.0, 1.0, 4), np.linspace(-1.0, 1.0, 3), indexing="ij"
+    )
+    assert np.allclose(out[:, 2], (np.sin(u_grid) * v_grid).ravel())
+
+    t = sp.Symbol("t")
+    curve_out = np.zeros((5, 3), dtype=np.float64)
+    curve = sample_curve(
+        compile_vector([t, 2 * t, 0], [t]), Domain("t", 0.0, 1.0), 5, out=curve_out
+    )
+    assert curve.positions is curve_out
+    assert np.allclose(curve_out[:, 1], np.linspace(0.0, 2.0, 5))
+
+    with pytest.raises(ValueError):
+        sample_points(lambda x: (x, x, x), [np.zeros(4)], out=np.zeros((3, 3)))
+
+
+def test_surface_tiles_respect_memory_budget():
+    assert block_rows(100, memory_budget=1) == 1
+    assert block_rows(100, memory_budget=64 * 100 * 3) == 3
+    with pytest.raises(ValueError):
+        block_rows(100, memory_budget=0)
+
+    u, v = sp.symbols("u v")
+    compiled = compile_vector([sp.cos(u) * v, sp.sin(u) * v, u + v], [u, v])
+    domains = [Domain("u", 0.0, 2.0), Domain("v", 0.0, 1.0)]
+    whole = sample_surface_grid(compiled, domains, [37, 11])
+    tiled = sample_surface_grid(compiled, domains, [37, 11], memory_budget=1)
+    assert np.array_equal(whole.positions, tiled.positions)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numexpr", "numba"])
+def test_surface_sweep_batches_parameter_values(backend, tmp_path):
+    u, v, a, b = sp.symbols("u v a b")
+    exprs = [sp.cos(u) * (a + sp.cos(v)), sp.sin(u) * (a + b * sp.cos(v)), b * v]
+    cache = CompileCache(directory=tmp_path)
+    compiled = compile_vector(exprs, [u, v, a, b], backend=backend, cache=cache)
+    domains = [Domain("u", 0.0, 6.0), Domain("v", 0.0, 3.0)]
+    a_values, b_values = np.linspace(1, 3, 5), np.linspace(0.2, 1, 5)
+    out = np.empty((5, 13 * 7, 3))
+    stack = sample_surface_sweep(
+        compiled, domains, [13, 7], [a_values, b_values], out=out, memory_budget=1
+    )
+    assert np.shares_memory(stack, out)
+    for idx, (a_value, b_value) in enumerate(zip(a_values, b_values, strict=True)):
+        values = {a: a_value, b: b_value}
+        single = compile_vector([expr.subs(values) for expr in exprs], [u, v])
+        expected = sample_surface_grid(single, domains, [13, 7]).positions
+        assert np.allclose(stack[idx], expected, atol=1e-6)
+
+    with pytest.raises(ValueError, match="equal lengths"):
+        sample_surface_sweep(compiled, domains, [13, 7], [a_values, b_values[:2]])
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numexpr", "numba"])
+def test_surface_grid_analytic_normals(backend, tmp_path):
+    u, v = sp.symbols("u v")
+    sphere = [sp.cos(u) * sp.sin(v), sp.sin(u) * sp.sin(v), sp.cos(v)]
+    cache = CompileCache(directory=tmp_path)
+    fused = compile_vector(sphere, [u, v], backend=backend, cache=cache, normals=True)
+    assert fused.normals and len(fused.component_backends) == 6
+    domains = [Domain("u", 0.0, 2 * np.pi), Domain("v", 0.0, np.pi)]
+    surface = sample_surface_grid(fused, domains, [24, 13], memory_budget=1)
+
+    plain = compile_vector(sphere, [u, v], cache=cache)
+    expected = sample_surface_grid(plain, domains, [24, 13]).positions
+    assert np.allclose(surface.positions, expected, atol=1e-6)
+    # X_u x X_v points inward on this sphere and vanishes at the poles.
+    radial = np.sum(surface.normals * surface.positions, axis=1).reshape(24, 13)
+    assert np.allclose(radial[:, 1:-1], -1.0, atol=1e-5)
+    assert not surface.normals.reshape(24, 13, 3)[:, [0, -1]].any()
+
+    assert supports_normals(sphere, [u, v])
+    assert not supports_normals(sphere, [u])
+    assert not supports_normals([sp.Function("f")(u), v, u], [u, v])
+    with pytest.raises(ValueError, match="two parameters"):
+        compile_vector(sphere, [u], normals=True)
+
+
+def test_streamed_surface_refines_preview_in_place():
+    u, v = sp.symbols("u v")
+    compiled = compile_vector([sp.cos(u) * v, sp.sin(u) * v, u * v], [u, v])
+    domains = [Domain("u", 0.0, 2.0), Domain("v", 0.0, 1.0)]
+    whole = sample_surface_grid(compiled, domains, [97, 41])
+
+    tiles = iter_surface_grid(compiled, domains, [97, 41], preview=9)
+    first = next(tiles)
+    assert first.preview and (first.start, first.stop) == (0, 97 * 41)
+    buffer = first.positions
+    # Preview rows on the coarse lattice are exact; the rest interpolate.
+    exact = whole.positions.reshape(97, 41, 3)[::12, ::5]
+    assert np.allclose(buffer.reshape(97, 41, 3)[::12, ::5], exact, atol=1e-6)
+    assert np.allclose(buffer, whole.positions, atol=0.05)
+
+    covered = np.zeros(97 * 41, dtype=bool)
+    for tile in tiles:
+        assert not tile.preview and np.shares_memory(tile.positions, buffer)
+        covered[tile.start : tile.stop] = True
+    assert covered.all() and np.array_equal(buffer, whole.positions)
+
+    small = list(iter_surface_grid(compiled, domains, [5, 4], preview=8))
+    assert len(small) == 1 and not small[0].preview
+
+
+def _twisted(u, v):
+    return np.cos(u) * v, np.sin(u) * v, u * v
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_sampling_matches_serial(executor):
+    u, v = sp.symbols("u v")
+    compiled = compile_vector([sp.cos(u) * v, sp.sin(u) * v, u * v], [u, v])
+    domains = [Domain("u", 0.0, 2.0), Domain("v", 0.0, 1.0)]
+    for func in (compiled, _twisted):
+        serial = sample_surface_grid(func, domains, [40, 9])
+        out = np.empty_like(serial.positions)
+        parallel = sample_surface_grid(
+            func, domains, [40, 9], out=out, workers=2, executor=executor
+        )
+        assert parallel.positions is out
+        assert np.array_equal(serial.positions, parallel.positions)
+
+    t = sp.Symbol("t")
+    curve = compile_vector([sp.cos(t), sp.sin(t), t], [t])
+    serial = sample_curve(curve, Domain("t", 0.0, 1.0), 50)
+    parallel = sample_curve(
+        curve, Domain("t", 0.0, 1.0), 50, workers=3, executor=executor
+    )
+    assert np.array_equal(serial.positions, parallel.positions)
+
+    with pytest.raises(ValueError):
+        sample_points(_twisted, [np.zeros(4), np.ones(4)], workers=2, executor="gpu")
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numexpr", "numba"])
+def test_separable_terms_evaluate_on_axes(backend, tmp_path):
+    u, v = sp.symbols("u v")
+    exprs = [(2 + sp.cos(v)) * sp.cos(u), u * v * sp.sin(u), sp.sin(v)]
+    cache = CompileCache(directory=tmp_path)
+    compiled = compile_vector(exprs, [u, v], backend=backend, cache=cache)
+    assert "_s0 = " in compiled.source
+
+    domains = [Domain("u", 0.0, 2.0), Domain("v", -1.0, 1.0)]
+    surface = sample_surface_grid(compiled, domains, [7, 5])
+    u_grid, v_grid = np.meshgrid(
+        np.linspace(0.0, 2.0, 7), np.linspace(-1.0, 1.0, 5), indexing="ij"
+    )
+    expected = np.stack(
+        [
+            (2 + np.cos(v_grid)) * np.cos(u_grid),
+            u_grid * v_grid * np.sin(u_grid),
+            np.sin(v_grid),
+        ],
+        axis=-1,
+    ).reshape(-1, 3)
+    assert np.allclose(surface.positions, expected, atol=1e-6)
+
+
+def test_adaptive_curve_refines_sharp_features():
+    t = sp.Symbol("t")
+    spike = compile_vector([t, sp.exp(-400 * t**2), 0], [t])
+    domain = Domain("t", -1.0, 1.0)
+    curve = sample_curve_adaptive(spike, domain, tolerance=1e-3)
+    params = curve.params
+    assert np.all(np.diff(params) > 0)
+    assert params[0] == -1.0 and params[-1] == 1.0
+    assert len(params) < 128
+
+    mids = 0.5 * (params[:-1] + params[1:])
+    points = np.stack([params, np.exp(-400 * params**2), 0 * params], axis=-1)
+    mid_points = np.stack([mids, np.exp(-400 * mids**2), 0 * mids], axis=-1)
+    deviation = chord_deviation(points[:-1], points[1:], mid_points)
+    assert deviation.max() <= 1e-3
+    # Vertices cluster around the spike at t = 0.
+    assert np.count_nonzero(np.abs(params) < 0.2) > len(params) / 2
+
+    capped = sample_curve_adaptive(spike, domain, tolerance=1e-6, max_vertices=50)
+    assert len(capped.params) == 50
+
+
+def test_quadtree_surface_is_adaptive_and_crack_free():
+    u, v = sp.symbols("u v")
+    bump = compile_vector([u, v, sp.exp(-50 * (u**2 + v**2))], [u, v])
+    domains = [Domain("u", -1.0, 1.0), Domain("v", -1.0, 1.0)]
+    mesh = sample_surface_quadtree(bump, domains, tolerance=1e-3, max_level=5)
+    assert mesh.levels.min() == 0 and mesh.levels.max() == 5
+    assert len(mesh.vertices) < 65**2
+
+    faces = mesh.faces.astype(np.int64)
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    edges, counts = np.unique(edges, axis=0, return_counts=True)
+    # Interior edges are shared by two triangles; only the border is open.
+    border = edges[counts == 1]
+    on_border = np.isclose(np.abs(mesh.params[border]), 1.0).any(axis=-1)
+    assert counts.max() == 2 and on_border.all()
+
+    corner = mesh.params[faces]
+    first, second = corner[:, 1] - corner[:, 0], corner[:, 2] - corner[:, 0]
+    area = first[:, 0] * second[:, 1] - first[:, 1] * second[:, 0]
+    assert area.min() > 0 and np.isclose(area.sum() / 2, 4.0)
+    assert np.allclose(mesh.vertices[:, 2], np.exp(-50 * (mesh.params**2).sum(1)))
+
+    scene = build_mesh_scene(mesh.vertices, mesh.faces)
+    assert scene.buffers["faces"].shape == (len(faces), 3)
+
+
+@pytest.mark.parametrize("interval", [True, False])
+def test_narrow_band_implicit_matches_dense(interval, monkeypatch):
+    x, y, z = sp.symbols("x y z")
+    expr = (sp.sqrt(x**2 + y**2) - 1) ** 2 + z**2 - 0.09
+    func = compile_expr(expr, [x, y, z])
+    bounds = compile_interval(expr, [x, y, z]) if interval else None
+    domains = [Domain(name, -1.5, 1.5) for name in "xyz"]
+    dense = sample_implicit_surface(func, domains, [61] * 3)
+    sparse = sample_implicit_surface_sparse(
+        func, domains, [61] * 3, coarse=6, bounds=bounds, memory_budget=1 << 16
+    )
+    # Chunks overlap by one sample, so a dense pass evaluates a bit more.
+    assert dense.evaluations >= dense.dense_evaluations
+    assert sparse.evaluations < dense.evaluations
+    assert sparse.evaluations_saved > 0 and sparse.skipped > 0
+
+    def ordered(mesh):
+        return mesh.vertices[np.lexsort(mesh.vertices.T)]
+
+    assert len(sparse.faces) == len(dense.faces)
+    assert np.allclose(ordered(sparse), ordered(dense), atol=1e-6)
+
+    # Within the default budget the band is marched in blocks of coarse
+    # cells, not cell by cell.
+    marches = []
+    march = skimage.measure.marching_cubes
+    monkeypatch.setattr(
+        skimage.measure,
+        "marching_cubes",
+        lambda *args, **kwargs: marches.append(args) or march(*args, **kwargs),
+    )
+    blocked = sample_implicit_surface_sparse(
+        func, domains, [61] * 3, coarse=6, bounds=bounds
+    )
+    assert 0 < len(marches) < (blocked.chunks - blocked.skipped) / 4
+    assert np.allclose(ordered(blocked), ordered(dense), atol=1e-6)
+
+
+def test_interval_bounds_float_and_fractional_powers():
+    x = sp.Symbol("x")
+    lower, upper = np.array([[-2.0], [1.0]]), np.array([[-1.0], [4.0]])
+    lo, hi = compile_interval(x**2.0, [x])(lower, upper)
+    assert np.allclose(lo, [1.0, 1.0]) and np.allclose(hi, [4.0, 16.0])
+    lo, hi = compile_interval(x**0.5, [x])(lower, upper)
+    assert lo[0] == -np.inf and hi[0] == np.inf
+    assert np.allclose([lo[1], hi[1]], [1.0, 2.0])
+
+
+def test_implicit_surface_skips_undefined_samples():
+    # sqrt(x) is undefined for x < 0, where the surface meets the domain edge.
+    x, y, z = sp.symbols("x y z")
+    expr = sp.sqrt(x) + y**2 + z**2 - 1
+    func = compile_expr(expr, [x, y, z])
+    bounds = compile_interval(expr, [x, y, z])
+    domains = [Domain(name, -1.5, 1.5) for name in "xyz"]
+    with np.errstate(invalid="ignore"):
+        meshes = [
+            sample_implicit_surface(func, domains, [40] * 3),
+            sample_implicit_surface_sparse(
+                func, domains, [40] * 3, coarse=4, bounds=bounds
+            ),
+        ]
+    for mesh in meshes:
+        px, py, pz = mesh.vertices.astype(np.float64).T
+        assert len(mesh.faces) and px.min() >= 0
+        assert np.abs(np.sqrt(px) + py**2 + pz**2 - 1).max() < 0.02
+        assert mesh.faces.max() < len(mesh.vertices)
+
+
+def test_implicit_curve_chains_disjoint_components():
+    x, y = sp.symbols("x y")
+    circles = ((x - 1) ** 2 + y**2 - 0.25) * ((x + 1) ** 2 + y**2 - 0.25)
+    domains = [Domain("x", -2, 2), Domain("y", -1.5, 1.5)]
+    curve = sample_implicit_curve(compile_expr(circles, [x, y]), domains, [161, 121])
+    assert len(curve.polylines) == 2 and curve.closed.all()
+    centers = []
+    for polyline in curve.polylines:
+        assert np.allclose(polyline[0], polyline[-1])
+        center = polyline[:, 0].mean()
+        radius = np.hypot(polyline[:, 0] - np.sign(center), polyline[:, 1])
+        assert np.allclose(radius, 0.5, atol=2e-3)
+        assert np.all(np.linalg.norm(np.diff(polyline, axis=0), axis=1) < 0.05)
+        centers.append(np.sign(center))
+    assert sorted(centers) == [-1, 1]
+
+    # A curve leaving the domain comes back as one open polyline.
+    line = sample_implicit_curve(compile_expr(y - x**2, [x, y]), domains, [41, 41])
+    assert len(line.polylines) == 1 and not line.closed.any()
+    assert np.allclose(line.polylines[0][:, 1], line.polylines[0][:, 0] ** 2, atol=0.01)
@@ -1,8 +1,40 @@
+import base64
+import hashlib
+import re
+import sys
+import zlib
+from dataclasses import replace
+
 import numpy as np
+import pytest
 
 from geometrix.animation import Animation, Frame, attach_animation
-from geometrix.scene.build import build_buffers, build_surface_scene
-from geometrix.transport.html import _scene_to_dict, render_html
+from geometrix.scene.build import (
+    build_buffers,
+    build_line_scene,
+    build_mesh_scene,
+    build_points_scene,
+    build_polylines_scene,
+    build_surface_scene,
+    dedupe_buffers,
+)
+from geometrix.scene.grid import grid_indices, grid_normals
+from geometrix.scene.quantize import decode_attribute, encode_attribute
+from geometrix.scene.spec import BufferSpec
+from geometrix.transport import frame_stream, html
+from geometrix.transport.container import pack_buffers, unpack_buffers
+from geometrix.transport.frame_channel import FrameChannel
+from geometrix.transport.frames import decode_delta_frames, encode_delta_frames
+from geometrix.transport.html import (
+    _build_payload,
+    _load_script,
+    _minify_script,
+    _scene_to_dict,
+    _script_sources,
+    bundle_script,
+    render_html,
+    render_tile_script,
+)
 
 
 def test_build_buffers_creates_specs():
@@ -20,15 +52,233 @@ def test_scene_spec_surface():
     assert scene.buffers["positions"].shape == (6, 3)
 
 
+def test_quantized_attributes_within_recorded_error():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(-3.0, 5.0, (200, 3)).astype(np.float32)
+    values = rng.uniform(0.0, 10.0, 200).astype(np.float32)
+    normals = rng.normal(size=(200, 3))
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+
+    scene = build_points_scene(positions, values, quantize=True)
+    spec = scene.buffers["positions"]
+    assert spec.dtype == "int16" and spec.encoding["type"] == "quantized"
+    assert scene.buffers["values"].dtype == "uint16"
+    for key, array in {"positions": positions, "values": values}.items():
+        spec = scene.buffers[key]
+        decoded = decode_attribute(encode_attribute(array, spec), spec)
+        assert np.abs(decoded - array).max() <= spec.encoding["error"] * 1.01
+
+    surface = build_surface_scene(positions, (20, 10), normals, quantize=True)
+    spec = surface.buffers["normals"]
+    assert spec.dtype == "int8" and spec.shape == (200, 2)
+    assert surface.objects[0].buffers["normals"] == "normals"
+    decoded = decode_attribute(encode_attribute(normals, spec), spec)
+    angles = np.arccos(np.clip(np.sum(decoded * normals, axis=1), -1.0, 1.0))
+    assert angles.max() <= spec.encoding["error"] + 1e-6 < 0.02
+
+    arrays = {"positions": positions, "values": values}
+    container = _build_payload(scene, arrays, None)["container"]
+    assert container["buffers"]["positions"]["dtype"] == "int16"
+    assert _scene_to_dict(scene)["buffers"]["values"]["encoding"]["offset"]
+
+
+def test_quantized_positions_keep_normals_in_geometry_space():
+    # A flat box (extent 10 x 1 x 0.1) makes any per-axis rescaling visible.
+    u, v = np.meshgrid(np.linspace(-5, 5, 30), np.linspace(0, 1, 20), indexing="ij")
+    positions = np.stack([u, v, 0.1 * np.sin(u) * v], axis=-1).reshape(-1, 3)
+    normals = grid_normals(positions, (30, 20))
+    scene = build_surface_scene(positions, (30, 20), normals, quantize=True)
+    payload = _build_payload(scene, {"positions": positions, "normals": normals}, None)
+
+    buffers = payload["scene"]["buffers"]
+    specs = {key: BufferSpec(**spec) for key, spec in buffers.items()}
+    shipped = unpack_buffers(payload["container"])
+    decoded = {key: decode_attribute(shipped[key], specs[key]) for key in shipped}
+    error = specs["positions"].encoding["error"]
+    assert np.abs(decoded["positions"] - positions).max() <= error * 1.01
+    # The viewer shades decoded positions with the decoded normals unchanged.
+    geometric = grid_normals(decoded["positions"], (30, 20))
+    cosine = np.clip(np.sum(geometric * decoded["normals"], axis=1), -1.0, 1.0)
+    assert np.arccos(cosine).max() < 0.05
+
+
+def test_surface_grid_index_and_normal_buffers():
+    assert grid_indices(2, 3).tolist() == [0, 3, 1, 1, 3, 4, 1, 4, 2, 2, 4, 5]
+    assert grid_indices(256, 256).dtype == np.uint16
+    assert grid_indices(257, 256).dtype == np.uint32
+
+    u, v = np.meshgrid(np.linspace(0, 1, 4), np.linspace(0, 2, 3), indexing="ij")
+    positions = np.stack([u, v, u + v], axis=-1).reshape(-1, 3).astype(np.float32)
+    expected = np.array([-1.0, -1.0, 1.0]) / np.sqrt(3.0)
+    assert np.allclose(grid_normals(positions, (4, 3)), expected, atol=1e-6)
+
+    scene = build_surface_scene(positions, (4, 3), indices=True, compute_normals=True)
+    assert scene.objects[0].buffers["indices"] == "indices"
+    assert scene.buffers["indices"].shape == (36,)
+    assert scene.buffers["normals"].shape == (12, 3)
+    container = _build_payload(scene, {"positions": positions}, None)["container"]
+    unpacked = unpack_buffers(container)
+    assert np.array_equal(unpacked["indices"], grid_indices(4, 3))
+    assert np.allclose(unpacked["normals"], expected, atol=1e-6)
+
+
+def test_identical_buffers_are_shared():
+    positions = np.zeros((4, 3), dtype=np.float32)
+    values = np.arange(4, dtype=np.float32)
+    scene = build_points_scene(positions, values)
+    specs = {
+        **scene.buffers,
+        "values_b": scene.buffers["values"],
+        "values_c": scene.buffers["values"],
+        "values_q": replace(scene.buffers["values"], encoding={"type": "other"}),
+    }
+    objects = [
+        replace(scene.objects[0], buffers={"positions": "positions", "values": key})
+        for key in ("values", "values_b", "values_c", "values_q")
+    ]
+    scene = replace(scene, objects=objects, buffers=specs)
+    arrays = {"positions": positions, "values": values}
+    arrays.update({key: values.copy() for key in ("values_b", "values_c", "values_q")})
+
+    deduped, unique = dedupe_buffers(scene, arrays, keep=["values_c"])
+    assert sorted(unique) == ["positions", "values", "values_c", "values_q"]
+    assert [obj.buffers["values"] for obj in deduped.objects] == [
+        "values",
+        "values",
+        "values_c",
+        "values_q",
+    ]
+    assert deduped.buffers["values"].digest == deduped.buffers["values_c"].digest
+    assert deduped.buffers["values"].digest != deduped.buffers["values_q"].digest
+
+    del specs["values_q"], arrays["values_q"]
+    scene = replace(scene, objects=objects[:3], buffers=specs)
+    payload = _build_payload(scene, arrays, None)
+    assert sorted(payload["container"]["buffers"]) == ["positions", "values"]
+    assert {obj["buffers"]["values"] for obj in payload["scene"]["objects"]} == {
+        "values"
+    }
+
+
 def test_transport_payload_and_render():
     arrays = {"positions": np.zeros((2, 3), dtype=np.float32)}
     scene = build_surface_scene(arrays["positions"], (2, 1))
     bundle = render_html(scene, arrays, height=360)
     assert "geometrix-container" in bundle.html
+    container = _build_payload(scene, arrays, None)["container"]
+    assert np.array_equal(unpack_buffers(container)["positions"], arrays["positions"])
     scene_dict = _scene_to_dict(scene)
     assert scene_dict["buffers"]["positions"]["shape"] == [2, 3]
 
 
+def test_viewer_assets_load_once_and_bundle():
+    arrays = {"positions": np.zeros((2, 3), dtype=np.float32)}
+    scene = build_surface_scene(arrays["positions"], (2, 1))
+    render_html(scene, arrays)
+    html = render_html(scene, arrays, height=300, viewer_id="viewer-a").html
+    assert _load_script.cache_info().misses <= 1
+    assert "__PAYLOAD__" not in html and "__HEIGHT__" not in html
+    assert 'const viewerId = "viewer-a";' in html and "height:300px" in html
+
+    header, _, body = bundle_script().partition("\n")
+    assert header.startswith("// geometrix viewer ")
+    assert len(body) < len(_script_sources())
+    assert "const payload = __PAYLOAD__;" in body
+    assert not any(line.startswith("//") for line in body.splitlines())
+    code = re.sub(r"(?m)^\s*//.*$", "", _script_sources())
+    code = re.sub(r"`[^`\n]*`", "", code)
+    templates = re.findall(r"`[^`]*\n[^`]*`", code)
+    assert templates and all(template in body for template in templates)
+    snippet = "  const a = `\n    x  \n// y\n`; // `z\n  b();\n"
+    assert _minify_script(snippet) == "const a = `\n    x  \n// y\n`; // `z\nb();"
+
+
+def test_viewer_renders_every_object_type():
+    positions = np.eye(3, dtype=np.float32)
+    scenes = [
+        build_surface_scene(positions, (3, 1)),
+        build_points_scene(positions),
+        build_line_scene(positions),
+        build_polylines_scene([positions]),
+        build_mesh_scene(positions, np.array([[0, 1, 2]])),
+    ]
+    kinds = {obj.type for scene in scenes for obj in scene.objects}
+    handled = set(re.findall(r'obj\.type === "(\w+)"', _script_sources()))
+    assert kinds == {"surface_grid", "points", "line", "mesh"}
+    assert kinds <= handled
+
+
+def test_vendored_three_inlined_once_per_session(monkeypatch):
+    arrays = {"positions": np.zeros((2, 3), dtype=np.float32)}
+    scene = build_surface_scene(arrays["positions"], (2, 1))
+    block = '<script type="application/octet-stream" data-geometrix-module="three">'
+    monkeypatch.setattr(html, "_VENDOR_SENT", False)
+    monkeypatch.setattr(html, "_load_vendor", lambda: block + "</script>")
+
+    first = render_html(scene, arrays)
+    assert block in first.html and first.vendor
+    assert block not in render_html(scene, arrays).html
+    assert block in render_html(scene, arrays, inline_vendor=True).html
+    monkeypatch.setitem(sys.modules, "google.colab", object())
+    assert block in render_html(scene, arrays).html
+    monkeypatch.setattr(html, "_VENDOR_SENT", False)
+    assert block not in render_html(scene, arrays, inline_vendor=False).html
+    assert "__VENDOR__" not in render_html(scene, arrays).html
+
+
+def test_vendored_modules_match_recorded_checksums(tmp_path):
+    sources = {"three": b"export const REVISION = '168';", "orbit-controls": b"//"}
+    listed = ["# three from the npm registry"]
+    for name, source in sources.items():
+        filename = html.VENDOR_MODULES[name]
+        (tmp_path / filename).write_bytes(source)
+        listed.append(f"{hashlib.sha256(source).hexdigest()}  {filename}")
+    (tmp_path / html.VENDOR_CHECKSUMS).write_text("\n".join(listed))
+
+    blocks = re.compile(r'data-geometrix-module="([^"]+)">([^<]*)</script>')
+    found = dict(blocks.findall(html._vendor_blocks(tmp_path)))
+    assert sorted(found) == ["orbit-controls", "three"]
+    assert zlib.decompress(base64.b64decode(found["three"])) == sources["three"]
+    # Edited or partial vendor files leave the viewer on the CDN.
+    (tmp_path / html.VENDOR_MODULES["three"]).write_bytes(b"export {};")
+    assert html._vendor_blocks(tmp_path) == ""
+    (tmp_path / html.VENDOR_MODULES["three"]).unlink()
+    assert html._vendor_blocks(tmp_path) == ""
+
+
+@pytest.mark.parametrize("compression", [None, "deflate"])
+def test_container_round_trip_with_aligned_offsets(compression):
+    arrays = {
+        "indices": np.arange(5, dtype=np.uint16),
+        "positions": np.arange(12, dtype=np.float32).reshape(4, 3)[::-1],
+        "values": np.linspace(0.0, 1.0, 3),
+    }
+    packed = pack_buffers(arrays, compression=compression)
+    assert packed["compression"] == compression
+    assert all(spec["offset"] % 8 == 0 for spec in packed["buffers"].values())
+    assert packed["buffers"]["positions"]["length"] == 48
+    unpacked = unpack_buffers(packed)
+    for key, array in arrays.items():
+        assert unpacked[key].dtype == array.dtype
+        assert np.array_equal(unpacked[key], array)
+
+    with pytest.raises(ValueError, match="compression"):
+        pack_buffers(arrays, compression="gzip")
+
+
+def test_viewers_get_unique_ids_and_tile_scripts():
+    arrays = {"positions": np.zeros((4, 3), dtype=np.float32)}
+    scene = build_surface_scene(arrays["positions"], (2, 2))
+    first, second = (render_html(scene, arrays) for _ in range(2))
+    assert first.viewer_id != second.viewer_id
+    assert f'id="{first.viewer_id}"' in first.html
+    assert "__CONTAINER_ID__" not in first.html
+
+    script = render_tile_script(first.viewer_id, "positions", 2, np.ones((2, 3)))
+    assert first.viewer_id in script and '"start": 2' in script
+    assert '"dtype": "float32"' in script and '"last": false' in script
+
+
 def test_attach_animation():
     positions = np.zeros((2, 3), dtype=np.float32)
     scene = build_surface_scene(positions, (1, 2))
@@ -37,3 +287,76 @@ def test_attach_animation():
     updated = attach_animation(scene, anim)
     assert updated.animation["fps"] == 24
     assert updated.animation["frame_count"] == 1
+
+
+def test_delta_frames_round_trip_within_quantization():
+    rng = np.random.default_rng(0)
+    stack = rng.uniform(-2.0, 3.0, (5, 40, 3)).astype(np.float32)
+    stack[3] = stack[2]
+    anim = Animation.from_arrays("positions", stack, np.linspace(0.0, 1.0, 5))
+    encoded = encode_delta_frames(anim)
+    assert encoded["frame_count"] == 5
+    assert encoded["frames"][3] == {}
+
+    decoded = decode_delta_frames(encoded)
+    step = np.array(encoded["buffers"]["positions"]["scale"])
+    for frame, expected in zip(decoded, stack, strict=True):
+        assert frame["positions"].dtype == np.float32
+        assert np.all(np.abs(frame["positions"] - expected) <= step)
+
+
+def test_render_html_frame_codec():
+    stack = np.zeros((3, 4, 3), dtype=np.float32)
+    stack[:, :, 2] = np.arange(3)[:, None]
+    anim = Animation.from_arrays("positions", stack, np.arange(3.0))
+    scene = attach_animation(build_surface_scene(stack[0], (2, 2)), anim)
+    arrays = {"positions": stack[0]}
+    payload = _build_payload(scene, arrays, anim, frame_codec="delta")
+    assert payload["frame_codec"]["codec"] == "delta" and "frames" not in payload
+    html = render_html(scene, arrays, animation=anim, frame_codec="delta").html
+    assert '"frame_codec": {"codec": "delta"' in html
+    with pytest.raises(ValueError, match="frame codec"):
+        render_html(scene, arrays, animation=anim, frame_codec="h264")
+    quantized = build_surface_scene(stack[0], (2, 2), quantize=True)
+    with pytest.raises(ValueError, match="encoded buffer"):
+        render_html(quantized, arrays, animation=anim)
+
+
+class _FakeComm:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data, buffers=None):
+        self.sent.append((data, buffers))
+
+
+def test_frame_stream_serves_frames_on_request(monkeypatch):
+    stack = np.arange(24, dtype=np.float32).reshape(2, 4, 3)
+    anim = Animation.from_arrays("positions", stack, np.arange(2.0))
+    assert frame_stream.serve_frames(anim, "viewer-a") is None
+
+    monkeypatch.setattr(frame_stream, "_in_kernel", lambda: True)
+    spec, channel = frame_stream.serve_frames(anim, "viewer-a", window=4)
+    assert spec == {"viewer": "viewer-a", "frame_count": 2, "window": 2}
+    assert isinstance(channel, FrameChannel) and channel.viewer == "viewer-a"
+    # Re-serving a viewer replaces its channel.
+    _, again = frame_stream.serve_frames(anim, "viewer-a")
+    assert channel.comm is None and again.comm is not None
+
+    comm = _FakeComm()
+    monkeypatch.setattr(again, "send", comm.send)
+    again._handle_custom_msg({"frames": [1, 5]}, [])
+    (content, buffers), (error, _) = comm.sent
+    assert content["index"] == 1 and content["keys"][0]["shape"] == [4, 3]
+    assert np.array_equal(np.frombuffer(buffers[0], np.float32), stack[1].ravel())
+    assert "out of range" in error["error"] and error["index"] == 5
+
+    # Only the first frame is embedded, as a still until the channel connects.
+    scene = attach_animation(build_surface_scene(stack[0], (2, 2)), anim)
+    payload = _build_payload(
+        scene, {"positions": stack[0]}, anim, "delta", frame_stream=spec
+    )
+    assert payload["frame_stream"] == spec and "frame_codec" not in payload
+    (still,) = payload["frames"]
+    data = base64.b64decode(still["positions"]["data"])
+    assert np.array_equal(np.frombuffer(data, np.float32), stack[0].ravel())